@@ -1,20 +1,40 @@
 # -*- coding: utf-8 -*-
 # 💊 약국 찾기 앱 (주소 검색 + 지도 클릭 + 결과 유지 + 영업중 필터 + 진단 출력)
 # - Overpass 미러 회전/재시도 + 상태코드/스니펫 출력
+# - hedged 모드: 미러 병렬 요청(지연 백분위 초과 시 추가 요청), 먼저 온 정상 응답 채택
+# - 미러 상태표(지연 EWMA/오류율/429 쿨다운/서킷 브레이커) → 진단 패널
 # - 약국 태그 확장: amenity=pharmacy | healthcare=pharmacy | shop=chemist | name~(약국|pharm),i
 # - 결과 0개면 반경 자동 확대 재탐색
+# - 데이터 소스 전환: Overpass / 로컬 인덱스(pharmacy_index.py, OSM 추출본에서 생성)
+# - 무거운 의존성 지연 import, 시간대 조회는 프로세스당 1개 TimezoneFinder + 한국 영역 즉시 응답 (tz_lookup.py)
+# - "가까운 영업중 k곳" 모드: 고리 단위로 넓히며 k곳 확인 즉시 종료 (nearest_search.py)
 # - rerun 되어도 결과 유지(session_state)
-
+# - Overpass 결과 캐시(TTL + LRU, 만료 시 stale 응답 후 백그라운드 갱신)
+# - 검색 중심 후보가 생기면 백그라운드로 미리 조회(연속 클릭은 취소/동시 실행 상한) (prefetch.py)
+# - 동시 검색 합치기: 같은 쿼리는 한 번만, 가까운 동시 검색은 bbox 쿼리 하나로 받아 세션별로 나눔 (overpass_coalesce.py)
+# - opening_hours: 문자열별 컴파일 캐시 + 일괄 평가 (opening_hours.py)
+# - 결과마다 가장 이른 영업/종료 전환 시각 저장 → 그 시각이 지나야 영업여부 재평가
+# - compact 쿼리: nwr 병합 + 필요한 태그/중심좌표만 출력 (overpass_query.py)
+# - Overpass 응답은 필요한 필드/태그만 남긴 __slots__ 레코드로 바로 디코딩 (overpass_decode.py)
+# - 주소 검색: 정규화 검색어 영구 캐시(없는 주소는 짧은 TTL) + 필요할 때만 1 req/s 토큰 버킷 (geocoding.py)
+# - 결과 지도: 입력 해시로 렌더 캐시, 마커가 많으면 GeoJSON 레이어 + 브라우저 클러스터링 (map_render.py)
+# - 결과 표는 열 단위로 생성(벡터 거리 계산, 범주형 영업여부), 지도 링크는 표시할 때만 (result_table.py)
+# - 시각 필터("일 21:00 영업", "오늘 밤 중 영업"): 결과마다 주간 15분 슬롯 비트열 → 다시 검색하지 않고 비트 검사
+# - 사각지대 분석: 지역 격자점별 지정 요일/시각에 영업중인 가장 가까운 약국까지 거리 히트맵 + CSV/Parquet (pharmacy_coverage.py)
+# - 검색 파이프라인은 search_service.py (async API + HTTP 서버 search_http.py). 이 화면은 그 클라이언트 (search_client.py)
+#   SEARCH_SERVICE_URL 이 있으면 HTTP 로, 없으면 같은 프로세스에서 호출
+# - 단계별 소요 시간(화면: 주소 검색/서비스 호출/표 변환/지도 렌더, 서비스: tz_at/미러 요청/표 생성/정렬 …)
+#   → 진단 패널(켜야 표시) + Prometheus 형식 내보내기, STAGE_LOG 로 JSON 로그 (stage_metrics.py)
+
+# 무거운 의존성(pandas/numpy → result_table, folium, streamlit_folium, timezonefinder, pytz)은
+# 실제로 쓰는 구간에서 import → 첫 화면은 검색/지도에 필요한 것만 읽는다
 import streamlit as st
-import pandas as pd
-import requests, re
-import folium
-from streamlit_folium import st_folium
-from haversine import haversine
-from datetime import datetime, time
-from timezonefinder import TimezoneFinder
-from geopy.geocoders import Nominatim
-import pytz, time as _time
+from datetime import datetime, time, timedelta
+import uuid
+from overpass_mirrors import format_report
+from tz_lookup import get_tz
+from search_client import get_client
+from stage_metrics import STAGES, Trace, stage
 
 st.set_page_config(page_title="약국 찾기", page_icon="💊", layout="wide")
 st.title("💊 내 주변 약국 찾기")
@@ -22,143 +42,41 @@ st.title("💊 내 주변 약국 찾기")
 # ---------------- Session State ----------------
 for k, v in [
     ("last_df", None),
+    ("last_all_df", None),        # 영업중 필터 적용 전 전체 결과
+    ("last_open_only", True),
+    ("last_valid_until", None),   # 이 시각까지는 영업여부가 바뀌지 않음
+    ("last_tz", "Asia/Seoul"),
     ("last_center", None),
     ("last_radius", 1200),
     ("pending_center", None),
+    ("prefetch_key", None),       # 마지막으로 미리 조회를 예약한 (중심, 반경, 옵션)
+    ("prefetch_owner", None),
+    ("last_week", None),          # last_all_df 의 주간 슬롯 비트 행렬 (시각 필터용)
+    ("last_coverage", None),      # 마지막 사각지대 분석 결과 (pharmacy_coverage.to_payload)
+    ("last_timings", None),       # 마지막 검색의 단계별 소요 시간 (화면 + 서비스)
 ]:
     if k not in st.session_state:
         st.session_state[k] = v
+if st.session_state["prefetch_owner"] is None:
+    st.session_state["prefetch_owner"] = uuid.uuid4().hex
 
 DEFAULT_CENTER = (37.5663, 126.9779)
-DISPLAY_COLS = ["이름","거리(m)","영업여부","영업시간","전화","네이버지도","카카오맵"]
-
-# ---------------- Timezone ----------------
-def tz_at(lat, lon):
-    try:
-        tzname = TimezoneFinder().timezone_at(lat=lat, lng=lon)
-        if tzname:
-            return pytz.timezone(tzname)
-    except Exception:
-        pass
-    return pytz.timezone("Asia/Seoul")
-
-# ---------------- Overpass (diagnostic + retry) ----------------
-OVERPASS = [
-    "https://overpass-api.de/api/interpreter",
-    "https://overpass.kumi.systems/api/interpreter",
-    "https://overpass.openstreetmap.ru/api/interpreter",
-]
-UA = {"User-Agent": "pharmacy-open-now/1.0 (contact: you@example.com)"}  # ← 이메일 바꾸면 좋아요
-
-def fetch_overpass(query, tries=6, backoff=1.6, debug=True):
-    last = None
-    for i in range(tries):
-        url = OVERPASS[i % len(OVERPASS)]
-        try:
-            r = requests.post(url, data={"data": query}, headers=UA, timeout=60)
-            code = r.status_code
-            if code != 200:
-                snippet = (r.text or "")[:300].replace("\n", " ")[:300]
-                if debug:
-                    st.warning(f"[Overpass] {url} → HTTP {code} • {r.reason} • body: {snippet}")
-                if code in (429, 500, 502, 503, 504):
-                    last = (code, r.reason, url)
-                    _time.sleep(backoff ** i)
-                    continue
-                raise requests.exceptions.HTTPError(f"HTTP {code} {r.reason} @ {url}")
-            try:
-                return r.json(), url
-            except Exception as je:
-                if debug:
-                    st.warning(f"[Overpass] {url} → 200 but JSON parse fail: {je}")
-                last = (200, "JSON parse fail", url)
-                _time.sleep(backoff ** i)
-                continue
-        except requests.exceptions.RequestException as e:
-            last = (None, "RequestException", str(e), url)
-            if debug:
-                st.warning(f"[Overpass] {url} → RequestException: {e}")
-            _time.sleep(backoff ** i)
-            continue
-    raise RuntimeError(f"Overpass 요청 실패 (last={last})")
-
-# ---------------- opening_hours parser ----------------
-DAY = {"Mo":0,"Tu":1,"We":2,"Th":3,"Fr":4,"Sa":5,"Su":6}
-def _t(s):
-    try:
-        h, m = s.split(":")
-        return time(int(h), int(m))
-    except Exception:
-        return None
-def _days(seg):
-    if "-" in seg:
-        a, b = seg.split("-")
-        if a in DAY and b in DAY:
-            i, j = DAY[a], DAY[b]
-            return list(range(i, j+1)) if i <= j else list(range(i, 7)) + list(range(0, j+1))
-    return [DAY[seg]] if seg in DAY else []
-def _rule(s):
-    m = re.match(r'^([A-Za-z]{2}(?:-[A-Za-z]{2})?(?:,\s*[A-Za-z]{2}(?:-[A-Za-z]{2})?)*)\s+'
-                 r'([\d:]{4,5}-[\d:]{4,5}(?:\s*,\s*[\d:]{4,5}-[\d:]{4,5})*)$', s.strip())
-    if not m: return None
-    dpart, tpart = m.groups()
-    days = sorted(set(sum((_days(x.strip()) for x in dpart.split(",")), [])))
-    ranges = []
-    for seg in [x.strip() for x in tpart.split(",")]:
-        if "-" in seg:
-            a, b = seg.split("-")
-            ta, tb = _t(a), _t(b)
-            if ta and tb: ranges.append((ta, tb))
-    return {"days": days, "ranges": ranges} if days and ranges else None
-def is_open_now(oh, now_local: datetime):
-    if not oh: return None, "표기 없음"
-    s = oh.strip()
-    if s.lower() in ("24/7","24x7","24-7"): return True, "24/7"
-    wd, nowt = now_local.weekday(), now_local.time()
-    known, opened = False, False
-    for part in [p.strip() for p in s.split(";") if p.strip()]:
-        if "PH" in part or "off" in part.lower(): continue
-        if re.match(r'^[\d:]{4,5}-[\d:]{4,5}$', part):
-            ta, tb = _t(part.split("-")[0]), _t(part.split("-")[1])
-            if ta and tb:
-                known = True
-                if ta <= nowt <= tb: opened = True
-            continue
-        rule = _rule(part)
-        if not rule: continue
-        known = True
-        if wd in rule["days"]:
-            for ta, tb in rule["ranges"]:
-                if tb < ta:
-                    if nowt >= ta or nowt <= tb: opened = True; break
-                else:
-                    if ta <= nowt <= tb: opened = True; break
-    return (opened, oh) if known else (None, oh)
-
-# ---------------- Overpass query (fixed regex flags) ----------------
-def build_overpass_query(lat, lon, radius):
-    # 핵심 수정: (?i) 대신 ,i 플래그 사용 → ["name"~"...",i]
-    return f"""
-    [out:json][timeout:40];
-    (
-      node["amenity"="pharmacy"](around:{radius},{lat},{lon});
-      way ["amenity"="pharmacy"](around:{radius},{lat},{lon});
-      relation["amenity"="pharmacy"](around:{radius},{lat},{lon});
-
-      node["healthcare"="pharmacy"](around:{radius},{lat},{lon});
-      way ["healthcare"="pharmacy"](around:{radius},{lat},{lon});
-      relation["healthcare"="pharmacy"](around:{radius},{lat},{lon});
-
-      node["shop"="chemist"](around:{radius},{lat},{lon});
-      way ["shop"="chemist"](around:{radius},{lat},{lon});
-      relation["shop"="chemist"](around:{radius},{lat},{lon});
-
-      node["name"~"(pharm|약국)",i](around:{radius},{lat},{lon});
-      way ["name"~"(pharm|약국)",i](around:{radius},{lat},{lon});
-      relation["name"~"(pharm|약국)",i](around:{radius},{lat},{lon});
-    );
-    out center tags;
-    """
+DISPLAY_COLS = ["이름","거리(m)","영업여부","다음변경","영업시간","전화","네이버지도","카카오맵"]
+BACKENDS = {"overpass": "Overpass", "local": "로컬 인덱스"}
+APP = "pharmacy_app"  # stage_metrics component
+
+client = get_client()
+service_info = client.info()
+
+def show_fetch(prefix, fetch):
+    st.caption(f"{prefix}Overpass endpoint: {fetch['endpoint']} • cache: {fetch['cache']}")
+    tiles = fetch.get("tiles")
+    if tiles:
+        st.caption(f"타일 {tiles['total']}개 • 저장된 것 {tiles['fresh']} • 오래된 것 {tiles['stale']}(백그라운드 갱신)"
+                   f" • 새로 받음 {tiles['fetched']}" + (f" • 다른 검색 대기 {tiles['waited']}" if tiles["waited"] else ""))
+    report = fetch["report"]
+    if report and fetch["cache"] == "miss":
+        st.caption(f"hedge {report['hedge_delay']:.1f}s • 총 {report['elapsed']:.2f}s • {format_report(report)}")
 
 # ---------------- 1) Address search ----------------
 st.markdown("### 1) 지역(주소) 검색")
@@ -170,15 +88,14 @@ with st.form("addr"):
         addr_submit = st.form_submit_button("주소로 위치 지정")
 if addr_submit and addr.strip():
     try:
-        geo = Nominatim(user_agent="pharmacy-open-now/1.0 (contact: you@example.com)", timeout=15)
-        loc = geo.geocode(addr, addressdetails=False, language="ko")
-        if loc:
-            st.session_state["last_center"] = (loc.latitude, loc.longitude)
-            st.success(f"위치 설정: {loc.address}")
+        # 정규화한 검색어로 영구 캐시 + 실제 요청 시에만 1 req/s 제한 (geocoding.py)
+        with stage("geocode", APP):
+            loc = client.geocode(addr)
+        if loc["found"]:
+            st.session_state["last_center"] = (loc["lat"], loc["lon"])
+            st.success(f"위치 설정: {loc['label']}")
         else:
             st.warning("주소를 찾지 못했어요. 다른 표현으로 시도해보세요.")
-    except requests.exceptions.HTTPError as he:
-        st.error(f"Nominatim HTTP 오류: {he}")
     except Exception as e:
         st.error(f"Nominatim 오류: {e}")
 
@@ -186,6 +103,8 @@ current_center = st.session_state["last_center"] or DEFAULT_CENTER
 
 # ---------------- 2) Map select ----------------
 st.markdown("### 2) 지도에서 위치 선택 (선택 사항)")
+import folium
+from streamlit_folium import st_folium
 m = folium.Map(location=current_center, zoom_start=14, control_scale=True)
 folium.Marker(current_center, tooltip="현재 검색 중심").add_to(m)
 md = st_folium(m, height=420, use_container_width=True)
@@ -205,109 +124,229 @@ with cA:
 with cB:
     if st.button("이전 검색 결과 지우기"):
         st.session_state["last_df"] = None
+        st.session_state["last_all_df"] = None
+        st.session_state["last_week"] = None
+        st.session_state["last_valid_until"] = None
         st.info("이전 검색 결과를 지웠습니다.")
 
 search_center = st.session_state["last_center"] or current_center
 
 # ---------------- 3) Options & Search ----------------
 st.markdown("### 3) 검색 옵션")
+# 반경은 폼 밖: 폼 안 위젯 값은 제출 때만 바뀌므로, 밖에 둬야 미리 조회가 지금 슬라이더 값으로 받음
+radius = st.slider("반경 (m)", 200, 3000, min(3000, st.session_state["last_radius"]), step=100)
 with st.form("search"):
-    radius = st.slider("반경 (m)", 200, 3000, st.session_state["last_radius"], step=100)
     open_only = st.checkbox("지금 영업중만 보기", value=True)
+    hedged = st.checkbox("미러 병렬 요청 (hedged)", value=True)
+    compact = st.checkbox("경량 쿼리 (필요한 태그만 전송)", value=False)
+    backend_names = service_info["backends"]
+    backend = st.radio("데이터 소스", backend_names, format_func=BACKENDS.get, horizontal=True,
+                       index=backend_names.index(service_info["default_backend"]))
+    mode = st.radio("검색 방식", ["반경 내 전체", "가까운 영업중 k곳"], horizontal=True)
+    k_nearest = st.slider("k (가까운 영업중 약국 수)", 1, 20, 5)
     submit = st.form_submit_button("검색 실행")
 
+# ---------------- Prefetch ----------------
+# 검색 중심 후보(지도 클릭/주소)가 생기면 현재 반경으로 미리 받아 캐시에 넣어 둠 → '검색 실행' 때 hit 또는 요청 중
 if submit:
-    lat, lon = search_center
-    tz = tz_at(lat, lon)
-    now_local = datetime.now(tz)
-
-    query = build_overpass_query(lat, lon, radius)
-    (data, used_endpoint) = fetch_overpass(query)
-    elements = data.get("elements", [])
-    st.caption(f"Overpass endpoint: {used_endpoint}")
-
-    if not elements and radius < 3000:
-        alt_radius = min(3000, max(radius + 800, int(radius * 1.6)))
-        st.info(f"반경 내 결과가 없어 {alt_radius}m로 자동 재탐색합니다.")
-        query = build_overpass_query(lat, lon, alt_radius)
-        (data, used_endpoint) = fetch_overpass(query)
-        elements = data.get("elements", [])
-        st.caption(f"(재탐색) Overpass endpoint: {used_endpoint}")
-        radius = alt_radius
+    client.cancel_prefetch(st.session_state["prefetch_owner"])
+elif service_info["prefetch"] and backend == "overpass":
+    candidate = st.session_state["pending_center"] or st.session_state["last_center"]
+    if candidate is not None:
+        pkey = (candidate[0], candidate[1], radius, hedged, compact)
+        if st.session_state["prefetch_key"] != pkey:
+            st.session_state["prefetch_key"] = pkey
+            client.prefetch(st.session_state["prefetch_owner"], candidate[0], candidate[1], radius, hedged, compact)
 
-    rows = []
-    for el in elements:
-        if el.get("type") == "node":
-            plat, plon = el.get("lat"), el.get("lon")
-        else:
-            c = el.get("center")
-            if not c: continue
-            plat, plon = c.get("lat"), c.get("lon")
-
-        tags = el.get("tags", {}) or {}
-        name = tags.get("name") or tags.get("alt_name") or "(이름 없음)"
-        phone = tags.get("phone") or tags.get("contact:phone") or ""
-        opening = tags.get("opening_hours", "")
-        opened, opening_disp = is_open_now(opening, now_local)
-        dist = round(haversine((lat, lon), (plat, plon), unit="m"))
-
-        rows.append({
-            "이름": name,
-            "거리(m)": dist,
-            "영업여부": "영업중" if opened is True else ("영업종료" if opened is False else "확인필요"),
-            "영업시간": opening_disp,
-            "전화": phone,
-            "위도": plat,
-            "경도": plon,
-            "네이버지도": f"https://map.naver.com/v5/search/{name}/place",
-            "카카오맵": f"https://map.kakao.com/?q={name}",
-        })
-
-    df = pd.DataFrame(
-        rows,
-        columns=["이름","거리(m)","영업여부","영업시간","전화","위도","경도","네이버지도","카카오맵"]
-    )
-
-    if not df.empty:
-        if open_only:
-            df = df[df["영업여부"].astype(str) == "영업중"]
-        order = {"영업중": 0, "확인필요": 1, "영업종료": 2}
-        df["__ord__"] = df["영업여부"].map(order).fillna(9)
-        df = df.sort_values(["__ord__", "거리(m)"]).drop(columns="__ord__")
-
-    st.session_state["last_df"] = df.reset_index(drop=True)
+if submit:
+    lat, lon = search_center
+    search_trace = Trace(APP, "search")
+    with search_trace.stage("service_call"):
+        res = client.pharmacies(lat=lat, lon=lon, radius=radius, k=k_nearest, open_only=open_only,
+                                mode="nearest" if mode == "가까운 영업중 k곳" else "radius",
+                                backend=backend, hedged=hedged, compact=compact, include_all=True)
+    for w in res["warnings"]:
+        st.warning(w)
+
+    info = res.get("nearest")
+    if info:
+        rings = " → ".join(f"{r['r_outer']}m(+{r['elements']})" for r in info["rings"])
+        st.caption(f"고리 검색 {info['calls']}회 • {info['elapsed']:.2f}s • {rings}")
+        if not info["complete"]:
+            st.info(f"{info['radius']}m 안에서 영업중 약국을 {res['count']}곳만 확인했습니다.")
+    for f in res["fetches"]:
+        if f["retry"]:
+            st.info(f"반경 내 결과가 없어 {res['retried_radius']}m로 자동 재탐색합니다.")
+        show_fetch("(재탐색) " if f["retry"] else "", f)
+
+    from result_table import from_records, schedule_matrix
+    valid_until = res["valid_until"]
+    with search_trace.stage("from_records", rows=len(res["all_rows"])):
+        st.session_state["last_df"] = from_records(res["rows"])
+        st.session_state["last_all_df"] = from_records(res["all_rows"])
+    with search_trace.stage("schedule_matrix"):
+        st.session_state["last_week"] = schedule_matrix(st.session_state["last_all_df"])
+    st.session_state["last_open_only"] = res["open_only"]
+    st.session_state["last_valid_until"] = datetime.fromisoformat(valid_until) if valid_until else None
+    st.session_state["last_tz"] = res["tz"]
     st.session_state["last_center"] = (lat, lon)
-    st.session_state["last_radius"] = radius
-
-    st.success(f"검색 완료: {len(df)}곳")
+    st.session_state["last_radius"] = res["radius"]
+    st.session_state["last_timings"] = dict(search_trace.finish(mode=res["mode"], count=res["count"]),
+                                            service=res.get("timings"))
+
+    st.success(f"검색 완료: {res['count']}곳")
+    stats = client.stats()
+    cs, ts = stats["overpass_cache"], stats.get("tiles")
+    tiled = any(f.get("tiles") for f in res.get("fetches", []))
+    if tiled:  # 반경 검색은 타일 저장소가 캐시 → 그 hit/stale/miss (결과 캐시 카운터는 움직이지 않음)
+        st.caption(f"타일 저장소: {ts['tiles']}개 • hit {ts['hits']} • stale {ts['stale_hits']} • miss {ts['misses']}"
+                   f" • upstream 쿼리 {ts['upstream_queries']} • 서비스 처리 {res['elapsed']:.2f}s")
+    else:
+        st.caption(f"캐시: {cs['entries']}/{cs['max_entries']}개 • hit {cs['hits']} • stale {cs['stale_hits']} • miss {cs['misses']}"
+                   f" • 서비스 처리 {res['elapsed']:.2f}s")
 
 # ---------------- 4) Results (persisted) ----------------
 st.markdown("### 4) 검색 결과")
+# 저장된 결과는 가장 이른 영업/종료 전환 시각이 지났을 때만 다시 평가
+if st.session_state["last_all_df"] is not None and st.session_state["last_valid_until"] is not None:
+    from result_table import evaluate_hours, result_view
+    now_local = datetime.now(get_tz(st.session_state["last_tz"]))
+    if now_local >= st.session_state["last_valid_until"]:
+        df_all = st.session_state["last_all_df"].copy()
+        with stage("reevaluate", APP):
+            st.session_state["last_valid_until"] = evaluate_hours(df_all, now_local)
+        st.session_state["last_all_df"] = df_all
+        st.session_state["last_df"] = result_view(df_all, st.session_state["last_open_only"])
+        st.caption("영업 상태가 바뀌는 시각이 지나 결과를 다시 평가했습니다.")
 df = st.session_state["last_df"]
+# 시각 필터: 저장된 전체 결과의 주간 슬롯 비트열만 검사 → 슬라이더를 움직여도 다시 검색하지 않음
+if st.session_state["last_all_df"] is not None:
+    time_filter = st.radio("영업 시각 필터", ["검색 설정대로", "지정 시각에 영업", "시간대 중 영업"], horizontal=True)
+    if time_filter != "검색 설정대로":
+        from opening_hours import DAY_KO
+        from result_table import schedule_view
+        f1, f2 = st.columns([1, 3])
+        today = datetime.now(get_tz(st.session_state["last_tz"])).weekday()
+        day = f1.selectbox("요일", range(7), index=today, format_func=DAY_KO.__getitem__)
+        if time_filter == "지정 시각에 영업":
+            t = f2.slider("시각", min_value=time(0, 0), max_value=time(23, 45), value=time(21, 0),
+                          step=timedelta(minutes=15), format="HH:mm")
+            df = schedule_view(st.session_state["last_all_df"], at=day * 86400 + t.hour * 3600 + t.minute * 60,
+                               matrix=st.session_state["last_week"])
+            st.caption(f"{DAY_KO[day]} {t:%H:%M}부터 15분 동안 영업하는 약국 {len(df)}곳 (영업여부 열은 지금 기준)")
+        else:
+            # 당일 00:00 ~ 익일 12:00 (15분 단위) → "오늘 밤" 같은 자정 넘는 시간대
+            labels = [f"{'익일 ' if m >= 1440 else ''}{m // 60 % 24:02d}:{m % 60:02d}" for m in range(0, 36 * 60 + 1, 15)]
+            a, b = f2.select_slider("시간대", options=labels, value=("18:00", "익일 06:00"))
+            whole = f1.checkbox("시간대 내내 영업", value=False)
+            start = day * 86400 + labels.index(a) * 900
+            end = day * 86400 + labels.index(b) * 900
+            if end <= start:
+                end = start + 900
+            df = schedule_view(st.session_state["last_all_df"], during=(start, end), how="all" if whole else "any",
+                               matrix=st.session_state["last_week"])
+            st.caption(f"{DAY_KO[day]} {a} ~ {b} {'내내' if whole else '중에'} 영업하는 약국 {len(df)}곳 "
+                       "(15분 단위, 영업여부 열은 지금 기준)")
 if df is None:
     st.caption("아직 검색 결과가 없어요. 주소 지정 또는 지도 클릭 후 ‘검색 실행’을 눌러주세요.")
 else:
-    cols = [c for c in DISPLAY_COLS if c in df.columns]
+    from result_table import with_links
+    from map_render import MAP_MODES, PHARMACY_MAP_COLS, frame_key, pharmacy_map, resolve_mode, show_map
+    view = with_links(df)
+    cols = [c for c in DISPLAY_COLS if c in view.columns]
     if df.empty:
         st.warning("반경 내 결과가 없습니다. 반경을 넓혀보거나 중심을 옮겨보세요.")
-        st.dataframe(pd.DataFrame(columns=cols), use_container_width=True)
+        st.dataframe(view[cols], use_container_width=True)
     else:
-        st.dataframe(df[cols], use_container_width=True)
+        st.dataframe(view[cols], use_container_width=True)
 
         lat, lon = st.session_state["last_center"] or DEFAULT_CENTER
         r = st.session_state["last_radius"] or 1200
-
-        fmap = folium.Map(location=(lat, lon), zoom_start=14, control_scale=True)
-        folium.Circle((lat, lon), radius=r, color="blue", fill=False, opacity=0.35).add_to(fmap)
-        folium.Marker((lat, lon), tooltip="검색 중심", icon=folium.Icon(icon="home")).add_to(fmap)
-
-        for _, row in df.iterrows():
-            color = "green" if row.get("영업여부") == "영업중" else ("red" if row.get("영업여부") == "영업종료" else "blue")
-            folium.Marker(
-                (row["위도"], row["경도"]),
-                tooltip=f"{row.get('이름','(이름 없음)')} • {row.get('거리(m)','?')}m • {row.get('영업여부','?')}",
-                popup=(row.get("이름","") + (f"<br/>{row.get('영업시간')}" if row.get("영업시간") else "")),
-                icon=folium.Icon(color=color)
-            ).add_to(fmap)
-
-        st_folium(fmap, height=440, use_container_width=True)
+        map_mode = st.radio("지도 표시", list(MAP_MODES), format_func=MAP_MODES.get, horizontal=True)
+        map_mode = resolve_mode(map_mode, len(df))
+        key = frame_key(df, PHARMACY_MAP_COLS, lat, lon, r, map_mode)
+        show_map(key, lambda: pharmacy_map(df, lat, lon, r, map_mode), height=440, component=APP)
+
+# ---------------- 5) Coverage analysis ----------------
+st.markdown("### 5) 약국 사각지대 분석")
+with st.expander("🌙 지정한 시각에 영업중인 가장 가까운 약국까지 거리 (격자)"):
+    from hospital_data import KOREA_LOCATIONS
+    with st.form("coverage"):
+        c1, c2 = st.columns(2)
+        with c1:
+            area = st.radio("영역", ["현재 검색 중심", "지역 선택"], horizontal=True)
+            region = st.selectbox("지역", list(KOREA_LOCATIONS), index=list(KOREA_LOCATIONS).index("안성시"))
+            half_km = st.slider("중심에서 사방 (km)", 1, 20, 5)
+        with c2:
+            day = st.selectbox("요일", list("월화수목금토일"), index=6)
+            at_time = st.time_input("시각", value=datetime.strptime("22:00", "%H:%M").time(), step=1800)
+            step_m = st.select_slider("격자 간격 (m)", [50, 100, 200, 400], value=100)
+            include_unknown = st.checkbox("영업시간 표기 없는 약국도 포함", value=False)
+        cov_submit = st.form_submit_button("분석 실행")
+    if cov_submit:
+        params = dict(half_km=half_km, at=f"{day} {at_time:%H:%M}", step_m=step_m, include_unknown=include_unknown,
+                      backend=backend, hedged=hedged)
+        if area == "지역 선택":
+            params["region"] = region
+        else:
+            from pharmacy_coverage import expand_bbox
+            lat, lon = search_center
+            params["bbox"] = list(expand_bbox((lat, lon, lat, lon), half_km * 1000))
+        try:
+            with st.spinner("약국을 불러와 격자 거리를 계산하는 중..."):
+                st.session_state["last_coverage"] = client.coverage(**params)
+        except Exception as e:
+            st.error(f"분석 실패: {e}")
+    cov = st.session_state["last_coverage"]
+    if cov is not None:
+        from pharmacy_coverage import coverage_map, from_payload, to_frame
+        from map_render import frame_key, show_map
+        result = from_payload(cov)
+        sm, tm = cov["summary"], cov["timing"]
+        st.caption(f"{cov['when']} • 격자 {sm['cells']}점 ({cov['step_m']:g}m) • "
+                   f"약국 {sm['pharmacies']}곳 중 영업중 {sm['open_pharmacies']}곳 • "
+                   f"불러오기 {tm.get('fetch_s', 0):.2f}s • 계산 {tm['total_s']:.2f}s")
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("중앙값", f"{sm.get('median_m', float('nan')):.0f} m")
+        m2.metric("상위 10%", f"{sm.get('p90_m', float('nan')):.0f} m")
+        m3.metric("1km 안", f"{sm['within_1000m']:.0%}")
+        m4.metric(f"{cov['margin_m']:g}m 밖", f"{sm['beyond_margin']}점")
+        grid = to_frame(result)
+        show_map(frame_key(grid, ["거리(m)"], cov["bbox"], cov["when"]), lambda: coverage_map(result), height=520,
+                 component=APP)
+        d1, d2 = st.columns(2)
+        d1.download_button("CSV 다운로드", grid.to_csv(index=False).encode("utf-8-sig"),
+                           file_name="pharmacy_coverage.csv", mime="text/csv")
+        try:
+            import io
+            buf = io.BytesIO()
+            grid.to_parquet(buf, index=False)
+            d2.download_button("Parquet 다운로드", buf.getvalue(), file_name="pharmacy_coverage.parquet",
+                               mime="application/octet-stream")
+        except ImportError:
+            d2.caption("Parquet 저장에는 pyarrow 가 필요합니다.")
+
+# ---------------- 6) Diagnostics ----------------
+with st.expander("🔧 진단: Overpass 미러 상태 / 캐시"):
+    diag = client.stats()
+    st.dataframe(diag.pop("mirrors"), use_container_width=True)
+    st.json(diag)
+    from map_render import RENDER_CACHE
+    st.json({"render_cache": RENDER_CACHE.stats()})
+
+with st.expander("⏱️ 진단: 단계별 소요 시간"):
+    # 기록은 항상 하고(가벼움), 표는 켰을 때만 만든다
+    if st.checkbox("단계별 소요 시간 보기", value=False):
+        last = st.session_state["last_timings"]
+        if last:
+            service = last.get("service") or {"total_ms": 0, "stages": []}
+            st.caption(f"마지막 검색: 화면 전체 {last['total_ms']:.0f}ms • 서비스 처리 {service['total_ms']:.0f}ms")
+            st.dataframe([dict(구분="화면", **s) for s in last["stages"]] +
+                         [dict(구분="서비스", **s) for s in service["stages"]], use_container_width=True)
+        else:
+            st.caption("아직 검색 기록이 없습니다.")
+        st.markdown("**단계별 누적 (p50 / p95 / p99, 최근 샘플 기준)**")
+        st.dataframe(STAGES.snapshot(APP) + client.stats()["stages"], use_container_width=True)
+        st.download_button("Prometheus 형식으로 내보내기", client.metrics(), file_name="search_stages.prom",
+                           mime="text/plain")
+        st.caption("HTTP 서비스 모드에서는 서비스 쪽 히스토그램만 내보냅니다 (서버 GET /metrics 와 같음).")
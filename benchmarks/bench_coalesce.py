@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# 동시 검색 합치기 벤치마크 (네트워크 없음)
+# - 강남역 주변에서 N개 세션이 거의 동시에 반경 검색 → upstream 호출 수 / 세션별 지연
+# - 가짜 Overpass: 고정 지연 + 쿼리(around / bbox)에 맞는 합성 약국만 반환
+# - 합친 결과가 단독 around 검색(중심 거리 기준)과 같은지 확인
+# 실행: python -m benchmarks.bench_coalesce [세션 수] [upstream 지연(초)]
+
+import random
+import re
+import sys
+import threading
+import time
+
+from haversine import haversine
+
+from overpass_coalesce import Coalescer, within
+
+GANGNAM = (37.4979, 127.0276)
+
+
+def synthetic_pharmacies(n=3000, seed=11):
+    rnd = random.Random(seed)
+    return [{"type": "node", "id": i, "lat": GANGNAM[0] + rnd.uniform(-0.05, 0.05),
+             "lon": GANGNAM[1] + rnd.uniform(-0.06, 0.06), "tags": {"name": f"약국{i}"}} for i in range(n)]
+
+
+def fake_fetch(pharmacies, latency, calls):
+    around = re.compile(r"\(around:(\d+),([-\d.]+),([-\d.]+)\)")
+    bbox = re.compile(r"\(([-\d.]+),([-\d.]+),([-\d.]+),([-\d.]+)\);")
+
+    def fetch(query):
+        calls.append(query)
+        time.sleep(latency)
+        m = around.search(query)
+        if m:
+            r, lat, lon = float(m.group(1)), float(m.group(2)), float(m.group(3))
+            els = [p for p in pharmacies if haversine((lat, lon), (p["lat"], p["lon"]), unit="m") <= r]
+        else:
+            s, w, n, e = map(float, bbox.search(query).groups())
+            els = [p for p in pharmacies if s <= p["lat"] <= n and w <= p["lon"] <= e]
+        return {"elements": els}, "fake", None
+    return fetch
+
+
+def run(sessions=30, latency=0.5, window=0.15, seed=3):
+    rnd = random.Random(seed)
+    pharmacies = synthetic_pharmacies()
+    # 같은 동네(강남역 ±1km)에서 0.3초 안에 흩어져 도착, 일부는 완전히 같은 검색
+    searches = []
+    for i in range(sessions):
+        if i % 5 == 0 and searches:
+            searches.append(searches[-1])
+        else:
+            searches.append((round(GANGNAM[0] + rnd.uniform(-0.01, 0.01), 4),
+                             round(GANGNAM[1] + rnd.uniform(-0.01, 0.01), 4),
+                             rnd.choice([500, 1000, 1500])))
+    delays = [rnd.uniform(0, 0.3) for _ in searches]
+
+    out = {"sessions": sessions, "upstream_latency_s": latency}
+    for label, w in (("direct", 0), ("coalesced", window)):
+        calls, results, lat_s = [], [None] * sessions, [0.0] * sessions
+        co = Coalescer(window=w)
+        fetch = fake_fetch(pharmacies, latency, calls)
+
+        def one(i):
+            time.sleep(delays[i])
+            t0 = time.perf_counter()
+            results[i] = co.search(*searches[i], fetch)[0]
+            lat_s[i] = time.perf_counter() - t0
+
+        threads = [threading.Thread(target=one, args=(i,)) for i in range(sessions)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        out[f"{label}_upstream_calls"] = len(calls)
+        out[f"{label}_p50_s"] = sorted(lat_s)[len(lat_s) // 2]
+        out[f"{label}_max_s"] = max(lat_s)
+        if label == "coalesced":
+            out["stats"] = co.stats()
+            expected = [within({"elements": pharmacies}, *s) for s in searches]
+            out["mismatched_sessions"] = sum(
+                1 for a, b in zip(results, expected)
+                if sorted(e["id"] for e in a["elements"]) != sorted(e["id"] for e in b["elements"]))
+    return out
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    for k, v in run(n, latency).items():
+        print(f"{k:>24}: {v:.3f}" if isinstance(v, float) else f"{k:>24}: {v}")
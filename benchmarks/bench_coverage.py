@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# 사각지대 분석 벤치마크: 시 단위 영역(기본 30km x 30km) 100m 격자, 약국 n곳 (합성 데이터, 네트워크 없음)
+# - GridIndex 최근접 탐색 vs 격자점 x 영업중 약국 전수 비교(numpy, 청크) — 결과 일치 확인
+# 실행: python -m benchmarks.bench_coverage [약국 수] [영역 km] [격자 m]
+
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.bench_result_table import CENTER, synthetic_elements
+from pharmacy_coverage import analyze, expand_bbox, parse_when, summary, to_frame
+
+
+def brute_force(result, elements_open):
+    lats, lons = result["lats"], result["lons"]
+    plat = np.array([p["lat"] for p in elements_open])
+    plon = np.array([p["lon"] for p in elements_open])
+    from pharmacy_coverage import Projection
+    bb = result["bbox"]
+    proj = Projection((bb[0] + bb[2]) / 2, (bb[1] + bb[3]) / 2)
+    px, py = proj.xy(plat, plon)
+    glon, glat = np.meshgrid(lons, lats)
+    gx, gy = proj.xy(glat.ravel(), glon.ravel())
+    out = np.empty(gx.size)
+    for a in range(0, gx.size, 4096):
+        d = np.hypot(gx[a:a + 4096, None] - px[None], gy[a:a + 4096, None] - py[None])
+        out[a:a + 4096] = d.min(axis=1)
+    out[out > result["margin_m"]] = np.nan
+    return np.rint(out).reshape(result["shape"])
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    km = float(sys.argv[2]) if len(sys.argv) > 2 else 30
+    step = float(sys.argv[3]) if len(sys.argv) > 3 else 100
+    bbox = expand_bbox((CENTER[0], CENTER[1], CENTER[0], CENTER[1]), km * 500)
+    elements = synthetic_elements(n)
+    sec = parse_when("토 22:00")
+
+    t0 = time.perf_counter()
+    result = analyze(elements, bbox, sec, step_m=step)
+    t_grid = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ref = brute_force(result, result["open"])
+    t_brute = time.perf_counter() - t0
+    mismatch = int((~np.isclose(result["dist"], ref, equal_nan=True, atol=1)).sum())
+    t0 = time.perf_counter()
+    df = to_frame(result)
+    t_frame = time.perf_counter() - t0
+
+    print(f"약국 {n}곳 (영업중 {len(result['open'])}) • 격자 {result['shape'][0]}x{result['shape'][1]} = {df.shape[0]}점")
+    print(f"analyze        {t_grid:7.3f}s  {result['timing']}")
+    print(f"brute force    {t_brute:7.3f}s  (최근접 계산만)")
+    print(f"to_frame       {t_frame:7.3f}s")
+    print(f"mismatch       {mismatch}")
+    print(summary(result))
+
+
+if __name__ == "__main__":
+    main()
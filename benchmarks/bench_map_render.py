@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# 결과 지도 렌더링 벤치마크: 개별 folium.Marker vs GeoJSON 레이어 + 클러스터 (+ 렌더 캐시 hit)
+# - 마커 수별 지도 생성+HTML 렌더 시간과 HTML 크기
+# 실행: python -m benchmarks.bench_map_render [마커 수 ...]
+
+import sys
+import time
+
+from benchmarks.bench_result_table import CENTER, synthetic_elements
+from map_render import PHARMACY_MAP_COLS, RenderCache, frame_key, pharmacy_map
+from result_table import build_table, evaluate_hours
+
+
+def result_frame(n):
+    from datetime import datetime
+    df = build_table(synthetic_elements(n), *CENTER)
+    evaluate_hours(df, datetime(2024, 1, 3, 18, 45))
+    return df
+
+
+def run(n):
+    df = result_frame(n)
+    out = {"markers": n}
+    for mode in ("markers", "geojson"):
+        cache = RenderCache()
+        key = frame_key(df, PHARMACY_MAP_COLS, *CENTER, 3000, mode)
+        t0 = time.perf_counter()
+        html, _ = cache.get(key, lambda: pharmacy_map(df, *CENTER, 3000, mode))
+        out[f"{mode}_s"] = time.perf_counter() - t0
+        out[f"{mode}_kb"] = len(html.encode("utf-8")) / 1024
+        t0 = time.perf_counter()
+        key = frame_key(df, PHARMACY_MAP_COLS, *CENTER, 3000, mode)
+        cache.get(key, lambda: pharmacy_map(df, *CENTER, 3000, mode))
+        out[f"{mode}_cached_s"] = time.perf_counter() - t0
+    return out
+
+
+if __name__ == "__main__":
+    for n in [int(a) for a in sys.argv[1:]] or [10, 100, 1000, 5000]:
+        for k, v in run(n).items():
+            print(f"{k:>18}: {v:.4f}" if isinstance(v, float) else f"{k:>18}: {v}")
+        print()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# opening_hours 벤치마크: is_open_now(행마다 파싱) vs open_status_many(컴파일 캐시 + 일괄 평가)
+# 실행: python -m benchmarks.bench_opening_hours [행 수]
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from opening_hours import compile_hours, is_open_now, open_status_many
+
+COMMON = [
+    "Mo-Fr 09:00-19:00; Sa 09:00-13:00",
+    "Mo-Fr 09:00-18:30; Sa 09:00-14:00",
+    "Mo-Fr 08:30-20:00; Sa 09:00-15:00; Su off",
+    "Mo-Sa 09:00-21:00",
+    "Mo-Su 09:00-22:00",
+    "Mo-Fr 09:00-19:00; Sa 09:00-13:00; PH off",
+    "24/7",
+    "Mo-Su 22:00-02:00",
+    "Mo,We,Fr 09:00-18:00; Tu,Th 09:00-20:00",
+    "09:00-18:00",
+    "Mo-Fr 09:00-12:30,13:30-18:00",
+    "",
+    "by appointment",
+]
+
+
+def synthetic_hours(n, unique_ratio=0.1, seed=42):
+    """흔한 문자열 위주 + 일부 고유 문자열(긴 꼬리)"""
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        if rnd.random() < unique_ratio:
+            a, b = rnd.randint(6, 11), rnd.randint(17, 23)
+            out.append(f"Mo-Fr {a:02d}:{rnd.choice(['00','30'])}-{b:02d}:00; Sa {a:02d}:00-{rnd.randint(12,18)}:00")
+        else:
+            out.append(rnd.choice(COMMON))
+    return out
+
+
+def sample_times(k=50, seed=7):
+    rnd = random.Random(seed)
+    base = datetime(2024, 1, 1)  # 월요일
+    return [base + timedelta(minutes=rnd.randrange(7 * 1440)) for _ in range(k)]
+
+
+def run(n=100_000):
+    hours = synthetic_hours(n)
+    now = datetime(2024, 1, 3, 18, 45)
+
+    t0 = time.perf_counter()
+    legacy = [is_open_now(h, now) for h in hours]
+    t_legacy = time.perf_counter() - t0
+
+    compile_hours.cache_clear()
+    t0 = time.perf_counter()
+    batch = open_status_many(hours, now)
+    t_cold = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    open_status_many(hours, now)
+    t_warm = time.perf_counter() - t0
+
+    # 동작 동일성 확인 (초 단위 시각 기준)
+    mismatches = sum(1 for a, b in zip(legacy, batch) if a != b)
+    for ts in sample_times():
+        mismatches += sum(1 for h, b in zip(hours[:2000], open_status_many(hours[:2000], ts)) if is_open_now(h, ts) != b)
+
+    return {
+        "rows": n,
+        "unique_strings": len(set(hours)),
+        "legacy_s": t_legacy,
+        "batch_cold_s": t_cold,
+        "batch_warm_s": t_warm,
+        "speedup_cold": t_legacy / t_cold if t_cold else None,
+        "speedup_warm": t_legacy / t_warm if t_warm else None,
+        "mismatches": mismatches,
+    }
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for k, v in run(n).items():
+        print(f"{k:>15}: {v:.4f}" if isinstance(v, float) else f"{k:>15}: {v}")
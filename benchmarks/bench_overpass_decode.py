@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Overpass 응답 디코딩 벤치마크: json.loads(중첩 dict, 현재 경로) vs decode_overpass(__slots__ 레코드)
+# - 응답 파일을 주면 그대로, 없으면 지정 크기(MB)의 합성 응답(실제와 비슷한 태그 구성)을 만들어 측정
+# - 파싱 시간(최소값)과 tracemalloc 최대 메모리 / 파싱 후 남는 메모리
+# 실행: python -m benchmarks.bench_overpass_decode [1 10 50 | 응답.json ...]
+
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from overpass_decode import decode_overpass
+
+EXTRA_TAGS = {
+    "amenity": "pharmacy", "healthcare": "pharmacy", "dispensing": "yes",
+    "addr:city": "서울특별시", "addr:street": "세종대로", "addr:postcode": "04524",
+    "source": "survey", "check_date": "2024-05-01", "wheelchair": "limited",
+}
+
+
+def synthetic_response(size_mb, seed=5):
+    """약 size_mb 크기의 Overpass 'out center tags' 응답 (bytes)"""
+    rnd = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    parts, size, i = [], 0, 0
+    while size < target:
+        i += 1
+        tags = dict(EXTRA_TAGS, name=f"약국{i}", opening_hours=rnd.choice(
+            ["Mo-Fr 09:00-19:00; Sa 09:00-13:00", "Mo-Su 09:00-22:00", "24/7"]))
+        tags["addr:housenumber"] = str(rnd.randint(1, 300))
+        if rnd.random() < 0.5:
+            tags["phone"] = f"+82 2-{rnd.randint(100, 999)}-{rnd.randint(1000, 9999)}"
+        lat, lon = 37 + rnd.random(), 127 + rnd.random()
+        if rnd.random() < 0.8:
+            el = {"type": "node", "id": i, "lat": lat, "lon": lon, "tags": tags}
+        else:
+            el = {"type": "way", "id": i, "center": {"lat": lat, "lon": lon},
+                  "nodes": [rnd.randint(1, 10**10) for _ in range(8)], "tags": tags}
+        s = json.dumps(el, ensure_ascii=False)
+        parts.append(s)
+        size += len(s.encode("utf-8")) + 2
+    head = '{"version": 0.6, "generator": "Overpass API", "osm3s": {"timestamp_osm_base": "2024-05-01T00:00:00Z"}, "elements": [\n'
+    return (head + ",\n".join(parts) + "\n]}").encode("utf-8")
+
+
+def measure(fn, raw, repeat=3):
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        out = fn(raw)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+        del out
+    gc.collect()
+    tracemalloc.start()
+    out = fn(raw)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    n = len(out.get("elements", []))
+    del out
+    return {"seconds": best, "peak_mb": peak / 2**20, "retained_mb": retained / 2**20, "elements": n}
+
+
+def run(raw, label):
+    cur = measure(json.loads, raw)
+    new = measure(decode_overpass, raw)
+    return {
+        "input": label,
+        "size_mb": len(raw) / 2**20,
+        "elements": cur["elements"],
+        "json_loads_s": cur["seconds"],
+        "decode_s": new["seconds"],
+        "json_loads_peak_mb": cur["peak_mb"],
+        "decode_peak_mb": new["peak_mb"],
+        "json_loads_retained_mb": cur["retained_mb"],
+        "decode_retained_mb": new["retained_mb"],
+    }
+
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:] or ["1", "10", "50"]:
+        if os.path.exists(arg):
+            with open(arg, "rb") as f:
+                raw, label = f.read(), arg
+        else:
+            raw, label = synthetic_response(float(arg)), f"synthetic {arg}MB"
+        for k, v in run(raw, label).items():
+            print(f"{k:>22}: {v:.3f}" if isinstance(v, float) else f"{k:>22}: {v}")
+        print()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# Overpass 쿼리 벤치마크: full(12개 구문, 모든 태그) vs compact(nwr 병합, 필요한 태그만)
+# 응답 크기(bytes), 전체 소요시간, 요소 수를 비교한다. 실제 Overpass 서버(또는 호환 서버)가 필요.
+# 실행: python -m benchmarks.bench_overpass_query [--endpoint URL] [--radius 1200] [--repeat 2]
+
+import argparse
+import json
+import time
+
+import http_pool
+from overpass_query import build_overpass_query, normalize_elements
+
+UA = {"User-Agent": "pharmacy-open-now/1.0 (benchmark)"}
+CENTERS = {
+    "서울시청": (37.5663, 126.9779),
+    "강남역": (37.4979, 127.0276),
+    "부산 서면": (35.1578, 129.0600),
+    "남양주시청": (37.6360, 127.2165),
+}
+
+
+def measure(endpoint, query, timeout=90):
+    t0 = time.perf_counter()
+    r = http_pool.post(endpoint, data={"data": query}, headers=UA, timeout=timeout)
+    elapsed = time.perf_counter() - t0
+    r.raise_for_status()
+    data = normalize_elements(r.json())
+    return {"bytes": len(r.content), "seconds": elapsed, "elements": len(data.get("elements", []))}
+
+
+def run(endpoint, radius=1200, repeat=2, pause=2.0):
+    rows = []
+    for label, (lat, lon) in CENTERS.items():
+        for compact in (False, True):
+            q = build_overpass_query(lat, lon, radius, compact=compact)
+            best = None
+            for _ in range(repeat):
+                m = measure(endpoint, q)
+                best = m if best is None or m["seconds"] < best["seconds"] else best
+                time.sleep(pause)  # 공용 서버 예의상 간격
+            rows.append(dict(center=label, mode="compact" if compact else "full", query_chars=len(q), **best))
+    return rows
+
+
+def summarize(rows):
+    out = []
+    for label in CENTERS:
+        full = next(r for r in rows if r["center"] == label and r["mode"] == "full")
+        comp = next(r for r in rows if r["center"] == label and r["mode"] == "compact")
+        out.append({
+            "center": label,
+            "full_bytes": full["bytes"], "compact_bytes": comp["bytes"],
+            "bytes_ratio": comp["bytes"] / full["bytes"] if full["bytes"] else None,
+            "full_s": round(full["seconds"], 3), "compact_s": round(comp["seconds"], 3),
+            "elements": (full["elements"], comp["elements"]),
+        })
+    return out
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--endpoint", default="https://overpass-api.de/api/interpreter")
+    ap.add_argument("--radius", type=int, default=1200)
+    ap.add_argument("--repeat", type=int, default=2)
+    args = ap.parse_args()
+    rows = run(args.endpoint, args.radius, args.repeat)
+    print(json.dumps(summarize(rows), ensure_ascii=False, indent=2))
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# 결과 표 생성 벤치마크: 행마다 dict + 스칼라 haversine(이전 app.py) vs result_table(열 단위)
+# 실행: python -m benchmarks.bench_result_table [요소 수]
+
+import random
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+from haversine import haversine
+
+from benchmarks.bench_opening_hours import synthetic_hours
+from opening_hours import compile_hours, next_change_many, open_status_many
+from overpass_query import element_point
+from result_table import build_table, evaluate_hours, result_view, with_links
+
+CENTER = (37.5663, 126.9779)
+
+
+def synthetic_elements(n, seed=3):
+    rnd = random.Random(seed)
+    hours = synthetic_hours(n, seed=seed)
+    els = []
+    for i, h in enumerate(hours):
+        tags = {"amenity": "pharmacy", "name": f"약국{i}", "opening_hours": h}
+        if rnd.random() < 0.5:
+            tags["phone"] = f"02-{rnd.randint(100, 999)}-{rnd.randint(1000, 9999)}"
+        lat, lon = CENTER[0] + rnd.uniform(-0.2, 0.2), CENTER[1] + rnd.uniform(-0.2, 0.2)
+        if rnd.random() < 0.8:
+            els.append({"type": "node", "id": i, "lat": lat, "lon": lon, "tags": tags})
+        else:
+            els.append({"type": "way", "id": i, "center": {"lat": lat, "lon": lon}, "tags": tags})
+    return els
+
+
+def legacy_table(elements, lat, lon, now_local, open_only):
+    # 이전 app.py 의 행 생성 + 평가 + 정렬
+    rows = []
+    for el in elements:
+        p = element_point(el)
+        if p is None: continue
+        plat, plon = p
+        tags = el.get("tags", {}) or {}
+        name = tags.get("name") or tags.get("alt_name") or "(이름 없음)"
+        rows.append({
+            "이름": name,
+            "거리(m)": round(haversine((lat, lon), (plat, plon), unit="m")),
+            "영업여부": "확인필요",
+            "다음변경": "",
+            "영업시간": compile_hours(tags.get("opening_hours", "")).display,
+            "전화": tags.get("phone") or tags.get("contact:phone") or "",
+            "위도": plat,
+            "경도": plon,
+            "네이버지도": f"https://map.naver.com/v5/search/{name}/place",
+            "카카오맵": f"https://map.kakao.com/?q={name}",
+        })
+    df = pd.DataFrame(rows, columns=["이름","거리(m)","영업여부","다음변경","영업시간","전화","위도","경도","네이버지도","카카오맵"])
+    hours = df["영업시간"].tolist()
+    df["영업여부"] = [{True: "영업중", False: "영업종료", None: "확인필요"}[o] for o, _ in open_status_many(hours, now_local)]
+    next_change_many(hours, now_local)
+    if open_only:
+        df = df[df["영업여부"].astype(str) == "영업중"]
+    order = {"영업중": 0, "확인필요": 1, "영업종료": 2}
+    df = df.assign(__ord__=df["영업여부"].map(order).fillna(9))
+    return df.sort_values(["__ord__", "거리(m)"]).drop(columns="__ord__").reset_index(drop=True)
+
+
+def columnar_table(elements, lat, lon, now_local, open_only):
+    df = build_table(elements, lat, lon)
+    evaluate_hours(df, now_local)
+    return with_links(result_view(df, open_only))
+
+
+def timed(fn, *args, repeat=3):
+    best, out = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, out
+
+
+def run(n=20_000):
+    elements = synthetic_elements(n)
+    now = datetime(2024, 1, 3, 18, 45)
+    compile_hours("")  # 캐시 상태를 양쪽에 동일하게
+    t_legacy, a = timed(legacy_table, elements, *CENTER, now, False)
+    t_new, b = timed(columnar_table, elements, *CENTER, now, False)
+    cols = ["이름", "거리(m)", "영업여부", "영업시간", "전화", "네이버지도"]
+    # 같은 거리의 행은 순서가 다를 수 있어 (영업여부, 거리, 이름) 으로 맞춰 비교
+    key = ["영업여부", "거리(m)", "이름"]
+    a = a[cols].astype(str).sort_values(key).reset_index(drop=True)
+    b = b[cols].astype(str).sort_values(key).reset_index(drop=True)
+    mismatched_rows = int((a != b).any(axis=1).sum()) if len(a) == len(b) else abs(len(a) - len(b))
+    return {
+        "elements": n,
+        "legacy_s": t_legacy,
+        "columnar_s": t_new,
+        "speedup": t_legacy / t_new if t_new else None,
+        "mismatched_rows": mismatched_rows,
+    }
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [10, 1_000, 20_000]
+    for n in sizes:
+        for k, v in run(n).items():
+            print(f"{k:>15}: {v:.4f}" if isinstance(v, float) else f"{k:>15}: {v}")
+        print()
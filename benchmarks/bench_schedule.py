@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# 시각 필터 벤치마크: 슬라이더 위치마다 opening_hours 평가(open_status_many) vs 주간 슬롯 비트 검사(result_table)
+# - 일요일 00:00 ~ 23:45 (15분 간격, 96번) "지정 시각에 영업" + "일 18:00 ~ 익일 06:00 중 영업"
+# 실행: python -m benchmarks.bench_schedule [요소 수]
+
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from benchmarks.bench_result_table import CENTER, synthetic_elements
+from opening_hours import compile_hours, open_status_many, parse_range, week_second
+from result_table import build_table, open_at, open_during, schedule_matrix
+
+SUNDAY = datetime(2026, 10, 18)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    df = build_table(synthetic_elements(n), *CENTER)
+    hours = df["영업시간"].tolist()
+    times = [SUNDAY + timedelta(minutes=15 * i) for i in range(96)]
+
+    compile_hours.cache_clear()
+    t0 = time.perf_counter()
+    legacy = [np.array([o is True for o, _ in open_status_many(hours, t)]) for t in times]
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    matrix = schedule_matrix(df)  # 결과당 한 번 (app.py 는 session_state 에 보관)
+    bits = [open_at(df, week_second(t), matrix) for t in times]
+    t_bits = time.perf_counter() - t0
+    # 슬롯 경계 시각에서는 "슬롯 내내 영업" 과 "그 순간 영업" 이 다를 수 있음 (예: 21:00 에 닫는 곳)
+    diff = sum(int((a != b).sum()) for a, b in zip(legacy, bits))
+
+    start, end = parse_range("일 18:00-06:00")
+    t0 = time.perf_counter()
+    tonight = open_during(df, start, end, matrix=matrix)
+    t_range = time.perf_counter() - t0
+    compile_hours.cache_clear()
+    t0 = time.perf_counter()
+    tonight_legacy = np.zeros(len(df), dtype=bool)
+    for i in range(48):
+        tonight_legacy |= np.array([o is True for o, _ in
+                                    open_status_many(hours, SUNDAY + timedelta(hours=18, minutes=15 * i))])
+    t_range_legacy = time.perf_counter() - t0
+
+    print(f"rows {n} • 시각 96개")
+    print(f"open_status_many x96   {t_legacy:8.3f}s")
+    print(f"slot bits x96          {t_bits:8.3f}s  (x{t_legacy / t_bits:.0f})  경계 차이 {diff}행·시각")
+    print(f"tonight (evaluate x48) {t_range_legacy:8.3f}s  → {int(tonight_legacy.sum())}곳")
+    print(f"tonight (slot bits)    {t_range:8.3f}s  → {int(tonight.sum())}곳")
+
+
+if __name__ == "__main__":
+    main()
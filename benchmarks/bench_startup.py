@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# app.py 시작/첫 검색 지연 측정 (네트워크 없이)
+# - 매 측정마다 새 파이썬 프로세스에서 streamlit AppTest 로 app.py 를 실행
+#   import_s     : streamlit 자체 import
+#   first_run_s  : 첫 화면 렌더 (app.py 의 import 포함)
+#   first_search_s: "검색 실행" 한 번 (가짜 Overpass 응답, 시간대 조회/행 생성/정렬/지도 포함)
+# 실행: python -m benchmarks.bench_startup [--runs 5] [--elements 300]
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def synthetic_overpass(n, lat=37.5663, lon=126.9779, seed=1):
+    rnd = random.Random(seed)
+    hours = ["Mo-Fr 09:00-19:00; Sa 09:00-13:00", "Mo-Su 09:00-22:00", "24/7", ""]
+    els = []
+    for i in range(n):
+        tags = {"amenity": "pharmacy", "name": f"약국{i}", "opening_hours": rnd.choice(hours)}
+        els.append({"type": "node", "id": i + 1, "lat": lat + rnd.uniform(-0.01, 0.01),
+                    "lon": lon + rnd.uniform(-0.01, 0.01), "tags": tags})
+    return {"elements": els}
+
+
+class FakeResponse:
+    status_code = 200
+    reason = "OK"
+    headers = {}
+
+    def __init__(self, payload):
+        self.content = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.text = self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size=65536):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def child(n_elements):
+    # 이 함수는 새 프로세스 안에서만 실행
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    t0 = time.perf_counter()
+    import http_pool
+    from streamlit.testing.v1 import AppTest
+    import_s = time.perf_counter() - t0
+
+    payload = synthetic_overpass(n_elements)
+    http_pool.post = lambda *a, **k: FakeResponse(payload)
+
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+    t0 = time.perf_counter()
+    at.run()
+    first_run_s = time.perf_counter() - t0
+
+    for b in at.button:
+        if b.label == "검색 실행":
+            b.click()
+    t0 = time.perf_counter()
+    at.run()
+    first_search_s = time.perf_counter() - t0
+    errors = [str(e.value) for e in at.exception]
+    print(json.dumps({"import_s": import_s, "first_run_s": first_run_s,
+                      "first_search_s": first_search_s, "errors": errors}))
+
+
+def run(runs=5, n_elements=300):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child",
+                              "--elements", str(n_elements)],
+                             cwd=ROOT, capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    keys = ("import_s", "first_run_s", "first_search_s")
+    return {
+        "runs": runs,
+        "elements": n_elements,
+        **{f"{k}_median": statistics.median(s[k] for s in samples) for k in keys},
+        **{f"{k}_max": max(s[k] for s in samples) for k in keys},
+        "errors": sorted({e for s in samples for e in s["errors"]}),
+    }
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--elements", type=int, default=300)
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        child(args.elements)
+    else:
+        print(json.dumps(run(args.runs, args.elements), ensure_ascii=False, indent=2))
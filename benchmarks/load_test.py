@@ -0,0 +1,420 @@
+# -*- coding: utf-8 -*-
+# 동시 세션 부하 시험: 헤드리스 세션 여러 개가 실제 사용 흐름을 반복할 때 한 프로세스의 처리량/지연/자원
+# - 세션 = streamlit AppTest 하나(스크립트 실행 스레드 하나). 한 프로세스에서 N 개를 동시에 돌림
+#   → Streamlit 서버 프로세스 하나와 같은 조건 (세션별 스크립트 스레드 + 공유 캐시/서비스 + 하나의 GIL)
+#   웹소켓/브라우저 렌더 시간은 포함하지 않음 (서버 쪽 rerun 시간만)
+# - 흐름 (--app)
+#   pharmacy: 첫 화면 → 주소 검색 → 지도 클릭(pending_center) + 중심 확정 → 검색 → 시각 필터 → 영업중만 보기 끔 → 재검색
+#   hospital: 첫 화면 → 주소 입력 검색 → 거리 슬라이더 → 유형 필터 → 지도 방식
+#   단계 사이 생각 시간 --think(초, ±50%). 세션마다 다른 지역(KOREA_LOCATIONS)과 클릭 위치
+# - Overpass/Nominatim 은 대역 서버(upstream_stub.py)를 자식 프로세스로 띄워 사용 (--stub-latency/--stub-error-rate)
+#   --no-stub 이면 OVERPASS_URLS/NOMINATIM_URL 환경 변수 그대로 (이미 띄운 대역 서버 등)
+# - 결과: 단계별 rerun 지연 p50/p95/p99, 초당 rerun/흐름, CPU(프로세스 사용 코어 수), RSS 와 세션당 메모리
+#   (세션당 메모리 = 부하 중 최대 RSS - 세션 1개 워밍업 후 RSS, 를 세션 수로 나눔)
+# - --out 결과 JSON, --compare 기준선 JSON → p95 가 tolerance 이상 늘거나 처리량이 줄면 회귀, 종료 코드 1
+# 실행:
+#   python -m benchmarks.load_test --app pharmacy --sessions 20 --duration 60
+#   python -m benchmarks.load_test --app hospital --sessions 50 --ramp 10 --out load.json
+#   python -m benchmarks.load_test --app pharmacy --sessions 20 --compare load_baseline.json
+
+import argparse
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import defaultdict
+from datetime import time as dtime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS = {"pharmacy": "app.py", "hospital": "hospital_finder.py"}
+
+
+# ---------------- 대역 서버 ----------------
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_stub(latency=0.0, jitter=0.0, error_rate=0.0, errors="429,504"):
+    """upstream_stub.py 를 자식 프로세스로 (fixture 는 임시 폴더 → 전부 합성 응답). (proc, base_url)"""
+    port = free_port()
+    cmd = [sys.executable, os.path.join(ROOT, "upstream_stub.py"), "--port", str(port),
+           "--fixtures", tempfile.mkdtemp(prefix="stub-fixtures-"), "--latency", str(latency),
+           "--jitter", str(jitter), "--error-rate", str(error_rate), "--errors", errors, "--seed", "1"]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    proc.stdout.readline()  # 시작 메시지
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit("대역 서버가 시작되지 않았습니다")
+
+
+def use_stub(base_url):
+    # search_service/geocoding 을 import 하기 전에 설정해야 함 (모듈 상수)
+    os.environ["OVERPASS_URLS"] = f"{base_url}/api/interpreter"
+    os.environ["NOMINATIM_URL"] = f"{base_url}/search"
+    os.environ["NOMINATIM_RATE"] = "0"
+    os.environ["GEOCODE_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="geocode-"), "cache.sqlite")
+
+
+# ---------------- 자원 측정 ----------------
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource  # /proc 이 없으면 최대 RSS 로 대신
+    r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return r / (1024 * 1024) if sys.platform == "darwin" else r / 1024
+
+
+def cpu_s():
+    t = os.times()
+    return t.user + t.system
+
+
+class Sampler(threading.Thread):
+    """interval 초마다 RSS 와 CPU 사용률(코어 수) 기록"""
+
+    def __init__(self, interval=0.5):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._halt = threading.Event()
+
+    def run(self):
+        last_t, last_c = time.monotonic(), cpu_s()
+        while not self._halt.wait(self.interval):
+            t, c = time.monotonic(), cpu_s()
+            self.samples.append({"t": t, "rss_mb": rss_mb(), "cpu": (c - last_c) / max(t - last_t, 1e-9)})
+            last_t, last_c = t, c
+
+    def stop(self):
+        self._halt.set()
+        self.join()
+
+
+# ---------------- 동시 AppTest ----------------
+def share_runtime():
+    """AppTest 를 한 프로세스에서 동시에 돌리기 위한 준비 (서버 하나에서 세션들이 런타임을 공유하는 조건으로)
+    - AppTest 는 실행마다 Runtime 싱글턴을 목(mock)으로 바꾸고 끝나면 None 으로 되돌림
+      → 먼저 끝난 세션이 다른 세션 실행 중에 런타임을 지움 ("Runtime hasn't been created!")
+      공유 목 런타임을 한 번 설치하고 AppTest 쪽 교체는 막음
+    - 실행마다 새 ScriptCache → rerun 마다 스크립트를 다시 파싱. 스레드 여럿이 동시에 ast.parse 하면
+      CPython 3.11 에서 "AST constructor recursion depth mismatch" 로 빈 화면이 됨
+      서버처럼 ScriptCache 하나를 공유 (컴파일은 처음 한 번)"""
+    from unittest.mock import MagicMock
+
+    from streamlit import config
+    from streamlit.components.v2.component_manager import BidiComponentManager
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    registry = BidiComponentManager()
+    registry.discover_and_register_components(start_file_watching=False)
+    runtime.bidi_component_registry = registry
+    Runtime._instance = runtime
+    app_test.Runtime = type("Runtime", (), {"_instance": None})  # AppTest 의 설정/해제는 여기로
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+    # 실행마다 patch_config_options 로 켜고 되돌리는 값. 겹쳐 실행돼도 꺼지지 않게 미리 켜 둠
+    config.set_option("global.appTest", True)
+
+
+# ---------------- 흐름 ----------------
+class Session:
+    """AppTest 하나 + 단계별 rerun 시간 기록"""
+
+    def __init__(self, app, idx, record, think, seed):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_file(os.path.join(ROOT, APPS[app]), default_timeout=120)
+        self.idx = idx
+        self.record = record
+        self.think = think
+        self.rnd = random.Random(seed * 1000 + idx)
+        self.ok = True  # 마지막 rerun 성공 여부
+
+    def step(self, name, act=None):
+        if act is not None:
+            act(self.at)
+        t0 = time.perf_counter()
+        try:
+            self.at.run()
+            ok = not self.at.exception
+            if not ok:
+                self.record.error(f"session {self.idx} {name}: {self.at.exception[0].message}")
+        except Exception as e:  # 타임아웃 등
+            ok = False
+            self.record.error(f"session {self.idx} {name}: {type(e).__name__}: {e}")
+        self.ok = ok
+        self.record(name, time.perf_counter() - t0, ok)
+
+    def pause(self):
+        if self.think:
+            time.sleep(self.think * self.rnd.uniform(0.5, 1.5))
+
+
+def _click(label, where=None):
+    def act(at):
+        for b in (where(at) if where else at.button):
+            if label in b.label:
+                b.click()
+                return
+        raise LookupError(f"버튼 없음: {label}")
+    return act
+
+
+def _regions():
+    from hospital_data import KOREA_LOCATIONS
+    return sorted(k for k in KOREA_LOCATIONS if len(k) >= 3)
+
+
+def pharmacy_flow(s, first):
+    rnd = s.rnd
+    if first:
+        s.step("open")
+    region = rnd.choice(_regions())
+    s.pause()
+    s.step("address_search", lambda at: (at.text_input[0].input(region), _click("주소로 위치 지정")(at)))
+    lat, lon = s.at.session_state["last_center"] or (37.5663, 126.9779)
+    s.pause()
+    click = (lat + rnd.uniform(-0.01, 0.01), lon + rnd.uniform(-0.01, 0.01))
+    # st_folium 클릭은 헤드리스로 낼 수 없어 클릭 결과(pending_center)를 직접 넣음
+    s.step("map_click", lambda at: at.session_state.__setitem__("pending_center", click))
+    s.step("confirm_center", _click("이 위치로 검색 중심 확정"))
+    s.pause()
+    s.step("search", lambda at: (at.slider[0].set_value(rnd.choice([600, 1000, 1500, 2000])), _click("검색 실행")(at)))
+    if s.ok and s.at.session_state["last_all_df"] is not None:  # 검색 실패(오류 주입 등)면 결과 화면 없음
+        s.pause()
+        s.step("time_filter", lambda at: next(r for r in at.radio if r.label == "영업 시각 필터").set_value("지정 시각에 영업"))
+        s.step("time_filter_move", lambda at: next(sl for sl in at.slider if sl.label == "시각").set_value(
+            dtime(rnd.randrange(24), 15 * rnd.randrange(4))))
+        s.step("time_filter_off", lambda at: next(r for r in at.radio if r.label == "영업 시각 필터").set_value("검색 설정대로"))
+    s.pause()
+    s.step("search_all", lambda at: (at.checkbox[0].set_value(False), _click("검색 실행")(at)))
+    s.step("open_only_back", lambda at: at.checkbox[0].set_value(True))
+
+
+def hospital_flow(s, first):
+    rnd = s.rnd
+    side = lambda at: at.sidebar.button
+    if first:
+        s.step("open")
+        s.step("direct_input_mode", lambda at: at.sidebar.radio[0].set_value("🔍 주소 직접 입력"))
+    s.pause()
+    s.step("address_search", lambda at: (at.sidebar.text_input[0].input(rnd.choice(_regions())),
+                                         _click("병원 검색", side)(at)))
+    s.pause()
+    s.step("distance", lambda at: at.sidebar.slider[0].set_value(rnd.choice([10, 30, 60, 100])))
+    s.pause()
+    s.step("type_filter", lambda at: at.sidebar.checkbox[0].set_value(False))
+    s.step("type_filter_back", lambda at: at.sidebar.checkbox[0].set_value(True))
+    s.pause()
+    s.step("map_mode", lambda at: at.sidebar.radio[1].set_value(rnd.choice(["markers", "geojson", "auto"])))
+
+
+FLOWS = {"pharmacy": pharmacy_flow, "hospital": hospital_flow}
+
+
+# ---------------- 실행 ----------------
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.steps = []    # (시각, 단계, 초, 성공)
+        self.flows = 0
+        self.errors = []
+
+    def __call__(self, name, seconds, ok):
+        with self._lock:
+            self.steps.append((time.monotonic(), name, seconds, ok))
+
+    def flow_done(self):
+        with self._lock:
+            self.flows += 1
+
+    def error(self, msg):
+        with self._lock:
+            self.errors.append(msg)
+
+
+def run_session(app, idx, rec, think, seed, start_at, stop_at):
+    time.sleep(max(0.0, start_at - time.monotonic()))
+    try:
+        s = Session(app, idx, rec, think, seed)
+        first = True
+        while time.monotonic() < stop_at:
+            FLOWS[app](s, first)
+            first = False
+            rec.flow_done()
+    except Exception as e:  # 흐름이 화면 구성과 맞지 않는 경우 등 → 결과에 남기고 세션 종료
+        where = [f for f in traceback.extract_tb(e.__traceback__) if f.filename == __file__][-1]
+        rec.error(f"session {idx}: {type(e).__name__}: {e} (load_test.py:{where.lineno} {where.line})")
+
+
+def pct(values, q):
+    if not values:
+        return None
+    s = sorted(values)
+    return s[min(len(s) - 1, max(0, int(q * len(s) + 0.5) - 1))]
+
+
+def summarize(rec, t_start, t_end, sampler, base_rss, sessions):
+    steady = [x for x in rec.steps if t_start <= x[0] <= t_end]
+    dur = max(t_end - t_start, 1e-9)
+    times = [x[2] for x in steady]
+    by_step = defaultdict(list)
+    for _, name, sec, _ in steady:
+        by_step[name].append(sec)
+    samples = [s for s in sampler.samples if t_start <= s["t"] <= t_end] or sampler.samples
+    peak = max((s["rss_mb"] for s in sampler.samples), default=rss_mb())
+    ms = lambda v: round(v * 1000, 1) if v is not None else None
+    return {
+        "sessions": sessions,
+        "window_s": round(dur, 1),
+        "reruns": len(steady),
+        "failed_reruns": sum(1 for x in steady if not x[3]),
+        "reruns_per_s": round(len(steady) / dur, 2),
+        "flows": rec.flows,
+        "rerun_ms": {"p50": ms(pct(times, 0.5)), "p95": ms(pct(times, 0.95)), "p99": ms(pct(times, 0.99)),
+                     "max": ms(max(times, default=None))},
+        "steps": {k: {"count": len(v), "p50_ms": ms(pct(v, 0.5)), "p95_ms": ms(pct(v, 0.95))}
+                  for k, v in sorted(by_step.items())},
+        "cpu_cores_mean": round(statistics.mean(s["cpu"] for s in samples), 2) if samples else None,
+        "cpu_cores_max": round(max(s["cpu"] for s in samples), 2) if samples else None,
+        "rss_base_mb": round(base_rss, 1),
+        "rss_peak_mb": round(peak, 1),
+        "rss_per_session_mb": round(max(0.0, peak - base_rss) / max(1, sessions), 2),
+        "errors": rec.errors[:20],
+    }
+
+
+def compare(result, baseline, tolerance=0.25):
+    """p95 rerun 지연 / 세션당 메모리는 늘면, 처리량은 줄면 회귀"""
+    out = []
+    checks = [("rerun p95 ms", result["rerun_ms"]["p95"], baseline["rerun_ms"]["p95"], True),
+              ("reruns/s", result["reruns_per_s"], baseline["reruns_per_s"], False),
+              ("rss/session MB", result["rss_per_session_mb"], baseline["rss_per_session_mb"], True)]
+    for name, now, base, higher_is_worse in checks:
+        if not now or not base:
+            continue
+        ratio = now / base
+        bad = ratio > 1 + tolerance if higher_is_worse else ratio < 1 / (1 + tolerance)
+        out.append({"metric": name, "value": now, "baseline": base, "ratio": round(ratio, 2), "regression": bad})
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Streamlit 앱 동시 세션 부하 시험 (헤드리스, 대역 서버)")
+    ap.add_argument("--app", choices=sorted(APPS), default="pharmacy")
+    ap.add_argument("--sessions", type=int, default=10)
+    ap.add_argument("--duration", type=float, default=60, help="전체 부하 시간(초, 램프업 포함)")
+    ap.add_argument("--ramp", type=float, default=5, help="세션을 나눠 시작하는 시간(초)")
+    ap.add_argument("--think", type=float, default=0.5, help="단계 사이 생각 시간(초, ±50%%)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--no-stub", action="store_true", help="대역 서버를 띄우지 않음 (환경 변수 설정 사용)")
+    ap.add_argument("--stub-latency", type=float, default=0.2, help="대역 서버 응답 지연(초)")
+    ap.add_argument("--stub-jitter", type=float, default=0.2)
+    ap.add_argument("--stub-error-rate", type=float, default=0.0)
+    ap.add_argument("--out", help="결과 JSON 경로")
+    ap.add_argument("--compare", help="기준선 결과 JSON")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    args = ap.parse_args(argv)
+
+    stub = None
+    if not args.no_stub:
+        stub, base_url = start_stub(args.stub_latency, args.stub_jitter, args.stub_error_rate)
+        use_stub(base_url)
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    from streamlit import config, logger as st_logger
+    config.set_option("logger.level", "error")  # 세션마다 반복되는 폐기 예정 경고 등
+    st_logger.set_log_level("error")
+    share_runtime()
+
+    try:
+        # 워밍업: 세션 1개로 흐름 한 번 (import/지연 초기화/첫 렌더) → 기준 RSS
+        warm = Recorder()
+        run_session(args.app, -1, warm, 0, args.seed, 0, time.monotonic() + 0.001)
+        if warm.errors:
+            raise SystemExit(f"워밍업 실패: {warm.errors[0]}")
+        base_rss = rss_mb()
+
+        rec = Recorder()
+        sampler = Sampler()
+        sampler.start()
+        t0 = time.monotonic()
+        stop_at = t0 + args.duration
+        step = args.ramp / max(1, args.sessions)
+        threads = [threading.Thread(target=run_session, daemon=True,
+                                    args=(args.app, i, rec, args.think, args.seed, t0 + i * step, stop_at))
+                   for i in range(args.sessions)]
+        for t in threads:
+            t.start()
+        print(f"{args.app}: 세션 {args.sessions}개 • {args.duration:g}s (램프업 {args.ramp:g}s) • "
+              f"생각 시간 {args.think:g}s • 대역 서버 {'없음' if stub is None else base_url}", flush=True)
+        for t in threads:
+            t.join()
+        t_end = time.monotonic()
+        sampler.stop()
+        result = summarize(rec, t0 + args.ramp, min(t_end, stop_at), sampler, base_rss, args.sessions)
+        result.update(app=args.app, think_s=args.think, stub_latency_s=None if stub is None else args.stub_latency)
+        if stub is not None:
+            import requests
+            result["upstream"] = requests.get(f"{base_url}/_stub/stats", timeout=5).json()["endpoints"]
+    finally:
+        if stub is not None:
+            stub.terminate()
+
+    r = result
+    print(f"rerun {r['reruns']}회 ({r['reruns_per_s']}/s, 실패 {r['failed_reruns']}) • 흐름 {r['flows']}회 • "
+          f"p50 {r['rerun_ms']['p50']}ms • p95 {r['rerun_ms']['p95']}ms • p99 {r['rerun_ms']['p99']}ms")
+    print(f"CPU 평균 {r['cpu_cores_mean']} 코어 (최대 {r['cpu_cores_max']}) • RSS {r['rss_base_mb']} → "
+          f"{r['rss_peak_mb']} MB • 세션당 {r['rss_per_session_mb']} MB")
+    for name, v in r["steps"].items():
+        print(f"  {name:18s} {v['count']:5d}회  p50 {v['p50_ms']:>8}ms  p95 {v['p95_ms']:>8}ms")
+    for e in r["errors"]:
+        print("  오류:", e)
+
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            rows = compare(r, json.load(f), args.tolerance)
+        r["comparison"] = rows
+        for row in rows:
+            print(f"  {row['metric']:16s} {row['value']} (기준 {row['baseline']}, x{row['ratio']})"
+                  + ("  ← 회귀" if row["regression"] else ""))
+        status = 1 if any(row["regression"] for row in rows) else 0
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(r, f, ensure_ascii=False, indent=2)
+        print(f"저장: {args.out}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
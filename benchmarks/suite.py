@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+# 두 앱의 핫패스 벤치마크 모음 (네트워크 없음) + 기준선 비교
+# - 케이스마다 항목 수 10 / 1k / 100k 로 측정, 반복 실행의 중앙값·최소값(초)과 항목당 µs
+# - Overpass 응답은 합성 데이터가 기본. --recorded 로 실제 저장한 응답(.json, 파일 또는 폴더)을 주면
+#   그 요소들을 n 개가 되도록 반복(id 만 바꿈)해서 사용
+# - 결과는 JSON (--out). --compare 기준선.json 이면 케이스·크기별로 비교해 느려진 항목을 표시하고 종료 코드 1
+#   (중앙값이 기준선의 1+tolerance 배를 넘고, 차이가 --min-delta 초 이상일 때만 회귀로 봄 — 아주 짧은 케이스의 잡음 제외)
+# - 개별 마커 지도는 100k 에서 수 분이 걸려 기본 상한(max_n)을 둠. --no-limit 으로 해제
+# - http.*: 이 프로세스 안에 띄운 대역 서버(upstream_stub, http/https)에 주소 검색 n 번
+#   요청마다 새 연결(requests.get) vs 공용 연결 풀(http_pool) → 차이가 연결 수립(TCP/TLS) 절약분
+#   https 는 openssl 로 자체 서명 인증서를 만들 수 있을 때만 (없으면 건너뜀)
+# 실행:
+#   python -m benchmarks.suite --out bench.json
+#   python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+#   python -m benchmarks.suite --compare benchmarks/baseline.json --cases opening_hours,app.
+#   python -m benchmarks.suite --sizes 10,1000 --recorded recorded/
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.bench_opening_hours import synthetic_hours
+from benchmarks.bench_overpass_decode import EXTRA_TAGS
+from benchmarks.bench_result_table import CENTER
+
+SIZES = (10, 1000, 100_000)
+NOW = datetime(2024, 1, 3, 18, 45)  # 수요일 저녁 (영업 종료 직전/직후가 섞이는 시각)
+RADIUS = 3000
+
+
+# ---------------- 입력 데이터 ----------------
+def synthetic_raw_elements(n, seed=11):
+    """Overpass 'out center tags' 요소 n 개 (실제 응답과 비슷한 태그 구성)"""
+    rnd = random.Random(seed)
+    hours = synthetic_hours(n, seed=seed)
+    out = []
+    for i, h in enumerate(hours):
+        tags = dict(EXTRA_TAGS, name=f"약국{i}", opening_hours=h)
+        tags["addr:housenumber"] = str(rnd.randint(1, 300))
+        if rnd.random() < 0.5:
+            tags["phone"] = f"+82 2-{rnd.randint(100, 999)}-{rnd.randint(1000, 9999)}"
+        lat, lon = CENTER[0] + rnd.uniform(-0.03, 0.03), CENTER[1] + rnd.uniform(-0.03, 0.03)
+        if rnd.random() < 0.8:
+            out.append({"type": "node", "id": i, "lat": lat, "lon": lon, "tags": tags})
+        else:
+            out.append({"type": "way", "id": i, "center": {"lat": lat, "lon": lon}, "tags": tags})
+    return out
+
+
+def load_recorded(path):
+    """저장한 Overpass 응답(.json) 파일/폴더 → 요소 목록"""
+    files = [path] if os.path.isfile(path) else sorted(
+        os.path.join(path, f) for f in os.listdir(path) if f.endswith(".json"))
+    elements = []
+    for f in files:
+        with open(f, "rb") as fh:
+            elements.extend(el for el in json.load(fh).get("elements", []) if el.get("type") in ("node", "way", "relation"))
+    if not elements:
+        raise SystemExit(f"{path}: Overpass 요소가 없습니다")
+    return elements
+
+
+def response_bytes(n, recorded=None):
+    """요소 n 개짜리 Overpass 응답 본문 (recorded 가 있으면 그 요소를 반복)"""
+    if recorded:
+        elements = [dict(recorded[i % len(recorded)], id=i) for i in range(n)]
+    else:
+        elements = synthetic_raw_elements(n)
+    return json.dumps({"version": 0.6, "generator": "Overpass API", "elements": elements},
+                      ensure_ascii=False).encode("utf-8")
+
+
+def decoded_elements(n, recorded=None):
+    from overpass_decode import decode_overpass
+    from overpass_query import normalize_elements
+    return normalize_elements(decode_overpass(response_bytes(n, recorded)))["elements"]
+
+
+def region_queries(n, seed=13):
+    """병원 찾기 주소 입력 예시: 지역 DB 에 있는 이름/변형/세부 주소/없는 지역이 섞인 n 개"""
+    from hospital_data import KOREA_LOCATIONS
+    rnd = random.Random(seed)
+    names = list(KOREA_LOCATIONS)
+    out = []
+    for _ in range(n):
+        r = rnd.random()
+        name = rnd.choice(names)
+        if r < 0.4:
+            out.append(name)
+        elif r < 0.7:
+            out.append(f"{name} {rnd.choice(['중앙로', '역삼동', '공도읍', '시청'])} {rnd.randint(1, 200)}")
+        elif r < 0.85:
+            out.append(f" {name.replace('시', '')} ")
+        else:
+            out.append(f"없는동네{rnd.randint(1, 999)}")
+    return out
+
+
+def hospital_frame(n, seed=17):
+    """실제 병원 목록을 n 행으로 늘린 DataFrame (좌표는 전국 범위로 흩뿌림)"""
+    import pandas as pd
+    from hospital_data import HOSPITALS
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(n):
+        h = dict(HOSPITALS[i % len(HOSPITALS)])
+        h["name"] = f"{h['name']} {i}"
+        h["lat"], h["lon"] = rnd.uniform(34.8, 37.9), rnd.uniform(126.3, 129.3)
+        rows.append(h)
+    return pd.DataFrame(rows)
+
+
+# ---------------- 케이스 ----------------
+# 각 케이스: setup(n, ctx) → 측정할 인자 없는 함수. 준비 시간은 측정하지 않음
+def case_is_open_now(n, ctx):
+    from opening_hours import is_open_now
+    hours = synthetic_hours(n)
+    return lambda: [is_open_now(h, NOW) for h in hours]
+
+
+def case_open_status_many(n, ctx):
+    from opening_hours import compile_hours, open_status_many
+    hours = synthetic_hours(n)
+
+    def run():
+        compile_hours.cache_clear()  # 매 실행 cold (새 검색 결과 기준)
+        return open_status_many(hours, NOW)
+    return run
+
+
+def case_overpass_decode(n, ctx):
+    from overpass_decode import decode_overpass
+    from overpass_query import build_overpass_query, normalize_elements
+    raw = response_bytes(n, ctx["recorded"])
+
+    def run():
+        build_overpass_query(*CENTER, RADIUS)
+        return normalize_elements(decode_overpass(raw))
+    return run
+
+
+def case_build_table(n, ctx):
+    from opening_hours import compile_hours
+    from result_table import build_table, evaluate_hours, result_view
+    elements = decoded_elements(n, ctx["recorded"])
+
+    def run():
+        compile_hours.cache_clear()
+        df = build_table(elements, *CENTER)
+        evaluate_hours(df, NOW)
+        return result_view(df, False)
+    return run
+
+
+def case_schedule_filter(n, ctx):
+    from opening_hours import parse_when
+    from result_table import build_table, schedule_matrix, schedule_view
+    df = build_table(decoded_elements(n, ctx["recorded"]), *CENTER)
+    at = parse_when("일 21:00")
+
+    def run():
+        return schedule_view(df, at=at, matrix=schedule_matrix(df))
+    return run
+
+
+def case_pharmacy_map(n, ctx):
+    from map_render import pharmacy_map
+    from result_table import build_table, evaluate_hours
+    df = build_table(decoded_elements(n, ctx["recorded"]), *CENTER)
+    evaluate_hours(df, NOW)
+    return lambda: pharmacy_map(df, *CENTER, RADIUS, "geojson").get_root().render()
+
+
+def case_search_location(n, ctx):
+    from hospital_data import search_location_by_region
+    queries = region_queries(n)
+    return lambda: [search_location_by_region(q) for q in queries]
+
+
+def case_distance_filter(n, ctx):
+    from search_service import SearchService
+    service = SearchService()
+    service._hospitals = hospital_frame(n)
+    return lambda: service.hospitals(lat=CENTER[0], lon=CENTER[1], max_km=30)
+
+
+def _create_map(mode):
+    def case(n, ctx):
+        from hospital_finder import create_map  # 모듈 최상위의 st.set_page_config 는 런타임 밖에서 경고만 남김
+        df = hospital_frame(n)
+        return lambda: create_map(df, *CENTER, user_location=CENTER, mode=mode).get_root().render()
+    return case
+
+
+# ---------------- HTTP 연결 재사용 ----------------
+class Skip(Exception):
+    """이 환경에서 준비할 수 없는 케이스"""
+
+
+def _self_signed_cert():
+    d = tempfile.mkdtemp(prefix="bench-tls-")
+    cert, key = os.path.join(d, "cert.pem"), os.path.join(d, "key.pem")
+    try:
+        subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                        "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+                        "-keyout", key, "-out", cert], capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise Skip(f"인증서를 만들 수 없음: {e}")
+    return cert, key
+
+
+def _stub_server(ctx, tls):
+    """대역 서버를 백그라운드 스레드에서 (http/https 각각 한 번만). (base_url, verify)"""
+    servers = ctx.setdefault("stub_servers", {})
+    if tls in servers:
+        return servers[tls]
+    import asyncio
+    from upstream_stub import FixtureStore, Stub, serve, tls_context
+    verify, context = True, None
+    if tls:
+        cert, key = _self_signed_cert()
+        verify, context = cert, tls_context(cert, key)
+    stub = Stub(FixtureStore(tempfile.mkdtemp(prefix="bench-stub-")))
+    ready = threading.Event()
+    port = []
+
+    def on_ready(server):
+        port.append(server.sockets[0].getsockname()[1])
+        ready.set()
+
+    threading.Thread(target=lambda: asyncio.run(serve(stub, "127.0.0.1", 0, on_ready, context)), daemon=True).start()
+    if not ready.wait(10):
+        raise Skip("대역 서버가 시작되지 않음")
+    servers[tls] = (f"http{'s' if tls else ''}://127.0.0.1:{port[0]}/search", verify)
+    return servers[tls]
+
+
+def _http(pooled, tls=False):
+    def case(n, ctx):
+        import requests
+
+        import http_pool
+        url, verify = _stub_server(ctx, tls)
+        params = {"q": "서울특별시 중구", "format": "json", "limit": 1}
+        send = http_pool.get if pooled else requests.get  # requests.get 은 요청마다 새 세션 → 새 연결
+
+        def run():
+            for _ in range(n):
+                send(url, params=params, verify=verify, timeout=10).raise_for_status()
+        return run
+    return case
+
+
+def connection_savings(results):
+    """같은 n 의 http.new_connection* 과 http.pooled* 비교 → 요청당 절약 (ms)"""
+    by = {(r["case"], r["n"]): r for r in results}
+    rows = []
+    for (case, n), r in sorted(by.items()):
+        if not case.startswith("http.new_connection"):
+            continue
+        pooled = by.get((case.replace("new_connection", "pooled"), n))
+        if pooled is not None:
+            rows.append({"case": case.replace("http.new_connection", "http"), "n": n,
+                         "new_ms": r["median_s"] / n * 1000, "pooled_ms": pooled["median_s"] / n * 1000,
+                         "saved_ms": (r["median_s"] - pooled["median_s"]) / n * 1000})
+    return rows
+
+
+# (이름, setup, 최대 n)
+CASES = [
+    ("opening_hours.is_open_now", case_is_open_now, None),
+    ("opening_hours.open_status_many", case_open_status_many, None),
+    ("overpass.query_decode", case_overpass_decode, None),
+    ("app.build_table", case_build_table, None),
+    ("app.schedule_filter", case_schedule_filter, None),
+    ("app.pharmacy_map", case_pharmacy_map, None),
+    ("hospital.search_location_by_region", case_search_location, None),
+    ("hospital.distance_filter", case_distance_filter, None),
+    ("hospital.create_map.geojson", _create_map("geojson"), None),
+    ("hospital.create_map.markers", _create_map("markers"), 1000),
+    ("http.new_connection", _http(False), 1000),
+    ("http.pooled", _http(True), 1000),
+    ("http.new_connection.tls", _http(False, tls=True), 1000),
+    ("http.pooled.tls", _http(True, tls=True), 1000),
+]
+
+
+# ---------------- 실행 ----------------
+def measure(fn, repeat, budget):
+    """워밍업(임포트, 지연 초기화) 후 최소 1회, 최대 repeat 회. 누적 시간이 budget 초를 넘으면 중단
+
+    워밍업 한 번이 이미 budget 을 넘으면(100k 개별 마커 등) 그 값을 그대로 씀
+    """
+    t0 = time.perf_counter()
+    fn()
+    first = time.perf_counter() - t0
+    if first > budget:
+        return [first]
+    times = []
+    while len(times) < repeat:
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+        if sum(times) > budget:
+            break
+    return times
+
+
+def run_suite(names, sizes, repeat=5, budget=10.0, recorded=None, limit=True, log=print):
+    ctx = {"recorded": recorded}
+    results = []
+    for name, setup, max_n in CASES:
+        if name not in names:
+            continue
+        for n in sizes:
+            if limit and max_n and n > max_n:
+                log(f"{name:38s} {n:>7d}  건너뜀 (max_n {max_n})")
+                continue
+            try:
+                fn = setup(n, ctx)
+            except Skip as e:
+                log(f"{name:38s} {n:>7d}  건너뜀 ({e})")
+                continue
+            times = measure(fn, repeat, budget)
+            med = statistics.median(times)
+            results.append({"case": name, "n": n, "runs": len(times), "median_s": med, "min_s": min(times),
+                            "per_item_us": med / n * 1e6})
+            log(f"{name:38s} {n:>7d}  {med * 1000:10.2f} ms  (min {min(times) * 1000:.2f}, {len(times)}회)")
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine(),
+            "commit": commit, "date": datetime.now().isoformat(timespec="seconds")}
+
+
+def compare(results, baseline, tolerance=0.25, min_delta=0.001):
+    """케이스·크기별 기준선 대비 비율 → (행 목록, 회귀 목록)"""
+    base = {(r["case"], r["n"]): r for r in baseline["results"]}
+    rows, regressions = [], []
+    for r in results:
+        b = base.get((r["case"], r["n"]))
+        if b is None:
+            rows.append(dict(r, baseline_s=None, ratio=None, status="new"))
+            continue
+        ratio = r["median_s"] / b["median_s"] if b["median_s"] else float("inf")
+        if ratio > 1 + tolerance and r["median_s"] - b["median_s"] >= min_delta:
+            status = "regression"
+        elif ratio < 1 / (1 + tolerance) and b["median_s"] - r["median_s"] >= min_delta:
+            status = "faster"
+        else:
+            status = "ok"
+        row = dict(r, baseline_s=b["median_s"], ratio=ratio, status=status)
+        rows.append(row)
+        if status == "regression":
+            regressions.append(row)
+    return rows, regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="약국/소아과 앱 핫패스 벤치마크 (오프라인)")
+    ap.add_argument("--sizes", default=",".join(map(str, SIZES)), help="항목 수 (쉼표 구분)")
+    ap.add_argument("--cases", default="", help="케이스 이름 접두어 (쉼표 구분, 비우면 전부)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--budget", type=float, default=10.0, help="케이스·크기당 최대 측정 시간(초)")
+    ap.add_argument("--recorded", help="저장한 Overpass 응답 .json 파일 또는 폴더")
+    ap.add_argument("--no-limit", action="store_true", help="케이스별 최대 n 무시")
+    ap.add_argument("--out", help="결과 JSON 경로")
+    ap.add_argument("--save-baseline", metavar="PATH", help="결과를 기준선으로 저장")
+    ap.add_argument("--compare", metavar="PATH", help="기준선 JSON 과 비교 (회귀가 있으면 종료 코드 1)")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="회귀 판정 비율 (0.25 → 25%% 느려지면)")
+    ap.add_argument("--min-delta", type=float, default=0.001, help="회귀로 보는 최소 차이(초)")
+    ap.add_argument("--list", action="store_true", help="케이스 목록만 출력")
+    args = ap.parse_args(argv)
+
+    if args.list:
+        for name, _, max_n in CASES:
+            print(name + (f"  (max_n {max_n})" if max_n else ""))
+        return 0
+    prefixes = [p.strip() for p in args.cases.split(",") if p.strip()]
+    names = [c[0] for c in CASES if not prefixes or any(c[0].startswith(p) for p in prefixes)]
+    if not names:
+        ap.error(f"일치하는 케이스가 없습니다: {args.cases}")
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    recorded = load_recorded(args.recorded) if args.recorded else None
+
+    results = run_suite(names, sizes, args.repeat, args.budget, recorded, not args.no_limit)
+    report = {"environment": environment(), "sizes": sizes, "recorded": args.recorded,
+              "results": results}
+    savings = connection_savings(results)
+    if savings:
+        print("\n연결 재사용 (요청당)")
+        for r in savings:
+            print(f"{r['case']:38s} {r['n']:>7d}  새 연결 {r['new_ms']:.3f} ms → 풀 {r['pooled_ms']:.3f} ms"
+                  f"  (절약 {r['saved_ms']:.3f} ms)")
+        report["http_connection_savings"] = savings
+
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows, regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        print(f"\n기준선 {args.compare} ({baseline.get('environment', {}).get('commit', '?')}) 대비")
+        for r in rows:
+            ratio = f"x{r['ratio']:.2f}" if r["ratio"] is not None else "-"
+            mark = {"regression": "  ← 회귀", "faster": "  (빨라짐)", "new": "  (기준선 없음)"}.get(r["status"], "")
+            print(f"{r['case']:38s} {r['n']:>7d}  {r['median_s'] * 1000:10.2f} ms  {ratio:>7s}{mark}")
+        report["comparison"] = {"baseline": args.compare, "tolerance": args.tolerance,
+                                "min_delta": args.min_delta, "rows": rows}
+        if regressions:
+            print(f"\n회귀 {len(regressions)}건")
+            status = 1
+        else:
+            print("\n회귀 없음")
+
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"저장: {path}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
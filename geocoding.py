@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+# Nominatim 주소 검색 (app.py / hospital_finder.py 공용)
+# - 정규화한 검색어(+ 검색 옵션)를 키로 영구 캐시 (sqlite, 프로세스/앱 간 공유)
+#   찾은 결과는 ttl, 못 찾은 결과(negative)는 더 짧은 negative_ttl 동안 보관
+# - 실제로 Nominatim 에 요청할 때만 간격 조절 (기본 1 req/s, 이용 정책)
+#   → 캐시 hit 나 오래 쉬었다가 보낸 첫 요청은 기다리지 않음
+#   캐시가 sqlite 파일이면 그 DB 의 "다음 요청 가능 시각" 행으로 프로세스 간 공유 (SharedRateLimit)
+#   → search_http.py --workers N 이어도 전체 1 req/s. 메모리 캐시로 떨어진 환경은 프로세스 토큰 버킷
+#   기다리는 순서만 락 안에서 정하고 대기는 락 밖에서 → 여러 스레드가 한 명의 sleep 뒤에 줄서지 않음
+# - 네트워크/HTTP 오류는 캐시하지 않고 그대로 예외
+# - 실제 Nominatim 요청 시간과 토큰 버킷 대기 시간은 stage_metrics 에 ("nominatim", "nominatim_wait")
+
+import json
+import os
+import sqlite3
+import threading
+import time as _time
+import unicodedata
+
+import http_pool
+from stage_metrics import observe
+
+# NOMINATIM_URL 로 검색 서버 교체 (대역 서버 upstream_stub.py 등), NOMINATIM_RATE=0 이면 토큰 버킷 끔 (대역 서버 전용)
+NOMINATIM_URL = os.environ.get("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+NOMINATIM_RATE = float(os.environ.get("NOMINATIM_RATE", "1"))
+CACHE_PATH = os.environ.get("GEOCODE_CACHE_PATH", os.path.join("data", "geocode_cache.sqlite"))
+TTL = 30 * 86400           # 찾은 결과 30일
+NEGATIVE_TTL = 86400       # 못 찾은 결과 1일
+
+
+def normalize_query(q):
+    """NFKC + 공백 정리 + 대소문자 무시 ("강남역 " / "강남역" / "ＧＡＮＧＮＡＭ" 같은 키)"""
+    return " ".join(unicodedata.normalize("NFKC", q).split()).casefold()
+
+
+class TokenBucket:
+    """토큰 버킷. acquire() 는 토큰이 없을 때만 필요한 만큼 기다리고, 기다린 초를 반환"""
+
+    def __init__(self, rate=1.0, capacity=1, clock=_time.monotonic, sleep=_time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(capacity)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            # 토큰을 미리 차감(음수 = 앞에 기다리는 요청) → 다음 스레드는 그 뒤 차례만큼 기다림
+            self._tokens -= 1
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+
+NOMINATIM_BUCKET = TokenBucket(rate=NOMINATIM_RATE, capacity=1) if NOMINATIM_RATE > 0 else None  # 이용 정책: 초당 1회
+
+
+class SharedRateLimit:
+    """sqlite 파일 하나를 같이 쓰는 프로세스들 전체의 요청 간격 (TokenBucket 과 같은 acquire())
+
+    rate_limit 행에 다음 요청 가능 시각을 두고 BEGIN IMMEDIATE 안에서 자기 차례를 예약 → 락 밖에서 대기
+    """
+
+    MAX_BACKLOG = 300.0  # 저장된 시각이 이보다 멀면 시계가 뒤로 간 것으로 보고 무시
+
+    def __init__(self, path, rate=1.0, key="nominatim", clock=_time.time, sleep=_time.sleep):
+        self.path = path
+        self.interval = 1.0 / rate
+        self.key = key
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._db.execute("CREATE TABLE IF NOT EXISTS rate_limit (key TEXT PRIMARY KEY, next REAL)")
+
+    def _reserve(self, now):
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute("SELECT next FROM rate_limit WHERE key = ?", (self.key,)).fetchone()
+            slot = now if row is None or not now <= row[0] <= now + self.MAX_BACKLOG else row[0]
+            self._db.execute("INSERT OR REPLACE INTO rate_limit (key, next) VALUES (?, ?)",
+                             (self.key, slot + self.interval))
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return slot
+
+    def acquire(self):
+        with self._lock:  # 연결 하나를 스레드들이 같이 쓰므로 (트랜잭션 동안만)
+            now = self.clock()
+            wait = self._reserve(now) - now
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+
+class GeocodeCache:
+    """키 → (결과 | None) 영구 캐시. 결과는 JSON 으로 저장"""
+
+    def __init__(self, path=CACHE_PATH, ttl=TTL, negative_ttl=NEGATIVE_TTL, clock=_time.time):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._db.execute("PRAGMA journal_mode=WAL" if path != ":memory:" else "PRAGMA journal_mode=MEMORY")
+        self._db.execute("CREATE TABLE IF NOT EXISTS geocode (key TEXT PRIMARY KEY, value TEXT, stored REAL)")
+        self._db.commit()
+
+    def get(self, key):
+        """(found, value). found=False 면 캐시에 없거나 만료. value=None 은 '없는 주소'로 캐시된 것"""
+        with self._lock:
+            row = self._db.execute("SELECT value, stored FROM geocode WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                value = json.loads(row[0])
+                ttl = self.ttl if value is not None else self.negative_ttl
+                if self.clock() - row[1] < ttl:
+                    if value is None:
+                        self.negative_hits += 1
+                    else:
+                        self.hits += 1
+                    return True, value
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO geocode (key, value, stored) VALUES (?, ?, ?)",
+                             (key, json.dumps(value, ensure_ascii=False), self.clock()))
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM geocode")
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+            return {"entries": entries, "hits": self.hits, "negative_hits": self.negative_hits,
+                    "misses": self.misses, "ttl": self.ttl, "negative_ttl": self.negative_ttl}
+
+
+class Geocoder:
+    """Nominatim 검색 + 캐시 + 속도 제한. geocode() → (lat, lon, display_name) | None"""
+
+    def __init__(self, user_agent, url=NOMINATIM_URL, cache=None, bucket=NOMINATIM_BUCKET, timeout=15):
+        self.user_agent = user_agent
+        self.url = url
+        self.cache = cache
+        self.bucket = bucket
+        self.timeout = timeout
+        self.requests = 0
+        self.waited = 0.0
+
+    def _request(self, query, params):
+        waited = self.bucket.acquire() if self.bucket is not None else 0.0
+        self.waited += waited
+        if waited:
+            observe("nominatim_wait", waited)
+        self.requests += 1
+        t0 = _time.perf_counter()
+        try:
+            r = http_pool.get(self.url, params=dict(params, q=query, format="json", limit=1),
+                              headers={"User-Agent": self.user_agent}, timeout=self.timeout)
+            r.raise_for_status()
+            data = r.json()
+        finally:
+            observe("nominatim", _time.perf_counter() - t0)
+        if not data:
+            return None
+        return float(data[0]["lat"]), float(data[0]["lon"]), data[0].get("display_name", query)
+
+    def geocode(self, query, **params):
+        """params 는 Nominatim 검색 옵션 (예: countrycodes="kr", **{"accept-language": "ko"})"""
+        key = json.dumps([normalize_query(query), self.url, sorted(params.items())], ensure_ascii=False)
+        if self.cache is not None:
+            found, value = self.cache.get(key)
+            if found:
+                return tuple(value) if value is not None else None
+        value = self._request(query, params)
+        if self.cache is not None:
+            self.cache.put(key, list(value) if value is not None else None)
+        return value
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache(path=CACHE_PATH):
+    """프로세스 전역 GeocodeCache (첫 호출 때 연결)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = GeocodeCache(path)
+                except (OSError, sqlite3.Error):
+                    # 쓰기 불가한 배포 환경 → 프로세스 메모리에만 보관
+                    _cache = GeocodeCache(":memory:")
+    return _cache
+
+
+_bucket = None
+
+
+def get_bucket():
+    """Nominatim 요청 간격 조절: 캐시 sqlite 파일로 프로세스 간 공유, 안 되면 프로세스 토큰 버킷"""
+    global _bucket
+    if NOMINATIM_RATE <= 0:
+        return None
+    if _bucket is None:
+        path = get_cache().path
+        with _cache_lock:
+            if _bucket is None:
+                try:
+                    _bucket = SharedRateLimit(path, NOMINATIM_RATE) if path != ":memory:" else NOMINATIM_BUCKET
+                except sqlite3.Error:
+                    _bucket = NOMINATIM_BUCKET
+    return _bucket
+
+
+def get_geocoder(user_agent, **kwargs):
+    kwargs.setdefault("bucket", get_bucket())
+    return Geocoder(user_agent, cache=get_cache(), **kwargs)
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+# 바깥으로 나가는 HTTP 요청 공용 클라이언트 (Overpass 미러, Nominatim, 검색 서비스 클라이언트, 대역 서버 기록 모드)
+# - 프로세스 전역 requests.Session 하나 → 호스트별 연결 풀(urllib3) + keep-alive
+#   같은 미러/Nominatim 에 다시 요청할 때 TCP(+TLS) 연결을 새로 맺지 않음
+# - 호스트당 연결 상한 POOL_MAXSIZE (HTTP_POOL_SIZE). 다 쓰고 있으면 반납될 때까지 기다림 (앱/스레드 전체 공유)
+#   기다리는 시간도 연결 타임아웃 안에서 (최대 POOL_TIMEOUT). 넘기면 PoolTimeout (requests ConnectTimeout 의 하위)
+#   → 호출하는 쪽의 (연결, 읽기) 타임아웃 / hedge deadline 을 넘겨 기다리지 않음
+# - Accept-Encoding: gzip, deflate (+ brotli/zstandard 모듈이 있으면 br/zstd) → 압축 전송, 읽을 때 자동 해제
+# - 타임아웃은 (연결, 읽기) 따로. 기본 (CONNECT_TIMEOUT, READ_TIMEOUT)
+#   숫자 하나를 주면 읽기 타임아웃, 연결은 min(CONNECT_TIMEOUT, 그 값). 튜플은 그대로
+# - fork 한 자식 프로세스(search_http.py --workers)가 부모의 연결을 같이 쓰지 않도록 pid 가 바뀌면 세션을 새로 만듦
+# - async 변형 arequest/aget/apost: 같은 연결 풀을 asyncio.to_thread 로 (search_service 의 async API 와 같은 방식)
+#   본문까지 다 읽은 응답을 돌려줌 (stream 없음)
+# - stats(): 호스트별 새로 연 연결 수 / 요청 수 → 연결 재사용 확인
+# - Cancel: 다른 스레드에서 요청을 끊는 신호 (hedge 에서 진 미러 요청)
+#   with cancel.watch(): 안에서 이 스레드가 쓰는 연결을 기억해 두고, set() 하면 소켓을 shutdown
+#   → 응답 헤더를 기다리는 중이어도 바로 예외로 풀리고 연결은 풀로 돌아가지 않음 (닫힌 채 반납)
+
+import asyncio
+import os
+import socket
+import threading
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import EmptyPoolError
+from urllib3.util import Timeout, make_headers
+
+CONNECT_TIMEOUT = 10.0
+READ_TIMEOUT = 60.0
+POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_SIZE", "10"))   # 호스트당 동시 연결
+POOL_HOSTS = 16                                              # 연결 풀을 유지할 호스트 수
+POOL_TIMEOUT = CONNECT_TIMEOUT                               # 빈 연결을 기다리는 최대 시간
+
+
+class PoolTimeout(requests.exceptions.ConnectTimeout):
+    """호스트의 연결이 모두 사용 중이고 기다리는 시간 안에 반납되지 않음"""
+
+
+def timeouts(timeout=None):
+    """requests 에 넘길 (연결, 읽기) 타임아웃"""
+    if timeout is None:
+        return CONNECT_TIMEOUT, READ_TIMEOUT
+    if isinstance(timeout, tuple):
+        return timeout
+    return min(CONNECT_TIMEOUT, timeout), timeout
+
+
+# ---------------- 연결 풀 ----------------
+def _pool_wait(timeout):
+    """빈 연결을 기다릴 시간: 요청의 연결 타임아웃과 POOL_TIMEOUT 중 작은 값"""
+    connect = timeout.connect_timeout if isinstance(timeout, Timeout) else timeout
+    if isinstance(connect, (int, float)):
+        return min(POOL_TIMEOUT, connect)
+    return POOL_TIMEOUT
+
+
+class _BoundedWait:
+    # requests 는 urlopen 에 pool_timeout 을 넘기지 않음 → 그대로면 block=True 에서 끝없이 기다림
+    def urlopen(self, method, url, *args, pool_timeout=None, **kwargs):
+        if pool_timeout is None:
+            pool_timeout = _pool_wait(kwargs.get("timeout"))
+        return super().urlopen(method, url, *args, pool_timeout=pool_timeout, **kwargs)
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)
+        _watched(conn)  # 재사용하는 연결 (소켓이 이미 있음)
+        return conn
+
+
+class _Watched:
+    def connect(self):
+        super().connect()
+        _watched(self)  # 새로 연 연결
+
+
+class _HTTPConn(_Watched, HTTPConnection):
+    pass
+
+
+class _HTTPSConn(_Watched, HTTPSConnection):
+    pass
+
+
+class _HTTPPool(_BoundedWait, HTTPConnectionPool):
+    ConnectionCls = _HTTPConn
+
+
+class _HTTPSPool(_BoundedWait, HTTPSConnectionPool):
+    ConnectionCls = _HTTPSConn
+
+
+class PooledAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _HTTPPool, "https": _HTTPSPool}
+
+
+def new_session(maxsize=POOL_MAXSIZE, hosts=POOL_HOSTS, block=True):
+    s = requests.Session()
+    adapter = PooledAdapter(pool_connections=hosts, pool_maxsize=maxsize, pool_block=block)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    s.headers["Accept-Encoding"] = make_headers(accept_encoding=True)["accept-encoding"]
+    return s
+
+
+_session = None
+_session_pid = None
+_lock = threading.Lock()
+
+
+def session():
+    """프로세스 전역 세션 (첫 호출 때, fork 뒤에는 자식에서 새로)"""
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        with _lock:
+            if _session is None or _session_pid != os.getpid():
+                _session, _session_pid = new_session(), os.getpid()
+    return _session
+
+
+def request(method, url, timeout=None, **kwargs):
+    try:
+        return session().request(method, url, timeout=timeouts(timeout), **kwargs)
+    except EmptyPoolError as e:  # requests 가 감싸지 않고 그대로 올려 보냄
+        raise PoolTimeout(f"{url}: 사용 가능한 연결 없음 ({e})") from e
+
+
+def get(url, params=None, **kwargs):
+    return request("GET", url, params=params, **kwargs)
+
+
+def post(url, data=None, **kwargs):
+    return request("POST", url, data=data, **kwargs)
+
+
+# ---------------- 취소 ----------------
+_local = threading.local()
+
+
+def _watched(conn):
+    w = getattr(_local, "cancel", None)
+    if w is not None:
+        w[0]._add(conn, w[1])
+
+
+def _shutdown(conn):
+    sock = getattr(conn, "sock", None)
+    if sock is None:
+        return  # 아직 연결 전 → 연결 직후 _add 에서 끊음
+    try:
+        # dup 한 fd 로 shutdown → 읽고 있는 스레드의 소켓(TLS 포함) 객체 상태는 건드리지 않고 recv 만 깨움
+        with socket.socket(fileno=os.dup(sock.fileno())) as s:
+            s.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class Cancel:
+    """threading.Event 처럼 set()/is_set(). set() 하면 watch() 안의 요청이 쓰는 연결을 끊음"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._conns = set()
+
+    def is_set(self):
+        return self._event.is_set()
+
+    def set(self):
+        with self._lock:
+            self._event.set()
+            for conn in self._conns:
+                _shutdown(conn)
+
+    def _add(self, conn, mine):
+        with self._lock:
+            self._conns.add(conn)
+            mine.append(conn)
+            if self._event.is_set():
+                _shutdown(conn)
+
+    @contextmanager
+    def watch(self):
+        """이 스레드의 요청을 취소 대상으로. 응답을 닫기(연결 반납) 전에 빠져나올 것
+        — 반납된 연결은 다른 요청이 쓸 수 있으므로"""
+        prev = getattr(_local, "cancel", None)
+        mine = []
+        _local.cancel = (self, mine)
+        try:
+            yield self
+        finally:
+            _local.cancel = prev
+            with self._lock:
+                self._conns.difference_update(mine)
+
+
+# ---------------- async ----------------
+async def arequest(method, url, timeout=None, **kwargs):
+    if kwargs.get("stream"):
+        raise ValueError("async 요청은 stream 을 지원하지 않습니다")
+    return await asyncio.to_thread(request, method, url, timeout, **kwargs)
+
+
+async def aget(url, params=None, **kwargs):
+    return await arequest("GET", url, params=params, **kwargs)
+
+
+async def apost(url, data=None, **kwargs):
+    return await arequest("POST", url, data=data, **kwargs)
+
+
+# ---------------- 상태 ----------------
+def stats():
+    """호스트별 {"host", "connections"(새로 연 연결), "requests"} — requests 가 connections 보다 클수록 재사용"""
+    s = _session if _session_pid == os.getpid() else None
+    rows = []
+    if s is None:
+        return rows
+    pools = s.get_adapter("https://").poolmanager.pools
+    for key in pools.keys():
+        pool = pools.get(key)
+        if pool is None:
+            continue
+        rows.append({"host": f"{key.key_scheme}://{key.key_host}:{key.key_port}",
+                     "connections": pool.num_connections, "requests": pool.num_requests})
+    return rows
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# 결과 지도 렌더링 (app.py / hospital_finder.py 공용)
+# - 렌더 캐시: 입력 데이터 해시 + 보기 설정을 키로 완성된 지도 HTML 을 보관 → 같은 입력이면 rerun 때 다시 만들지 않음
+# - GeoJSON 모드: 마커를 FeatureCollection 하나로 보내고 브라우저에서 클러스터링(Leaflet.markercluster)
+#   팝업 HTML 은 마커를 눌렀을 때 속성값으로 만듦 → 마커 수가 늘어도 마커별 HTML/JS 가 생기지 않음
+# - "auto" 는 마커가 GEOJSON_THRESHOLD 개를 넘으면 GeoJSON 모드
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import folium
+from folium.plugins import MarkerCluster
+from folium.template import Template
+
+from stage_metrics import observe
+
+MAP_MODES = {"auto": "자동", "markers": "개별 마커", "geojson": "GeoJSON + 클러스터"}
+GEOJSON_THRESHOLD = 300
+
+# 마커 색 이름(folium.Icon) → circleMarker 색
+COLORS = {"green": "#2e7d32", "red": "#c62828", "blue": "#1565c0", "gray": "#616161"}
+
+
+def resolve_mode(mode, n):
+    if mode == "auto":
+        return "geojson" if n > GEOJSON_THRESHOLD else "markers"
+    return mode
+
+
+def frame_key(df, columns, *view):
+    """DataFrame 의 columns 값 + 보기 설정(중심, 반경, 모드 …) → 렌더 캐시 키"""
+    import pandas as pd
+    h = hashlib.sha1()
+    cols = [c for c in columns if c in df.columns]
+    h.update(repr((cols, len(df), view)).encode("utf-8"))
+    if len(df):
+        h.update(pd.util.hash_pandas_object(df[cols], index=False).values.tobytes())
+    return h.hexdigest()
+
+
+class RenderCache:
+    """키 → 렌더된 지도 HTML (LRU)"""
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build, component=None):
+        """build() → folium.Map. (html, hit 여부) 반환. miss 때 생성+렌더 시간은 "map_render" 단계로 기록"""
+        with self._lock:
+            html = self._data.get(key)
+            if html is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return html, True
+        t0 = time.perf_counter()
+        html = build().get_root().render()
+        observe("map_render", time.perf_counter() - t0, component)
+        with self._lock:
+            self.misses += 1
+            self._data[key] = html
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return html, False
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._data), "max_entries": self.max_entries,
+                    "hits": self.hits, "misses": self.misses,
+                    "bytes": sum(len(v) for v in self._data.values())}
+
+
+RENDER_CACHE = RenderCache()
+
+
+def show_map(key, build, height=440, cache=RENDER_CACHE, component=None):
+    """캐시된 지도 HTML 을 iframe 으로 표시 (클릭 좌표가 필요 없는 결과 지도용)"""
+    import streamlit as st
+    html, _ = cache.get(key, build, component)
+    if hasattr(st, "iframe"):
+        st.iframe(html, height=height)
+    else:  # streamlit < 1.50
+        import streamlit.components.v1 as components
+        components.html(html, height=height)
+
+
+def points_geojson(lats, lons, props):
+    """좌표 열 + 속성 dict 목록 → FeatureCollection (dict)"""
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [float(lo), float(la)]},
+             "properties": p}
+            for la, lo, p in zip(lats, lons, props)
+        ],
+    }
+
+
+class GeoJsonCluster(MarkerCluster):
+    """GeoJSON 점 레이어 하나 + 클라이언트 클러스터링
+
+    properties 의 color(COLORS 값)로 원 마커 색, tooltip 으로 툴팁.
+    popup: 속성(p)과 escape 함수(esc)를 받아 HTML 문자열을 돌려주는 JS 함수 본문. 클릭할 때만 호출.
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var esc = function (s) {
+                    return String(s == null ? "" : s).replace(/[&<>"']/g, function (c) {
+                        return {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"}[c];
+                    });
+                };
+                var popup = function (p) { {{ this.popup }} };
+                var cluster = L.markerClusterGroup({{ this.options|tojavascript }});
+                var layer = L.geoJSON({{ this.data|tojson }}, {
+                    pointToLayer: function (f, latlng) {
+                        return L.circleMarker(latlng, {radius: 7, weight: 2, color: "#ffffff",
+                                                       fillColor: f.properties.color || "{{ this.default_color }}",
+                                                       fillOpacity: 0.9});
+                    },
+                    onEachFeature: function (f, l) {
+                        if (f.properties.tooltip) { l.bindTooltip(esc(f.properties.tooltip)); }
+                        l.bindPopup(function () { return popup(f.properties); }, {maxWidth: 350});
+                    }
+                });
+                cluster.addLayer(layer);
+                cluster.addTo({{ this._parent.get_name() }});
+                return cluster;
+            })();
+        {% endmacro %}"""
+    )
+
+    def __init__(self, data, popup="return esc(p.tooltip);", default_color=COLORS["blue"], name=None, **kwargs):
+        super().__init__(name=name, **kwargs)
+        self._name = "GeoJsonCluster"
+        self.data = data
+        self.popup = popup
+        self.default_color = default_color
+
+
+# ---------------- 약국 결과 지도 (app.py) ----------------
+PHARMACY_MAP_COLS = ["위도", "경도", "이름", "거리(m)", "영업여부", "영업시간"]
+STATUS_COLOR = {"영업중": "green", "영업종료": "red"}
+PHARMACY_POPUP = 'return esc(p.name) + (p.hours ? "<br/>" + esc(p.hours) : "");'
+
+
+def pharmacy_map(df, lat, lon, r, mode="markers"):
+    fmap = folium.Map(location=(lat, lon), zoom_start=14, control_scale=True)
+    folium.Circle((lat, lon), radius=r, color="blue", fill=False, opacity=0.35).add_to(fmap)
+    folium.Marker((lat, lon), tooltip="검색 중심", icon=folium.Icon(icon="home")).add_to(fmap)
+
+    if mode == "geojson":
+        status = df["영업여부"].astype(str)
+        props = [
+            {"name": n, "hours": h, "color": COLORS[STATUS_COLOR.get(s, "blue")], "tooltip": f"{n} • {d}m • {s}"}
+            for n, d, s, h in zip(df["이름"], df["거리(m)"], status, df["영업시간"])
+        ]
+        GeoJsonCluster(points_geojson(df["위도"], df["경도"], props), popup=PHARMACY_POPUP).add_to(fmap)
+        return fmap
+
+    for _, row in df.iterrows():
+        color = STATUS_COLOR.get(row.get("영업여부"), "blue")
+        folium.Marker(
+            (row["위도"], row["경도"]),
+            tooltip=f"{row.get('이름','(이름 없음)')} • {row.get('거리(m)','?')}m • {row.get('영업여부','?')}",
+            popup=(row.get("이름","") + (f"<br/>{row.get('영업시간')}" if row.get("영업시간") else "")),
+            icon=folium.Icon(color=color)
+        ).add_to(fmap)
+    return fmap
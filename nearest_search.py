@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# 가장 가까운 영업중 약국 k곳 (고리 확장 검색)
+# - 반경을 growth 배씩 늘리며 고리(바깥 원 - 안쪽 원)만 추가로 조회 → 이미 받은 안쪽 영역은 재요청하지 않음
+# - 현재 반경 안의 요소는 모두 받은 상태이므로, 그 안에서 영업중 k곳이 확인되면 바로 종료
+# - 네트워크 호출 수(max_calls)와 전체 소요시간(deadline)에 상한
+
+import time as _time
+
+from haversine import haversine
+
+from opening_hours import open_status_many
+from overpass_query import build_ring_query, element_point
+
+
+def ring_radii(start_radius, max_radius, growth=2.0, max_calls=5):
+    """[(r_inner, r_outer), ...] — 최대 max_calls 개, 마지막 바깥 반경은 max_radius 이하"""
+    rings, inner, outer = [], 0, int(start_radius)
+    while len(rings) < max_calls and inner < max_radius:
+        outer = min(int(max_radius), outer)
+        rings.append((inner, outer))
+        inner, outer = outer, int(outer * growth)
+    return rings
+
+
+def nearest_open(lat, lon, k, now_local, fetch, start_radius=500, max_radius=20000,
+                 growth=2.0, max_calls=5, deadline=60.0, compact=False):
+    """가까운 영업중 약국 k곳의 Overpass 요소 목록과 진행 정보를 반환.
+
+    fetch(query, r_inner, r_outer) → Overpass data(dict). (캐시/미러 선택은 호출자가 담당)
+    반환: (elements, info)
+      elements : 거리순 영업중 요소 최대 k개 (각 요소에 "_dist" 추가)
+      info     : {"rings": [...], "calls", "elapsed", "radius", "complete"}
+                 complete=False 면 호출/시간 상한에 걸려 k곳을 다 확인하지 못한 것
+    """
+    t0 = _time.monotonic()
+    seen = {}
+    rings = []
+    radius = 0
+    confirmed = []
+    for r_inner, r_outer in ring_radii(start_radius, max_radius, growth, max_calls):
+        if rings and _time.monotonic() - t0 >= deadline:
+            break
+        t1 = _time.monotonic()
+        data = fetch(build_ring_query(lat, lon, r_inner, r_outer, compact=compact), r_inner, r_outer)
+        added = 0
+        for el in data.get("elements", []):
+            key = (el.get("type"), el.get("id"))
+            if key in seen:
+                continue
+            p = element_point(el)
+            if p is None:
+                continue
+            seen[key] = dict(el, _dist=haversine((lat, lon), p, unit="m"))
+            added += 1
+        radius = r_outer
+        rings.append({"r_inner": r_inner, "r_outer": r_outer, "elements": added,
+                      "seconds": round(_time.monotonic() - t1, 3)})
+        confirmed = _open_within(list(seen.values()), now_local, radius)
+        if len(confirmed) >= k:
+            break
+
+    info = {
+        "rings": rings,
+        "calls": len(rings),
+        "elapsed": round(_time.monotonic() - t0, 3),
+        "radius": radius,
+        "complete": len(confirmed) >= k,
+    }
+    return confirmed[:k], info
+
+
+def _open_within(elements, now_local, radius):
+    # 반경 안의 요소는 전부 받은 상태 → 여기서 고른 거리순 영업중 목록은 확정
+    inside = [el for el in elements if el["_dist"] <= radius]
+    statuses = open_status_many([(el.get("tags") or {}).get("opening_hours", "") for el in inside], now_local)
+    opened = [el for el, (o, _) in zip(inside, statuses) if o is True]
+    return sorted(opened, key=lambda el: el["_dist"])
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+# opening_hours 파서
+# - is_open_now: 기존 파서 (문자열을 매번 정규식으로 해석)
+# - compile_hours: 문자열 → 주간 구간 배열(초 단위, 월요일 00:00 기준) 한 번만 컴파일, 문자열별 캐시
+# - open_status_many: 문자열 컬럼 전체 + now_local 하나 → 각 행의 (영업여부, 표시문자열)
+# - next_change_many: 각 행의 다음 영업/종료 전환까지 남은 초 → 결과 재평가 시점 계산
+# - week_bits: 문자열 → 주간 15분 슬롯 비트열(84바이트). "일 21:00 영업"/"오늘 밤 중 영업" 같은 필터는 비트 검사로 끝냄
+# - parse_when / parse_range: "토 22:00", "일 18:00-06:00" 같은 입력 → 주간 초
+
+import re
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import datetime, time
+from functools import lru_cache
+
+DAY = {"Mo":0,"Tu":1,"We":2,"Th":3,"Fr":4,"Sa":5,"Su":6}
+def _t(s):
+    try:
+        h, m = s.split(":")
+        return time(int(h), int(m))
+    except Exception:
+        return None
+def _days(seg):
+    if "-" in seg:
+        a, b = seg.split("-")
+        if a in DAY and b in DAY:
+            i, j = DAY[a], DAY[b]
+            return list(range(i, j+1)) if i <= j else list(range(i, 7)) + list(range(0, j+1))
+    return [DAY[seg]] if seg in DAY else []
+def _rule(s):
+    m = re.match(r'^([A-Za-z]{2}(?:-[A-Za-z]{2})?(?:,\s*[A-Za-z]{2}(?:-[A-Za-z]{2})?)*)\s+'
+                 r'([\d:]{4,5}-[\d:]{4,5}(?:\s*,\s*[\d:]{4,5}-[\d:]{4,5})*)$', s.strip())
+    if not m: return None
+    dpart, tpart = m.groups()
+    days = sorted(set(sum((_days(x.strip()) for x in dpart.split(",")), [])))
+    ranges = []
+    for seg in [x.strip() for x in tpart.split(",")]:
+        if "-" in seg:
+            a, b = seg.split("-")
+            ta, tb = _t(a), _t(b)
+            if ta and tb: ranges.append((ta, tb))
+    return {"days": days, "ranges": ranges} if days and ranges else None
+def is_open_now(oh, now_local: datetime):
+    if not oh: return None, "표기 없음"
+    s = oh.strip()
+    if s.lower() in ("24/7","24x7","24-7"): return True, "24/7"
+    wd, nowt = now_local.weekday(), now_local.time()
+    known, opened = False, False
+    for part in [p.strip() for p in s.split(";") if p.strip()]:
+        if "PH" in part or "off" in part.lower(): continue
+        if re.match(r'^[\d:]{4,5}-[\d:]{4,5}$', part):
+            ta, tb = _t(part.split("-")[0]), _t(part.split("-")[1])
+            if ta and tb:
+                known = True
+                if ta <= nowt <= tb: opened = True
+            continue
+        rule = _rule(part)
+        if not rule: continue
+        known = True
+        if wd in rule["days"]:
+            for ta, tb in rule["ranges"]:
+                if tb < ta:
+                    if nowt >= ta or nowt <= tb: opened = True; break
+                else:
+                    if ta <= nowt <= tb: opened = True; break
+    return (opened, oh) if known else (None, oh)
+
+# ---------------- compiled form ----------------
+# 구간은 [start, end) (주 시작부터의 초). is_open_now 의 "tb 까지 포함" 규칙은 end = tb + 1초로 표현.
+WEEK = 7 * 86400
+_TIME_RANGE = re.compile(r'^[\d:]{4,5}-[\d:]{4,5}$')
+
+Compiled = namedtuple("Compiled", "known display starts ends")
+# known: True(해석 가능) / None(해석 불가) / False(표기 없음)
+
+
+def _sec(t):
+    return t.hour * 3600 + t.minute * 60
+
+
+def _merge(intervals):
+    out = []
+    for a, b in sorted(intervals):
+        if out and a <= out[-1][1]:
+            if b > out[-1][1]:
+                out[-1][1] = b
+        else:
+            out.append([a, b])
+    return tuple(a for a, _ in out), tuple(b for _, b in out)
+
+
+@lru_cache(maxsize=65536)
+def compile_hours(oh):
+    """opening_hours 문자열 → Compiled (문자열별 메모이즈, is_open_now 와 같은 의미)"""
+    if not oh:
+        return Compiled(False, "표기 없음", (), ())
+    s = oh.strip()
+    if s.lower() in ("24/7","24x7","24-7"):
+        return Compiled(True, "24/7", (0,), (WEEK,))
+    known, intervals = False, []
+    for part in [p.strip() for p in s.split(";") if p.strip()]:
+        if "PH" in part or "off" in part.lower(): continue
+        if _TIME_RANGE.match(part):
+            ta, tb = _t(part.split("-")[0]), _t(part.split("-")[1])
+            if ta and tb:
+                known = True
+                if ta <= tb:
+                    for d in range(7):
+                        intervals.append((d * 86400 + _sec(ta), d * 86400 + _sec(tb) + 1))
+            continue
+        rule = _rule(part)
+        if not rule: continue
+        known = True
+        for d in rule["days"]:
+            base = d * 86400
+            for ta, tb in rule["ranges"]:
+                if tb < ta:
+                    # 같은 요일 안에서 자정 전후 두 구간 (is_open_now 와 동일하게 다음 요일로 넘기지 않음)
+                    intervals.append((base, base + _sec(tb) + 1))
+                    intervals.append((base + _sec(ta), base + 86400))
+                else:
+                    intervals.append((base + _sec(ta), base + _sec(tb) + 1))
+    starts, ends = _merge(intervals)
+    return Compiled(True if known else None, oh, starts, ends)
+
+
+def week_second(now_local: datetime):
+    return now_local.weekday() * 86400 + now_local.hour * 3600 + now_local.minute * 60 + now_local.second
+
+
+def is_open_compiled(c, sec):
+    """Compiled + 주간 초 → True / False / None"""
+    if not c.known:
+        return None
+    i = bisect_right(c.starts, sec) - 1
+    return i >= 0 and sec < c.ends[i]
+
+
+def open_status_many(hours, now_local: datetime):
+    """opening_hours 문자열 컬럼 → [(영업여부, 표시문자열), ...]  (is_open_now 의 일괄 버전)
+
+    같은 문자열은 한 번만 컴파일·평가한다.
+    """
+    sec = week_second(now_local)
+    memo = {}
+    out = []
+    for oh in hours:
+        r = memo.get(oh)
+        if r is None:
+            c = compile_hours(oh or "")
+            r = memo[oh] = (is_open_compiled(c, sec), c.display)
+        out.append(r)
+    return out
+
+
+def next_change(c, sec):
+    """sec 이후 영업여부가 처음 바뀌기까지 남은 초. 바뀌지 않으면(해석 불가/항상 영업/항상 종료) None."""
+    if not c.known or not c.starts:
+        return None
+    wraps = c.starts[0] == 0 and c.ends[-1] == WEEK  # 일요일 밤 → 월요일 새벽으로 이어지는 구간
+    if wraps and len(c.starts) == 1:
+        return None
+    i = bisect_right(c.starts, sec) - 1
+    if i >= 0 and sec < c.ends[i]:
+        end = c.ends[i]
+        if end == WEEK and wraps:
+            end = WEEK + c.ends[0]
+        return end - sec
+    nxt = c.starts[i + 1] if i + 1 < len(c.starts) else WEEK + c.starts[0]
+    return nxt - sec
+
+
+def next_change_many(hours, now_local: datetime):
+    """opening_hours 문자열 컬럼 → [다음 전환까지 남은 초 또는 None, ...]"""
+    sec = week_second(now_local)
+    memo = {}
+    out = []
+    for oh in hours:
+        if oh not in memo:
+            memo[oh] = next_change(compile_hours(oh or ""), sec)
+        out.append(memo[oh])
+    return out
+
+
+# ---------------- weekly slot bitset ----------------
+# 슬롯 i(= 월요일 00:00 부터 i*15분)가 통째로 영업시간 안이면 비트 1. 비트 i 는 i//8 번째 바이트의 (i%8) 번째 비트.
+# 해석 불가/표기 없음은 모두 0 (영업중 필터에서 '확인필요'를 빼는 것과 같은 기준)
+# 구간 끝 1분 차이는 무시 ("00:00-23:59" 는 23:45 슬롯까지 영업)
+SLOT = 900
+SLOT_GRACE = 60
+SLOTS = WEEK // SLOT   # 672
+WEEK_BYTES = SLOTS // 8
+DAY_KO = "월화수목금토일"
+
+
+@lru_cache(maxsize=65536)
+def week_bits(oh):
+    """opening_hours 문자열 → 주간 슬롯 비트열 (bytes, WEEK_BYTES 바이트, 문자열별 메모이즈)"""
+    c = compile_hours(oh or "")
+    bits = 0
+    if c.known:
+        for a, b in zip(c.starts, c.ends):
+            lo, hi = -(-(a - SLOT_GRACE) // SLOT), (b + SLOT_GRACE) // SLOT  # [a, b) 안에 (거의) 완전히 들어가는 슬롯
+            if hi > lo:
+                bits |= ((1 << (hi - lo)) - 1) << lo
+    return bits.to_bytes(WEEK_BYTES, "little")
+
+
+def slot_of(sec):
+    return (sec % WEEK) // SLOT
+
+
+def range_bits(start, end):
+    """주간 초 구간 [start, end) 와 겹치는 슬롯 비트열. end <= start 면 다음 날(주)로 넘어가는 구간"""
+    if end <= start:
+        end += 86400 if end + 86400 > start else WEEK
+    bits = 0
+    for i in range(start // SLOT, -(-end // SLOT)):
+        bits |= 1 << (i % SLOTS)
+    return bits.to_bytes(WEEK_BYTES, "little")
+
+
+DAY_NAMES = {**{d: i for i, d in enumerate(DAY_KO)}, **{k.lower(): v for k, v in DAY.items()}}
+_WHEN = re.compile(r"^(\S+)\s+(\d{1,2}):(\d{2})$")
+
+
+def parse_when(s, now=None):
+    """"토 22:00" / "Sa 22:00" / "2026-10-18 22:00" / "22:00"(오늘) → 주간 초 (월요일 00:00 기준)
+
+    "오늘"은 now 의 날짜 — 검색 위치 시간대의 현재 시각을 넘길 것 (없으면 서버 시각)
+    """
+    s = s.strip()
+    m = _WHEN.match(s)
+    if m:
+        day = DAY_NAMES.get(m.group(1)[0]) if m.group(1)[0] in DAY_KO else DAY_NAMES.get(m.group(1).lower()[:2])
+        if day is not None and int(m.group(2)) <= 24 and int(m.group(3)) < 60:
+            return (day * 86400 + int(m.group(2)) * 3600 + int(m.group(3)) * 60) % WEEK
+    if re.match(r"^\d{1,2}:\d{2}$", s):
+        s = f"{now or datetime.now():%Y-%m-%d} {s}"
+    try:
+        return week_second(datetime.fromisoformat(s))
+    except ValueError:
+        raise ValueError(f"시각 형식을 알 수 없습니다: {s!r} (예: '토 22:00', '2026-10-18 22:00')")
+
+
+def parse_range(s, now=None):
+    """"일 18:00-06:00" (끝이 시작보다 이르면 다음 날) / "금 18:00-일 09:00" → (start, end) 주간 초, start < end
+
+    요일 없는 시작("18:00-06:00")은 now 의 날짜 (parse_when 과 같음)
+    """
+    a, sep, b = s.strip().partition("-")
+    if not sep:
+        raise ValueError(f"시간대 형식을 알 수 없습니다: {s!r} (예: '일 18:00-06:00')")
+    start = parse_when(a, now)
+    b = b.strip()
+    same_day = bool(re.match(r"^\d{1,2}:\d{2}$", b))
+    end = parse_when(f"{DAY_KO[start // 86400]} {b}" if same_day else b)
+    if end <= start:
+        end += 86400 if same_day else WEEK  # 월요일 이후 값도 range_bits/format_when 이 주 단위로 접음
+    return start, end
+
+
+def format_when(sec):
+    sec %= WEEK
+    return f"{DAY_KO[sec // 86400]} {sec % 86400 // 3600:02d}:{sec % 3600 // 60:02d}"
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# Overpass 결과 캐시 (TTL + LRU + stale-while-revalidate)
+# - 키: 반올림한 위경도 + 반경 + 태그 집합
+# - 만료된 항목은 즉시 stale 결과를 돌려주고 백그라운드에서 갱신
+# - 갱신이 실패해도(미러 전부 장애) stale 항목은 계속 제공
+
+import threading
+import time as _time
+from collections import OrderedDict
+
+
+def cache_key(lat, lon, radius, tags, precision=4):
+    """검색 조건을 정규화한 캐시 키 (precision=4 → 약 11m 격자)"""
+    return (round(float(lat), precision), round(float(lon), precision), int(radius), tuple(sorted(tags)))
+
+
+class OverpassCache:
+    """프로세스 전체에서 공유하는 Overpass 결과 캐시"""
+
+    def __init__(self, ttl=300, max_entries=256, clock=_time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # key -> (value, stored_at)
+        self._refreshing = set()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def _put(self, key, value):
+        # 호출자가 lock 을 잡고 있어야 함
+        self._data[key] = (value, self._clock())
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def put(self, key, value):
+        with self._lock:
+            self._put(key, value)
+
+    def peek(self, key):
+        """카운터/LRU 순서를 건드리지 않고 값 조회 (없으면 None)"""
+        with self._lock:
+            item = self._data.get(key)
+        return item[0] if item else None
+
+    def get(self, key, fetch, refresh=None):
+        """(value, status) 반환. status: "hit" | "stale" | "miss"
+
+        fetch   : 캐시에 없을 때 호출 (예외는 그대로 전파)
+        refresh : 만료 항목의 백그라운드 갱신에 쓸 함수 (기본값 fetch)
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, stored_at = item
+                self._data.move_to_end(key)
+                if self._clock() - stored_at < self.ttl:
+                    self.hits += 1
+                    return value, "hit"
+                self.stale_hits += 1
+                start_refresh = key not in self._refreshing
+                if start_refresh:
+                    self._refreshing.add(key)
+            else:
+                self.misses += 1
+
+        if item is not None:
+            if start_refresh:
+                t = threading.Thread(target=self._refresh, args=(key, refresh or fetch), daemon=True)
+                t.start()
+            return value, "stale"
+
+        value = fetch()
+        self.put(key, value)
+        return value, "miss"
+
+    def _refresh(self, key, fetch):
+        try:
+            value = fetch()
+        except Exception:
+            # 미러가 모두 실패해도 기존 stale 항목은 그대로 둔다
+            with self._lock:
+                self.refresh_failures += 1
+                self._refreshing.discard(key)
+            return
+        with self._lock:
+            self.refreshes += 1
+            self._refreshing.discard(key)
+            self._put(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "refresh_failures": self.refresh_failures,
+                "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+# 동시 Overpass 검색 합치기 (프로세스 전역)
+# - single-flight: 같은 쿼리가 이미 요청 중이면 새로 보내지 않고 그 결과를 같이 받음
+# - bbox 묶음: window 초 안에 들어온 가까운 반경 검색들을 사각 영역 쿼리 하나로 보내고
+#   결과를 세션(검색)마다 중심 거리 <= 반경으로 다시 나눔
+#   (묶음 영역의 가로/세로가 max_span_m 을 넘거나 max_members 가 차면 새 묶음)
+# - window 는 근처에 요청 중이거나 모이는 중인 검색이 있을 때만 기다림
+#   혼자 하는 검색(사용자 한 명)은 바로 요청 → 기다린 만큼 느려지지 않음
+# - 검색이 하나뿐인 묶음은 원래 around 쿼리 그대로 → 캐시/결과가 단독 검색과 같음
+# - 절약한 upstream 호출 수 등은 stats()
+#
+# 주의: bbox 로 받은 way/relation 은 중심점 거리로 자르므로, 가장자리만 반경에 걸친 건물은
+#       단독 around 검색과 달리 빠질 수 있음
+
+import math
+import threading
+import time as _time
+
+from haversine import haversine
+
+from overpass_query import build_bbox_query, build_overpass_query, element_point
+
+M_PER_DEG = 111320.0
+
+
+def circle_bbox(lat, lon, radius):
+    """(south, west, north, east)"""
+    dlat = radius / M_PER_DEG
+    dlon = radius / (M_PER_DEG * max(math.cos(math.radians(lat)), 0.01))
+    return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+
+
+def bbox_union(a, b):
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+
+def bbox_span_m(bb):
+    """사각 영역의 (세로, 가로) 길이 (m)"""
+    mid = math.radians((bb[0] + bb[2]) / 2)
+    return (bb[2] - bb[0]) * M_PER_DEG, (bb[3] - bb[1]) * M_PER_DEG * math.cos(mid)
+
+
+def within(data, lat, lon, radius):
+    """data 의 요소 중 (lat, lon) 에서 radius(m) 안의 것만 남긴 data"""
+    out = []
+    for el in data.get("elements", []):
+        p = element_point(el)
+        if p is not None and haversine((lat, lon), p, unit="m") <= radius:
+            out.append(el)
+    return dict(data, elements=out)
+
+
+class SingleFlight:
+    """key 별로 동시에 하나만 실행. 늦게 온 호출은 먼저 온 호출의 결과(또는 예외)를 같이 받음"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> [Event, result, error]
+
+    def do(self, key, fn):
+        """(value, shared) — shared=True 면 다른 호출이 받은 결과를 같이 쓴 것"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = [threading.Event(), None, None]
+        if not leader:
+            call[0].wait()
+            if call[2] is not None:
+                raise call[2]
+            return call[1], True
+        try:
+            call[1] = fn()
+        except BaseException as e:
+            call[2] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call[0].set()
+        return call[1], False
+
+
+class _Batch:
+    __slots__ = ("compact", "bbox", "members")
+
+    def __init__(self, compact, bbox):
+        self.compact = compact
+        self.bbox = bbox
+        self.members = []  # [lat, lon, radius, Event, result, error]
+
+
+class Coalescer:
+    """반경 검색 합치기. fetch(query) → (data, endpoint, report) 는 호출자(묶음 리더)의 것을 사용"""
+
+    def __init__(self, window=0.15, max_span_m=8000, max_members=16, sleep=_time.sleep):
+        self.window = window
+        self.max_span_m = max_span_m
+        self.max_members = max_members
+        self.sleep = sleep
+        self.flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._open = []
+        self._inflight = []      # 요청 중인 묶음의 영역
+        self.requests = 0        # search() + fetch_once() 호출 수
+        self.upstream_calls = 0  # 실제로 fetch 를 부른 횟수
+        self.shared = 0          # 요청 중인 같은 쿼리를 같이 받은 횟수
+        self.batches = 0         # 2건 이상을 bbox 하나로 보낸 횟수
+        self.batched = 0         # 그렇게 묶인 검색 수
+        self.max_batch = 0
+        self.held = 0            # window 를 기다린 묶음 수 (나머지는 바로 요청)
+
+    # ---- single-flight ----
+    def fetch_once(self, query, fetch):
+        """같은 쿼리가 요청 중이면 그 결과를 같이 받음 → (data, endpoint, report)"""
+        with self._lock:
+            self.requests += 1
+        return self._fetch_once(query, fetch)
+
+    def _fetch_once(self, query, fetch):
+        def call():
+            with self._lock:
+                self.upstream_calls += 1
+            return fetch(query)
+
+        value, shared = self.flight.do(query, call)
+        if shared:
+            with self._lock:
+                self.shared += 1
+        return value
+
+    # ---- bbox 묶음 ----
+    def _near(self, bb):
+        # bb 와 한 묶음이 될 만한 영역이 요청 중이거나 모이는 중인지 (락 안에서)
+        areas = self._inflight + [b.bbox for b in self._open]
+        return any(max(bbox_span_m(bbox_union(a, bb))) <= self.max_span_m for a in areas)
+
+    def _join(self, lat, lon, radius, compact):
+        """열린 묶음에 들어가거나 새 묶음을 만듦 → (batch, member, leader, hold)
+
+        hold: 새 묶음의 리더가 window 동안 기다릴지 (근처에 다른 검색이 있을 때만)
+        """
+        bb = circle_bbox(lat, lon, radius)
+        member = [lat, lon, radius, threading.Event(), None, None]
+        with self._lock:
+            self.requests += 1
+            for batch in self._open:
+                if batch.compact != compact or len(batch.members) >= self.max_members:
+                    continue
+                merged = bbox_union(batch.bbox, bb)
+                if max(bbox_span_m(merged)) <= self.max_span_m:
+                    batch.bbox = merged
+                    batch.members.append(member)
+                    return batch, member, False, False
+            hold = self._near(bb)
+            batch = _Batch(compact, bb)
+            batch.members.append(member)
+            self._open.append(batch)
+            if hold:
+                self.held += 1
+            return batch, member, True, hold
+
+    def search(self, lat, lon, radius, fetch, compact=False):
+        """반경 검색 하나 → (data, endpoint, report)"""
+        if self.window <= 0:
+            return self.fetch_once(build_overpass_query(lat, lon, radius, compact=compact), fetch)
+
+        batch, member, leader, hold = self._join(lat, lon, radius, compact)
+        if not leader:
+            member[3].wait()
+            if member[5] is not None:
+                raise member[5]
+            return member[4]
+
+        try:
+            if hold:
+                self.sleep(self.window)
+            with self._lock:
+                self._open.remove(batch)
+                self._inflight.append(batch.bbox)
+                members = list(batch.members)
+                if len(members) > 1:
+                    self.batches += 1
+                    self.batched += len(members)
+                    self.max_batch = max(self.max_batch, len(members))
+            try:
+                if len(members) == 1:
+                    results = [self._fetch_once(build_overpass_query(lat, lon, radius, compact=compact), fetch)]
+                else:
+                    data, endpoint, report = self._fetch_once(build_bbox_query(*batch.bbox, compact=compact), fetch)
+                    results = [(within(data, m[0], m[1], m[2]), endpoint, report) for m in members]
+            finally:
+                with self._lock:
+                    self._inflight.remove(batch.bbox)
+        except BaseException as e:
+            # 리더가 실패하거나 중단돼도(Streamlit rerun 등) 기다리는 검색은 풀어줌
+            with self._lock:
+                if batch in self._open:
+                    self._open.remove(batch)
+                members = list(batch.members)
+            err = e if isinstance(e, Exception) else RuntimeError("묶음 요청이 중단되었습니다")
+            for m in members:
+                if m is not member:
+                    m[5] = err
+                m[3].set()
+            raise
+        for m, r in zip(members, results):
+            m[4] = r
+            m[3].set()
+        return member[4]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "upstream_calls": self.upstream_calls,
+                "saved_calls": self.requests - self.upstream_calls,
+                "shared_inflight": self.shared,
+                "batches": self.batches,
+                "batched_searches": self.batched,
+                "max_batch": self.max_batch,
+                "held_windows": self.held,
+                "window": self.window,
+                "max_span_m": self.max_span_m,
+            }
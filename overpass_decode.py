@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# Overpass JSON → 약국 레코드 (__slots__) 디코더
+# - json.loads 의 object_hook 에서 요소 dict 를 만나는 즉시 레코드로 바꾸고 원래 dict 는 버림
+#   → 응답 전체를 중첩 dict 로 들고 있지 않음 (최대 메모리 ≈ 디코딩된 원문 문자열 + 레코드)
+# - 행 생성에 쓰는 태그(ROW_TAGS)만 남김. way/relation 의 center 는 lat/lon 으로 접음
+# - compact 응답(convert 결과, geometry=Point)도 같은 레코드로 → normalize_elements 를 거치지 않음
+# - 레코드는 get()/[]/keys() 를 지원해 기존 dict 용 코드(element_point, build_table, nearest_open)와 호환
+
+import gc
+import json
+
+from overpass_query import ROW_TAGS
+
+TYPES = ("node", "way", "relation")
+_ROW_TAGS = frozenset(ROW_TAGS)
+
+
+class OsmElement:
+    """Overpass 요소 하나 (type, id, lat, lon, tags). node 가 아니면 get("center") 로 중심좌표"""
+
+    __slots__ = ("type", "id", "lat", "lon", "tags")
+
+    def __init__(self, type, id, lat, lon, tags):
+        self.type = type
+        self.id = id
+        self.lat = lat
+        self.lon = lon
+        self.tags = tags
+
+    def keys(self):
+        if self.type == "node":
+            return ("type", "id", "lat", "lon", "tags")
+        return ("type", "id", "center", "tags")
+
+    def __getitem__(self, key):
+        if key == "center" and self.type != "node":
+            return {"lat": self.lat, "lon": self.lon}
+        if key in ("lat", "lon") and self.type != "node":
+            raise KeyError(key)
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other):
+        if isinstance(other, OsmElement):
+            return all(getattr(self, s) == getattr(other, s) for s in self.__slots__)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"OsmElement({self.type!r}, {self.id!r}, {self.lat!r}, {self.lon!r}, {self.tags!r})"
+
+
+def _point(d):
+    if "lat" in d and "lon" in d:
+        return d["lat"], d["lon"]
+    c = d.get("center")
+    if isinstance(c, dict) and "lat" in c:
+        return c["lat"], c.get("lon")
+    g = d.get("geometry")
+    if isinstance(g, dict) and g.get("type") == "Point" and g.get("coordinates"):
+        lon, lat = g["coordinates"][:2]
+        return lat, lon
+    return None, None
+
+
+def _make_hook():
+    values = {}  # 같은 태그 값(opening_hours 등 반복이 많음)은 문자열 하나를 공유
+
+    def hook(d):
+        # 안쪽 dict 부터 호출됨: tags/center/geometry → 요소 → 최상위
+        if "type" not in d or "id" not in d:
+            return d
+        tags = d.get("tags") or {}
+        osm_type = d["type"]
+        if osm_type not in TYPES:
+            # compact(convert) 결과: 원래 타입은 osm_type 태그, 없는 태그는 빈 문자열
+            osm_type = tags.get("osm_type") or "node"
+            tags = {k: values.setdefault(v, v) for k, v in tags.items() if k in _ROW_TAGS and v != ""}
+        else:
+            tags = {k: values.setdefault(v, v) for k, v in tags.items() if k in _ROW_TAGS}
+        lat, lon = _point(d)
+        return OsmElement(osm_type, d["id"], lat, lon, tags)
+
+    return hook
+
+
+def decode_overpass(raw):
+    """응답 본문(bytes/str) → {"elements": [OsmElement...], 그 밖의 최상위 필드}
+
+    좌표가 없는 요소는 버린다. JSON 오류는 ValueError.
+    """
+    # 컨테이너를 대량으로 만들었다 버리므로 그동안 순환 GC 는 멈춤 (참조 카운트로 즉시 해제됨)
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        data = json.loads(raw, object_hook=_make_hook())
+    finally:
+        if enabled:
+            gc.enable()
+    if not isinstance(data, dict):
+        raise ValueError("Overpass 응답이 JSON 객체가 아닙니다")
+    if "elements" in data:
+        data["elements"] = [el for el in data["elements"] if isinstance(el, OsmElement) and el.lat is not None]
+    return data
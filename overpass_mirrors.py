@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+# Overpass 미러 hedged 요청
+# - 가장 좋은 미러에 먼저 요청, 최근 지연시간 백분위(p90)만큼 기다려도 응답이 없으면
+#   다음 미러에 추가 요청(hedge) → 먼저 도착한 정상 JSON 채택, 나머지는 취소
+# - 실패한 요청은 sleep 없이 즉시 다음 미러로 넘어감
+# - 진 요청은 연결을 끊어 바로 정리 (응답 헤더를 기다리는 중이어도, http_pool.Cancel)
+# - 전체 deadline, 승자 미러, 미러별 소요시간 리포트
+# - 미러 상태표(프로세스 전역): 지연 EWMA, 최근 오류율, 429 쿨다운, 서킷 브레이커
+
+import threading
+import time as _time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+
+import http_pool
+from overpass_decode import decode_overpass
+from stage_metrics import stage
+
+
+class MirrorError(Exception):
+    """미러 한 곳의 실패 (HTTP 오류, 잘못된 JSON, 취소 등)"""
+
+    def __init__(self, url, outcome, detail="", status=None, retry_after=None):
+        super().__init__(f"{url} → {outcome} {detail}".strip())
+        self.url = url
+        self.outcome = outcome
+        self.detail = detail
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value):
+    """Retry-After 헤더(초 단위)만 지원, 날짜 형식이면 None"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+# ---------------- 최근 지연시간 (hedge 지연 계산용) ----------------
+class LatencyWindow:
+    def __init__(self, size=50):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=size)
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q, default=None):
+        with self._lock:
+            xs = sorted(self._samples)
+        if not xs:
+            return default
+        idx = min(len(xs) - 1, int(round(q * (len(xs) - 1))))
+        return xs[idx]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._samples)
+
+
+LATENCIES = LatencyWindow()
+
+
+# ---------------- 미러 상태표 + 서킷 브레이커 ----------------
+class MirrorHealth:
+    """미러별 상태를 프로세스 전역으로 공유 (모든 세션이 같은 인스턴스 사용)
+
+    - latency EWMA (성공 응답 기준, 취소된 느린 요청은 하한값으로 반영)
+    - 최근 window 개 결과의 오류율
+    - 429 → Retry-After(없으면 cooldown) 동안 제외
+    - 연속 실패/오류율이 높으면 서킷 open → open_for 초 뒤 half-open 에서 1회 탐침
+      (탐침 실패 시 open_for 두 배, 최대 max_open)
+    """
+
+    def __init__(self, alpha=0.3, window=20, prior_latency=2.0, cooldown=60.0,
+                 fail_threshold=3, error_rate_threshold=0.5, min_samples=4,
+                 open_for=30.0, max_open=600.0, clock=_time.monotonic):
+        self.alpha = alpha
+        self.window = window
+        self.prior_latency = prior_latency
+        self.cooldown = cooldown
+        self.fail_threshold = fail_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_samples = min_samples
+        self.open_for = open_for
+        self.max_open = max_open
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = {}
+
+    def _get(self, url):
+        ms = self._state.get(url)
+        if ms is None:
+            ms = self._state[url] = {
+                "ewma": None, "results": deque(maxlen=self.window), "consecutive_failures": 0,
+                "cooldown_until": 0.0, "circuit": "closed", "open_until": 0.0,
+                "open_for": self.open_for, "probing": False, "last_status": None,
+                "successes": 0, "failures": 0,
+            }
+        return ms
+
+    def _error_rate(self, ms):
+        rs = ms["results"]
+        return (sum(1 for ok in rs if not ok) / len(rs)) if rs else 0.0
+
+    def _available(self, ms, now):
+        if now < ms["cooldown_until"]:
+            return False
+        if ms["circuit"] == "open":
+            return now >= ms["open_until"] and not ms["probing"]
+        if ms["circuit"] == "half-open":
+            return not ms["probing"]
+        return True
+
+    def ranked(self, endpoints):
+        """사용 가능한 미러를 빠른 순으로. 모두 불가하면 가장 빨리 풀리는 미러부터 전부."""
+        now = self._clock()
+        with self._lock:
+            avail, blocked = [], []
+            for i, url in enumerate(endpoints):
+                ms = self._get(url)
+                lat = ms["ewma"] if ms["ewma"] is not None else self.prior_latency
+                if self._available(ms, now):
+                    avail.append((lat, i, url))
+                else:
+                    blocked.append((max(ms["cooldown_until"], ms["open_until"]), i, url))
+        if avail:
+            return [u for _, _, u in sorted(avail)]
+        return [u for _, _, u in sorted(blocked)]
+
+    def begin(self, url):
+        """요청 시작 알림. open 서킷의 대기시간이 끝났으면 half-open 탐침으로 전환."""
+        now = self._clock()
+        with self._lock:
+            ms = self._get(url)
+            if ms["circuit"] == "open" and now >= ms["open_until"]:
+                ms["circuit"] = "half-open"
+            if ms["circuit"] == "half-open":
+                ms["probing"] = True
+
+    def record_success(self, url, elapsed):
+        with self._lock:
+            ms = self._get(url)
+            ms["ewma"] = elapsed if ms["ewma"] is None else (self.alpha * elapsed + (1 - self.alpha) * ms["ewma"])
+            if ms["circuit"] != "closed":
+                ms["results"].clear()  # 탐침 성공 → 과거 오류율로 바로 다시 열리지 않도록
+            ms["results"].append(True)
+            ms["consecutive_failures"] = 0
+            ms["successes"] += 1
+            ms["last_status"] = 200
+            ms["circuit"], ms["probing"], ms["open_for"] = "closed", False, self.open_for
+
+    def record_failure(self, url, status=None, retry_after=None):
+        now = self._clock()
+        with self._lock:
+            ms = self._get(url)
+            ms["results"].append(False)
+            ms["consecutive_failures"] += 1
+            ms["failures"] += 1
+            ms["last_status"] = status
+            if status == 429:
+                ms["cooldown_until"] = now + (retry_after if retry_after is not None else self.cooldown)
+            if ms["circuit"] == "half-open":
+                # 탐침 실패 → 더 오래 open
+                ms["open_for"] = min(self.max_open, ms["open_for"] * 2)
+                self._open(ms, now)
+            elif ms["circuit"] == "closed" and (
+                ms["consecutive_failures"] >= self.fail_threshold
+                or (len(ms["results"]) >= self.min_samples
+                    and self._error_rate(ms) >= self.error_rate_threshold)):
+                self._open(ms, now)
+
+    def _open(self, ms, now):
+        ms["circuit"], ms["probing"] = "open", False
+        ms["open_until"] = now + ms["open_for"]
+
+    def record_cancelled(self, url, elapsed):
+        # hedge 에서 진 요청: 실패는 아니지만 최소 elapsed 만큼 느렸다는 정보
+        with self._lock:
+            ms = self._get(url)
+            ms["probing"] = False
+            if ms["ewma"] is None or elapsed > ms["ewma"]:
+                base = ms["ewma"] if ms["ewma"] is not None else elapsed
+                ms["ewma"] = self.alpha * elapsed + (1 - self.alpha) * base
+
+    def snapshot(self, endpoints=None):
+        """진단 화면용 상태표 (list of dict)"""
+        now = self._clock()
+        with self._lock:
+            urls = endpoints if endpoints is not None else list(self._state)
+            rows = []
+            for url in urls:
+                ms = self._get(url)
+                rows.append({
+                    "endpoint": url,
+                    "circuit": ms["circuit"],
+                    "available": self._available(ms, now),
+                    "latency_ewma_s": None if ms["ewma"] is None else round(ms["ewma"], 3),
+                    "error_rate": round(self._error_rate(ms), 2),
+                    "cooldown_left_s": round(max(0.0, ms["cooldown_until"] - now), 1),
+                    "open_left_s": round(max(0.0, ms["open_until"] - now), 1) if ms["circuit"] != "closed" else 0.0,
+                    "last_status": ms["last_status"],
+                    "ok": ms["successes"],
+                    "fail": ms["failures"],
+                })
+            return rows
+
+
+HEALTH = MirrorHealth()
+
+HEDGE_PERCENTILE = 0.9
+HEDGE_MIN_SAMPLES = 5
+HEDGE_DEFAULT_DELAY = 3.0
+HEDGE_DELAY_BOUNDS = (0.5, 10.0)
+
+
+def hedge_delay(window=LATENCIES, q=HEDGE_PERCENTILE):
+    """다음 미러에 추가 요청을 보내기까지 기다릴 시간(초)"""
+    if len(window) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    lo, hi = HEDGE_DELAY_BOUNDS
+    return min(hi, max(lo, window.percentile(q)))
+
+
+def _valid_payload(data):
+    # Overpass 는 타임아웃/메모리 초과도 200 + remark 로 돌려준다
+    if not isinstance(data, dict) or "elements" not in data:
+        return False
+    remark = data.get("remark") or ""
+    return "runtime error" not in remark
+
+
+def _attempt(url, query, headers, timeout, cancel):
+    """미러 한 곳에 요청. cancel(http_pool.Cancel)이 켜지면 연결을 끊는다 (헤더 대기/본문 읽기 중 모두)."""
+    r = None
+    try:
+        with cancel.watch():
+            r = http_pool.post(url, data={"data": query}, headers=headers, timeout=timeout, stream=True)
+            if r.status_code != 200:
+                snippet = (r.text or "")[:300].replace("\n", " ")
+                raise MirrorError(url, f"HTTP {r.status_code}", f"{r.reason} • body: {snippet}",
+                                  status=r.status_code, retry_after=parse_retry_after(r.headers.get("Retry-After")))
+            buf = bytearray()
+            for chunk in r.iter_content(chunk_size=64 * 1024):
+                if cancel.is_set():
+                    raise MirrorError(url, "cancelled")
+                buf.extend(chunk)
+    except http_pool.PoolTimeout as e:
+        # 이 미러로 가는 연결이 모두 묶여 있음 → 미러 실패로 세고 다음 미러로
+        raise MirrorError(url, "pool timeout", str(e))
+    except requests.exceptions.RequestException:
+        if cancel.is_set():
+            raise MirrorError(url, "cancelled")
+        raise
+    finally:
+        if r is not None:
+            r.close()  # watch() 를 빠져나온 뒤에 반납
+    try:
+        with stage("overpass_decode", bytes=len(buf)):  # 워커 스레드 → 히스토그램에만
+            data = decode_overpass(buf)
+    except ValueError as je:
+        raise MirrorError(url, "JSON parse fail", str(je))
+    if not _valid_payload(data):
+        raise MirrorError(url, "invalid payload", str(data.get("remark", ""))[:200] if isinstance(data, dict) else "")
+    return data
+
+
+def fetch_hedged(query, endpoints, headers=None, deadline=45.0, delay=None,
+                 connect_timeout=10.0, window=LATENCIES, health=HEALTH):
+    """상태표 기준 가장 빠른 정상 미러부터 hedged 요청. (data, url, report) 반환.
+
+    report = {"winner", "elapsed", "hedge_delay",
+              "attempts": [{"endpoint", "started", "elapsed", "outcome", "detail"}]}
+    모든 미러가 실패하거나 deadline 을 넘기면 RuntimeError.
+    """
+    if not endpoints:
+        raise ValueError("endpoints 가 비어 있습니다")
+    delay = hedge_delay(window) if delay is None else delay
+    t0 = _time.monotonic()
+    cancel = http_pool.Cancel()
+    attempts = []
+    futures = {}
+    pending_urls = health.ranked(endpoints) if health is not None else list(endpoints)
+    report = {"winner": None, "elapsed": None, "hedge_delay": delay, "attempts": attempts}
+
+    def run(rec):
+        remaining = max(0.1, deadline - (_time.monotonic() - t0))
+        start = _time.monotonic()
+        try:
+            data = _attempt(rec["endpoint"], query, headers, (min(connect_timeout, remaining), remaining), cancel)
+        finally:
+            rec["elapsed"] = _time.monotonic() - start
+        return data
+
+    def launch():
+        url = pending_urls.pop(0)
+        rec = {"endpoint": url, "started": _time.monotonic() - t0, "elapsed": None, "outcome": "running", "detail": ""}
+        attempts.append(rec)
+        if health is not None:
+            health.begin(url)
+        futures[pool.submit(run, rec)] = rec
+
+    pool = ThreadPoolExecutor(max_workers=len(endpoints), thread_name_prefix="overpass-hedge")
+    try:
+        launch()
+        last_launch = _time.monotonic()
+        while True:
+            now = _time.monotonic()
+            remaining = deadline - (now - t0)
+            if remaining <= 0:
+                break
+            running = [f for f in futures if not f.done()]
+            if not running and not pending_urls:
+                break
+            timeout = remaining
+            if pending_urls:
+                timeout = min(timeout, max(0.0, delay - (now - last_launch)))
+            if running:
+                wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            failed = False
+            for f in [f for f in futures if f.done() and futures[f]["outcome"] == "running"]:
+                rec = futures[f]
+                try:
+                    data = f.result()
+                except MirrorError as me:
+                    rec["outcome"], rec["detail"] = me.outcome, me.detail
+                    if health is not None:
+                        health.record_failure(rec["endpoint"], me.status, me.retry_after)
+                    failed = True
+                    continue
+                except requests.exceptions.RequestException as e:
+                    rec["outcome"], rec["detail"] = "RequestException", str(e)
+                    if health is not None:
+                        health.record_failure(rec["endpoint"])
+                    failed = True
+                    continue
+                rec["outcome"] = "ok"
+                window.add(rec["elapsed"])
+                if health is not None:
+                    health.record_success(rec["endpoint"], rec["elapsed"])
+                report["winner"] = rec["endpoint"]
+                report["elapsed"] = _time.monotonic() - t0
+                return data, rec["endpoint"], report
+            if pending_urls and (failed or not running or _time.monotonic() - last_launch >= delay):
+                # 실패했으면 바로, 응답이 늦으면 hedge 지연 후 다음 미러에 추가 요청
+                launch()
+                last_launch = _time.monotonic()
+        report["elapsed"] = _time.monotonic() - t0
+        for rec in attempts:
+            if rec["outcome"] == "running":
+                rec["outcome"] = "deadline"
+                rec["elapsed"] = report["elapsed"] - rec["started"]
+                if health is not None:
+                    health.record_failure(rec["endpoint"])
+        raise RuntimeError(f"Overpass 요청 실패 (deadline={deadline}s, attempts={_summary(attempts)})")
+    finally:
+        cancel.set()
+        end = _time.monotonic() - t0
+        for rec in attempts:
+            if rec["outcome"] == "running":
+                rec["outcome"] = "cancelled"
+                rec["elapsed"] = end - rec["started"]
+                if health is not None:
+                    health.record_cancelled(rec["endpoint"], rec["elapsed"])
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _summary(attempts):
+    return [(a["endpoint"], a["outcome"], None if a["elapsed"] is None else round(a["elapsed"], 2)) for a in attempts]
+
+
+def format_report(report):
+    """st.caption 용 한 줄 요약"""
+    parts = []
+    for a in report["attempts"]:
+        el = "?" if a["elapsed"] is None else f"{a['elapsed']:.2f}s"
+        host = a["endpoint"].split("/")[2] if "://" in a["endpoint"] else a["endpoint"]
+        parts.append(f"{host} {a['outcome']} {el}")
+    return " | ".join(parts)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# Overpass 약국 쿼리
+# - 기본(full): node/way/relation × 태그 4종 = 12개 구문, out center tags (모든 태그 전송)
+# - compact: nwr 로 타입 병합(4개 구문) + convert 로 행 생성에 쓰는 태그/중심좌표만 출력
+# - normalize_elements: compact 응답(convert 결과)을 기존 행 생성 코드가 읽는 모양으로 변환
+# - build_ring_query: 바깥 원 - 안쪽 원 (이미 받은 안쪽 영역은 다시 받지 않음)
+# - build_bbox_query: 사각 영역 (여러 세션의 가까운 반경 검색을 한 번에 받을 때)
+# - build_boxes_query: 사각 영역 여러 개의 합집합 (없는 타일만 한 번에 받을 때, overpass_tiles.py)
+
+# 행 생성 코드가 실제로 읽는 태그
+ROW_TAGS = ("name", "alt_name", "phone", "contact:phone", "opening_hours")
+
+# 약국 태그 필터 4종 — name 은 대소문자 무시 정규식
+PHARMACY_FILTERS = (
+    '["amenity"="pharmacy"]',
+    '["healthcare"="pharmacy"]',
+    '["shop"="chemist"]',
+    '["name"~"(pharm|약국)",i]',
+)
+
+
+# ---------------- Overpass query (fixed regex flags) ----------------
+def build_overpass_query(lat, lon, radius, compact=False):
+    if compact:
+        return build_compact_query(lat, lon, radius)
+    # 핵심 수정: (?i) 대신 ,i 플래그 사용 → ["name"~"...",i]
+    return f"""
+    [out:json][timeout:40];
+    (
+      node["amenity"="pharmacy"](around:{radius},{lat},{lon});
+      way ["amenity"="pharmacy"](around:{radius},{lat},{lon});
+      relation["amenity"="pharmacy"](around:{radius},{lat},{lon});
+
+      node["healthcare"="pharmacy"](around:{radius},{lat},{lon});
+      way ["healthcare"="pharmacy"](around:{radius},{lat},{lon});
+      relation["healthcare"="pharmacy"](around:{radius},{lat},{lon});
+
+      node["shop"="chemist"](around:{radius},{lat},{lon});
+      way ["shop"="chemist"](around:{radius},{lat},{lon});
+      relation["shop"="chemist"](around:{radius},{lat},{lon});
+
+      node["name"~"(pharm|약국)",i](around:{radius},{lat},{lon});
+      way ["name"~"(pharm|약국)",i](around:{radius},{lat},{lon});
+      relation["name"~"(pharm|약국)",i](around:{radius},{lat},{lon});
+    );
+    out center tags;
+    """
+
+
+def union_body(lat, lon, radius):
+    """nwr 로 병합한 합집합 본문 (compact / 링 쿼리 공용)"""
+    return "\n".join(f"  nwr{f}(around:{radius},{lat},{lon});" for f in PHARMACY_FILTERS)
+
+
+def bbox_body(south, west, north, east):
+    return "\n".join(f"  nwr{f}({south},{west},{north},{east});" for f in PHARMACY_FILTERS)
+
+
+def projection(set_name="_"):
+    # 필요한 태그 + 중심좌표만 남긴 파생 요소로 변환 (원래 타입은 osm_type 태그에 보관)
+    tags = ", ".join(f'"{k}"=t["{k}"]' for k in ROW_TAGS)
+    return (f'.{set_name} convert pharmacy ::id=id(), ::geom=center(geom()), osm_type=type(), {tags};\n'
+            f'out geom;')
+
+
+def build_compact_query(lat, lon, radius):
+    return (f"[out:json][timeout:40];\n"
+            f"(\n{union_body(lat, lon, radius)}\n);\n"
+            f"{projection()}\n")
+
+
+def build_ring_query(lat, lon, r_inner, r_outer, compact=False):
+    """r_inner < 거리 <= r_outer 인 고리 영역만 조회 (r_inner <= 0 이면 원 전체)"""
+    if r_inner <= 0:
+        return build_overpass_query(lat, lon, r_outer, compact=compact)
+    out = projection("ring") if compact else ".ring out center tags;"
+    return (f"[out:json][timeout:60];\n"
+            f"(\n{union_body(lat, lon, r_outer)}\n)->.outer;\n"
+            f"(\n{union_body(lat, lon, r_inner)}\n)->.inner;\n"
+            f"(.outer; - .inner;)->.ring;\n"
+            f"{out}\n")
+
+
+def build_bbox_query(south, west, north, east, compact=False):
+    out = projection() if compact else "out center tags;"
+    return (f"[out:json][timeout:60];\n"
+            f"(\n{bbox_body(south, west, north, east)}\n);\n"
+            f"{out}\n")
+
+
+def build_boxes_query(boxes, compact=False):
+    """boxes = [(south, west, north, east), ...] 합집합 한 번에"""
+    out = projection() if compact else "out center tags;"
+    body = "\n".join(bbox_body(*bb) for bb in boxes)
+    return f"[out:json][timeout:60];\n(\n{body}\n);\n{out}\n"
+
+
+def element_point(el):
+    """node 는 lat/lon, way/relation 은 center. 좌표가 없으면 None"""
+    if el.get("type") == "node":
+        return el.get("lat"), el.get("lon")
+    c = el.get("center")
+    if not c:
+        return None
+    return c.get("lat"), c.get("lon")
+
+
+def normalize_elements(data):
+    """compact 응답 → {"type","id","lat","lon","tags"} 목록으로 정규화한 data (full 응답은 그대로)
+
+    convert 는 없는 태그를 빈 문자열로 채우므로 빈 값은 버린다.
+    """
+    elements = data.get("elements", [])
+    if not elements or elements[0].get("type") in ("node", "way", "relation"):
+        return data
+    out = []
+    for el in elements:
+        tags = {k: v for k, v in (el.get("tags") or {}).items() if v != ""}
+        osm_type = tags.pop("osm_type", "node")
+        g = el.get("geometry") or {}
+        if g.get("type") == "Point" and g.get("coordinates"):
+            lon, lat = g["coordinates"][:2]
+        elif "lat" in el and "lon" in el:
+            lat, lon = el["lat"], el["lon"]
+        elif el.get("center"):
+            lat, lon = el["center"].get("lat"), el["center"].get("lon")
+        else:
+            continue
+        item = {"type": osm_type, "id": el.get("id"), "tags": tags}
+        if osm_type == "node":
+            item["lat"], item["lon"] = lat, lon
+        else:
+            item["center"] = {"lat": lat, "lon": lon}
+        out.append(item)
+    return dict(data, elements=out)
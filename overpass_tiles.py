@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+# 타일 단위 Overpass 조회 + 영구 타일 저장소
+# - 지도를 고정 격자(TILE_DEG, 위도 0.01° ≈ 1.1km) 타일로 나눔. 반경 검색 = 원에 걸치는 타일들
+# - 저장소에 없는 타일만 Overpass 에 요청: 이웃한 타일은 사각형으로 합쳐 bbox 합집합 쿼리 한 번
+#   받은 요소는 중심점이 속한 타일에 나눠 저장 (약국이 없는 타일도 "비어 있음"으로 저장)
+# - 결과는 타일 요소를 모아 중심 거리 <= 반경으로 자름 (overpass_coalesce.within)
+#   → 중심을 300m 옮기거나 반경을 1200 → 1500m 로 늘리면 새로 걸친 가장자리 타일만 받음
+# - 타일별 신선도: ttl 이 지난 타일은 그대로 쓰고 백그라운드에서 다시 받음 (stale-while-revalidate)
+# - 동시 검색: 다른 검색이 받고 있는 타일은 다시 요청하지 않고 기다림 (타일별 선점)
+#   → 반경 검색은 이 저장소가 캐시 역할. OverpassCache(결과 캐시)와 bbox 묶음(Coalescer.search)을 거치지 않음
+#     (타일 쿼리는 Coalescer.fetch_once 로 같은 쿼리만 합침). 검색 단위 hit/stale/miss 는 stats()
+# - 저장소는 sqlite (프로세스/워커 간 공유) + 최근 타일 메모리 LRU. 쓰기 불가 환경이면 메모리에만
+#   요소는 [type, id, lat, lon, 행 생성 태그] 로 저장하고 읽을 때 OsmElement (overpass_decode 와 같은 레코드)
+# - 받는 영역이 원보다 넓어 단독 around 검색보다 응답이 조금 큼. way/relation 은 중심점으로 타일을 정하므로
+#   가장자리만 반경에 걸친 건물은 빠질 수 있음 (overpass_coalesce 의 bbox 묶음과 같은 제약)
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time as _time
+from collections import OrderedDict
+
+from haversine import haversine
+
+from overpass_coalesce import circle_bbox, within
+from overpass_decode import OsmElement
+from overpass_query import ROW_TAGS, build_boxes_query, element_point
+from stage_metrics import observe, stage
+
+TILE_DEG = 0.01
+TILE_TTL = 6 * 3600          # 초. 지나면 stale (그대로 쓰고 백그라운드 갱신)
+MAX_TILES = 400              # 검색 하나가 걸칠 수 있는 타일 수 (넘으면 호출자가 기존 방식으로)
+MEMORY_TILES = 4096
+TILE_VERSION = 1             # 약국 필터/저장 형식이 바뀌면 올림 (예전 타일은 키가 달라져 안 쓰임)
+STORE_PATH = os.environ.get("OVERPASS_TILE_PATH", os.path.join("data", "overpass_tiles.sqlite"))
+
+
+def tile_of(lat, lon, deg=TILE_DEG):
+    return math.floor(lat / deg), math.floor(lon / deg)
+
+
+def tile_bbox(tile, deg=TILE_DEG):
+    ty, tx = tile
+    return round(ty * deg, 7), round(tx * deg, 7), round((ty + 1) * deg, 7), round((tx + 1) * deg, 7)
+
+
+def tiles_for(lat, lon, radius, deg=TILE_DEG):
+    """원(lat, lon, radius m)에 걸치는 타일 목록 (모서리만 bbox 에 걸친 타일은 제외)"""
+    s, w, n, e = circle_bbox(lat, lon, radius)
+    (y0, x0), (y1, x1) = tile_of(s, w, deg), tile_of(n, e, deg)
+    out = []
+    for ty in range(y0, y1 + 1):
+        for tx in range(x0, x1 + 1):
+            bs, bw, bn, be = tile_bbox((ty, tx), deg)
+            nearest = (min(max(lat, bs), bn), min(max(lon, bw), be))
+            if haversine((lat, lon), nearest, unit="m") <= radius:
+                out.append((ty, tx))
+    return out
+
+
+def merge_tiles(tiles, deg=TILE_DEG):
+    """타일 집합 → 사각형 bbox 목록 (행마다 이어진 구간, 위아래로 같은 구간이면 합침)"""
+    runs = []
+    for ty in sorted({t[0] for t in tiles}):
+        xs = sorted(t[1] for t in tiles if t[0] == ty)
+        start = prev = xs[0]
+        for x in xs[1:] + [None]:
+            if x is not None and x == prev + 1:
+                prev = x
+                continue
+            runs.append([ty, ty, start, prev])
+            if x is not None:
+                start = prev = x
+    rects = []
+    for r in runs:
+        for q in rects:
+            if q[1] == r[0] - 1 and q[2] == r[2] and q[3] == r[3]:
+                q[1] = r[0]
+                break
+        else:
+            rects.append(r)
+    return [(round(y0 * deg, 7), round(x0 * deg, 7), round((y1 + 1) * deg, 7), round((x1 + 1) * deg, 7))
+            for y0, y1, x0, x1 in rects]
+
+
+# ---------------- 저장소 ----------------
+class TileStore:
+    """타일 키 → (요소 목록, 받은 시각). sqlite + 메모리 LRU"""
+
+    def __init__(self, path=STORE_PATH, memory=MEMORY_TILES, deg=TILE_DEG, clock=_time.time):
+        self.path = path
+        self.memory = memory
+        self.deg = deg
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._mem = OrderedDict()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._db.execute("PRAGMA journal_mode=WAL" if path != ":memory:" else "PRAGMA journal_mode=MEMORY")
+        self._db.execute("CREATE TABLE IF NOT EXISTS tiles (key TEXT PRIMARY KEY, fetched REAL, elements TEXT)")
+        self._db.commit()
+
+    def key(self, tile):
+        return f"v{TILE_VERSION}/{self.deg:g}/{tile[0]}/{tile[1]}"
+
+    def _remember(self, key, item):
+        # 호출자가 lock 을 잡고 있어야 함
+        self._mem[key] = item
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.memory:
+            self._mem.popitem(last=False)
+
+    def get_many(self, tiles):
+        """{tile: (elements, fetched)} — 저장소에 있는 것만"""
+        out, todo = {}, []
+        with self._lock:
+            for t in tiles:
+                item = self._mem.get(self.key(t))
+                if item is not None:
+                    self._mem.move_to_end(self.key(t))
+                    out[t] = item
+                else:
+                    todo.append(t)
+            for i in range(0, len(todo), 500):
+                chunk = {self.key(t): t for t in todo[i:i + 500]}
+                rows = self._db.execute(f"SELECT key, fetched, elements FROM tiles WHERE key IN "
+                                        f"({','.join('?' * len(chunk))})", list(chunk)).fetchall()
+                for key, fetched, elements in rows:
+                    item = ([OsmElement(*r) for r in json.loads(elements)], fetched)
+                    self._remember(key, item)
+                    out[chunk[key]] = item
+        return out
+
+    def put_many(self, by_tile, fetched=None):
+        """by_tile = {tile: [OsmElement, ...]}"""
+        fetched = self.clock() if fetched is None else fetched
+        with self._lock:
+            rows = []
+            for t, elements in by_tile.items():
+                self._remember(self.key(t), (elements, fetched))
+                rows.append((self.key(t), fetched, json.dumps([[e.type, e.id, e.lat, e.lon, e.tags] for e in elements],
+                                                              ensure_ascii=False)))
+            self._db.executemany("INSERT OR REPLACE INTO tiles (key, fetched, elements) VALUES (?, ?, ?)", rows)
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            self._db.execute("DELETE FROM tiles")
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+            return {"path": self.path, "tiles": entries, "memory_tiles": len(self._mem), "tile_deg": self.deg}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store(path=STORE_PATH):
+    """프로세스 전역 TileStore (첫 호출 때 연결)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                try:
+                    _store = TileStore(path)
+                except (OSError, sqlite3.Error):
+                    # 쓰기 불가한 배포 환경 → 프로세스 메모리에만 보관
+                    _store = TileStore(":memory:")
+    return _store
+
+
+# ---------------- 조회 ----------------
+class TileFetcher:
+    """반경 검색을 타일로. fetch(query, warn) → (data, endpoint, report), data 는 normalize_elements 결과"""
+
+    def __init__(self, store, ttl=TILE_TTL, max_tiles=MAX_TILES, clock=_time.time):
+        self.store = store
+        self.ttl = ttl
+        self.max_tiles = max_tiles
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._inflight = {}       # tile -> Event (받는 중)
+        self._refreshing = set()
+        self.searches = 0
+        self.hits = 0             # 검색 단위: 모든 타일이 저장소에 있고 신선
+        self.stale_hits = 0       # 오래된 타일이 섞였지만 받은 것 없이 응답
+        self.misses = 0           # 타일을 새로 받음
+        self.tiles_fresh = 0
+        self.tiles_stale = 0
+        self.tiles_fetched = 0
+        self.tiles_waited = 0
+        self.upstream_queries = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def covers(self, lat, lon, radius):
+        return len(tiles_for(lat, lon, radius, self.store.deg)) <= self.max_tiles
+
+    def _fetch(self, tiles, fetch, compact, warn):
+        """tiles 를 쿼리 한 번으로 받아 저장 → (endpoint, report)"""
+        query = build_boxes_query(merge_tiles(tiles, self.store.deg), compact=compact)
+        with stage("tile_fetch", tiles=len(tiles)):
+            data, endpoint, report = fetch(query, warn)
+        by_tile = {t: [] for t in tiles}
+        for el in data.get("elements", []):
+            p = element_point(el)
+            if p is None or p[0] is None:
+                continue
+            t = tile_of(p[0], p[1], self.store.deg)
+            if t in by_tile:  # 요청하지 않은 타일(이미 있는 이웃)에 중심이 있는 way 는 버림
+                tags = el.get("tags") or {}
+                by_tile[t].append(OsmElement(el["type"], el["id"], p[0], p[1],
+                                             {k: tags[k] for k in ROW_TAGS if k in tags}))
+        self.store.put_many(by_tile)
+        with self._lock:
+            self.upstream_queries += 1
+            self.tiles_fetched += len(tiles)
+        return endpoint, report
+
+    def _refresh(self, tiles, fetch, compact):
+        try:
+            self._fetch(tiles, fetch, compact, None)
+            with self._lock:
+                self.refreshes += 1
+        except Exception:
+            # 갱신 실패 → stale 타일을 계속 제공, 다음 검색에서 다시 시도
+            with self._lock:
+                self.refresh_failures += 1
+        finally:
+            with self._lock:
+                self._refreshing.difference_update(tiles)
+
+    def search(self, lat, lon, radius, fetch, compact=False, warn=None):
+        """(data, endpoint, status, report). status: "hit" | "stale" | "miss" (받은 타일이 있으면)
+
+        data["tiles"] = {"total", "fresh", "stale", "fetched", "waited"}
+        """
+        deg = self.store.deg
+        tiles = tiles_for(lat, lon, radius, deg)
+        endpoint, report = None, None
+        fetched, waited = [], set()
+        with stage("tile_lookup", tiles=len(tiles)):
+            have = self.store.get_many(tiles)
+        for _ in range(2):
+            missing = [t for t in tiles if t not in have]
+            if not missing:
+                break
+            event = threading.Event()
+            with self._lock:
+                mine = [t for t in missing if t not in self._inflight]
+                others = {self._inflight[t] for t in missing if t in self._inflight}
+                for t in mine:
+                    self._inflight[t] = event
+            try:
+                if mine:
+                    endpoint, report = self._fetch(mine, fetch, compact, warn)
+                    fetched += mine
+            finally:
+                with self._lock:
+                    for t in mine:
+                        self._inflight.pop(t, None)
+                event.set()
+            for e in others:  # 다른 검색이 받는 중인 타일 → 기다렸다가 저장소에서
+                e.wait()
+            waited.update(set(missing) - set(mine))
+            have = self.store.get_many(tiles)
+
+        now = self.clock()
+        stale = [t for t in tiles if t in have and t not in fetched and now - have[t][1] >= self.ttl]
+        missing = [t for t in tiles if t not in have]
+        if missing and warn is not None:
+            warn(f"[Overpass] 타일 {len(missing)}개를 받지 못해 결과에서 빠졌습니다")
+        waited = len(waited - set(fetched) - set(missing))
+        fresh = len(tiles) - len(stale) - len(fetched) - len(missing) - waited
+        with self._lock:
+            self.searches += 1
+            self.tiles_fresh += fresh
+            self.tiles_stale += len(stale)
+            self.tiles_waited += waited
+            refresh = [t for t in stale if t not in self._refreshing]
+            self._refreshing.update(refresh)
+        if refresh:
+            threading.Thread(target=self._refresh, args=(refresh, fetch, compact), daemon=True).start()
+
+        t0 = _time.perf_counter()
+        elements = [el for t in tiles if t in have for el in have[t][0]]
+        data = within({"elements": elements}, lat, lon, radius)
+        observe("tile_assemble", _time.perf_counter() - t0, elements=len(elements))
+        data["tiles"] = {"total": len(tiles), "fresh": fresh, "stale": len(stale), "fetched": len(fetched),
+                         "waited": waited}
+        status = "miss" if fetched else "stale" if stale else "hit"
+        with self._lock:
+            if fetched:
+                self.misses += 1
+            elif stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+        return data, endpoint or f"tiles:{self.store.path}", status, report
+
+    def stats(self):
+        with self._lock:
+            out = {"searches": self.searches, "hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses,
+                   "tiles_fresh": self.tiles_fresh, "tiles_stale": self.tiles_stale,
+                   "tiles_fetched": self.tiles_fetched, "tiles_waited": self.tiles_waited,
+                   "upstream_queries": self.upstream_queries, "refreshes": self.refreshes,
+                   "refresh_failures": self.refresh_failures, "ttl": self.ttl}
+        out.update(self.store.stats())
+        return out
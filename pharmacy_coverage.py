@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+# 약국 사각지대(커버리지) 분석
+# - 영역(bbox 또는 hospital_data.KOREA_LOCATIONS 지역 중심 ± half_km)에 step_m 간격 격자를 깔고
+#   격자점마다 "지정한 요일/시각에 영업중인 가장 가까운 약국"까지의 직선거리(m)를 계산
+# - 약국은 영역 + margin_m 범위를 한 번에 가져옴: 로컬 인덱스 또는 Overpass bbox 쿼리 1회 (격자점별 요청 없음)
+# - 영업여부는 opening_hours 고유 문자열별로 한 번만 컴파일·평가 (opening_hours.compile_hours)
+# - 최근접 탐색은 영업중 약국만 넣은 버킷 격자(GridIndex)에서 고리 단위로 넓히며 찾음 (numpy 벡터 연산)
+#   좌표는 영역 중심 기준 등거리 투영(m) — 시 단위 영역에서 오차는 무시할 수준
+# - margin_m 안에 영업중 약국이 없는 격자점은 거리 None (NaN)
+# - 결과: 격자 표(CSV/Parquet), 거리 히트맵 이미지 레이어 + 영업중 약국 지도 (folium)
+#
+# 사용법:
+#   python pharmacy_coverage.py --region 안성시 --half-km 10 --at "토 22:00" --out anseong.parquet --map anseong.html
+#   python pharmacy_coverage.py --bbox 37.45,126.8,37.7,127.2 --at "2026-10-18 22:00" --backend local --out seoul.csv
+
+import argparse
+import math
+import time as _time
+
+import numpy as np
+
+from opening_hours import compile_hours, format_when, is_open_compiled, parse_when, week_second
+from overpass_query import element_point
+
+M_PER_DEG = 111320.0
+MAX_CELLS = 2_000_000
+DEFAULT_MARGIN = 5000
+
+
+def region_bbox(region, half_km=5.0):
+    """KOREA_LOCATIONS 지역 중심 ± half_km → (south, west, north, east)"""
+    from hospital_data import KOREA_LOCATIONS
+    if region not in KOREA_LOCATIONS:
+        raise ValueError(f"알 수 없는 지역: {region}")
+    lat, lon = KOREA_LOCATIONS[region]
+    return expand_bbox((lat, lon, lat, lon), half_km * 1000)
+
+
+def expand_bbox(bbox, margin_m):
+    s, w, n, e = bbox
+    dlat = margin_m / M_PER_DEG
+    dlon = margin_m / (M_PER_DEG * max(math.cos(math.radians((s + n) / 2)), 0.01))
+    return s - dlat, w - dlon, n + dlat, e + dlon
+
+
+def check_bbox(bbox):
+    s, w, n, e = (float(v) for v in bbox)
+    if not (-90 <= s < n <= 90 and -180 <= w < e <= 180):
+        raise ValueError(f"bbox 가 잘못되었습니다: {bbox} (south, west, north, east)")
+    return s, w, n, e
+
+
+class Projection:
+    """중심 기준 등거리 투영 (위경도 ↔ m)"""
+
+    def __init__(self, lat0, lon0):
+        self.lat0, self.lon0 = lat0, lon0
+        self.kx = M_PER_DEG * math.cos(math.radians(lat0))
+
+    def xy(self, lat, lon):
+        return ((np.asarray(lon, dtype=np.float64) - self.lon0) * self.kx,
+                (np.asarray(lat, dtype=np.float64) - self.lat0) * M_PER_DEG)
+
+
+def make_grid(bbox, step_m):
+    """bbox 안 step_m 간격 격자점 → (lats, lons) 1차원 배열 (행 우선, 남→북 / 서→동)"""
+    s, w, n, e = bbox
+    lat_step = step_m / M_PER_DEG
+    lon_step = step_m / (M_PER_DEG * max(math.cos(math.radians((s + n) / 2)), 0.01))
+    lats = np.arange(s + lat_step / 2, n, lat_step)
+    lons = np.arange(w + lon_step / 2, e, lon_step)
+    if len(lats) * len(lons) > MAX_CELLS:
+        raise ValueError(f"격자점이 너무 많습니다 ({len(lats)}x{len(lons)}). step_m 을 늘리거나 영역을 줄이세요")
+    return lats, lons
+
+
+class GridIndex:
+    """2차원 점(m 좌표) 버킷 격자 → 최근접 점 (고리 단위 확장, 질의 전체를 한꺼번에 처리)"""
+
+    def __init__(self, x, y, bucket_m=None):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        n = len(self.x)
+        if n == 0:
+            self.b = bucket_m or 1000.0
+            return
+        self.x0, self.y0 = self.x.min(), self.y.min()
+        w, h = self.x.max() - self.x0, self.y.max() - self.y0
+        # 버킷당 평균 2점 정도 (너무 촘촘한 격자는 만들지 않음)
+        b = bucket_m or max(math.sqrt(max(w * h, 1.0) / max(n / 2, 1)), 50.0)
+        b = max(b, math.sqrt(max(w * h, 1.0) / 1_000_000))
+        self.b = b
+        bx = np.floor((self.x - self.x0) / b).astype(np.int64)
+        by = np.floor((self.y - self.y0) / b).astype(np.int64)
+        self.nbx, self.nby = int(bx.max()) + 1, int(by.max()) + 1
+        key = by * self.nbx + bx
+        order = np.argsort(key, kind="stable")
+        self.order = order
+        self.px, self.py = self.x[order], self.y[order]
+        keys = np.arange(self.nbx * self.nby + 1)
+        self.start = np.searchsorted(key[order], keys, side="left")
+
+    def nearest(self, qx, qy, max_dist=np.inf):
+        """(거리, 점 번호) — max_dist 안에 점이 없으면 (inf, -1)"""
+        qx = np.asarray(qx, dtype=np.float64)
+        qy = np.asarray(qy, dtype=np.float64)
+        best = np.full(len(qx), np.inf)
+        arg = np.full(len(qx), -1, dtype=np.int64)
+        if len(self.x) == 0 or len(qx) == 0:
+            return best, arg
+        b = self.b
+        qbx = np.floor((qx - self.x0) / b).astype(np.int64)
+        qby = np.floor((qy - self.y0) / b).astype(np.int64)
+        # 격자 밖 질의는 가장 가까운 버킷 테두리부터 시작
+        out_x = np.maximum(np.maximum(-qbx, qbx - (self.nbx - 1)), 0)
+        out_y = np.maximum(np.maximum(-qby, qby - (self.nby - 1)), 0)
+        k_first = np.maximum(out_x, out_y)
+        k_max = int(k_first.max()) + self.nbx + self.nby + 2  # max_dist 가 없어도 모든 질의가 점을 찾는 고리
+        active = np.arange(len(qx))
+        for k in range(int(k_first.min()), k_max + 1):
+            # 고리 k 의 버킷까지 최소 거리는 (k-1)*b 이상 → 이미 그보다 가까운 점을 찾았으면 끝
+            lower = max(k - 1, 0) * b
+            active = active[(best[active] > lower) & (lower <= max_dist)]
+            if not len(active):
+                break
+            active_k = active[k_first[active] <= k]
+            if not len(active_k):
+                continue
+            for dx, dy in _ring(k):
+                cx, cy = qbx[active_k] + dx, qby[active_k] + dy
+                ok = (cx >= 0) & (cx < self.nbx) & (cy >= 0) & (cy < self.nby)
+                if not ok.any():
+                    continue
+                q = active_k[ok]
+                bid = cy[ok] * self.nbx + cx[ok]
+                s, e = self.start[bid], self.start[bid + 1]
+                occ = e - s
+                for j in range(int(occ.max()) if len(occ) else 0):
+                    m = occ > j
+                    qi, pi = q[m], s[m] + j
+                    d = np.hypot(self.px[pi] - qx[qi], self.py[pi] - qy[qi])
+                    better = d < best[qi]
+                    best[qi[better]] = d[better]
+                    arg[qi[better]] = self.order[pi[better]]
+        far = best > max_dist
+        best[far], arg[far] = np.inf, -1
+        return best, arg
+
+
+def _ring(k):
+    if k == 0:
+        return [(0, 0)]
+    out = [(dx, -k) for dx in range(-k, k + 1)] + [(dx, k) for dx in range(-k, k + 1)]
+    out += [(-k, dy) for dy in range(-k + 1, k)] + [(k, dy) for dy in range(-k + 1, k)]
+    return out
+
+
+def open_mask(hours, sec, include_unknown=False):
+    """opening_hours 문자열 목록 + 주간 초 → 영업중 bool 배열 (고유 문자열별 한 번만 평가)"""
+    import pandas as pd
+    codes, uniques = pd.factorize(pd.Series(list(hours), dtype=object))
+    status = [is_open_compiled(compile_hours(h), sec) for h in uniques]
+    ok = np.array([s is True or (include_unknown and s is None) for s in status] + [include_unknown], dtype=bool)
+    return ok[codes]
+
+
+def pharmacy_points(elements):
+    """요소 목록 → (lats, lons, names, hours)"""
+    lats, lons, names, hours = [], [], [], []
+    for el in elements:
+        p = element_point(el)
+        if p is None:
+            continue
+        tags = el.get("tags") or {}
+        lats.append(p[0])
+        lons.append(p[1])
+        names.append(tags.get("name") or tags.get("alt_name") or "(이름 없음)")
+        hours.append(tags.get("opening_hours", ""))
+    return np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64), names, hours
+
+
+def analyze(elements, bbox, sec, step_m=100, margin_m=DEFAULT_MARGIN, include_unknown=False):
+    """격자점별 최근접 영업중 약국 거리
+
+    elements 는 bbox 를 margin_m 만큼 넓힌 영역의 약국 (경계 근처 격자점도 바깥 약국까지 봄).
+    반환: {"bbox", "step_m", "shape", "lats", "lons", "dist", "nearest", "open", "when", ...}
+      dist/nearest 는 (행, 열) 배열 — dist 는 m (margin_m 안에 없으면 NaN), nearest 는 open 목록 번호(-1)
+    """
+    t0 = _time.perf_counter()
+    bbox = check_bbox(bbox)
+    plat, plon, names, hours = pharmacy_points(elements)
+    is_open = open_mask(hours, sec, include_unknown)
+    lats, lons = make_grid(bbox, step_m)
+    proj = Projection((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
+
+    ox, oy = proj.xy(plat[is_open], plon[is_open])
+    index = GridIndex(ox, oy)
+    glon, glat = np.meshgrid(lons, lats)
+    gx, gy = proj.xy(glat.ravel(), glon.ravel())
+    t1 = _time.perf_counter()
+    dist, arg = index.nearest(gx, gy, max_dist=margin_m)
+    t2 = _time.perf_counter()
+
+    open_idx = np.nonzero(is_open)[0]
+    dist = np.where(np.isfinite(dist), np.rint(dist), np.nan).reshape(len(lats), len(lons))
+    return {
+        "bbox": bbox,
+        "step_m": step_m,
+        "margin_m": margin_m,
+        "when": format_when(sec),
+        "week_sec": sec,
+        "include_unknown": include_unknown,
+        "shape": dist.shape,
+        "lats": lats,
+        "lons": lons,
+        "dist": dist,
+        "nearest": arg.reshape(dist.shape),
+        "open": [{"name": names[i], "lat": float(plat[i]), "lon": float(plon[i]), "hours": hours[i]}
+                 for i in open_idx],
+        "pharmacies": len(names),
+        "timing": {"prepare_s": round(t1 - t0, 4), "nearest_s": round(t2 - t1, 4),
+                   "total_s": round(_time.perf_counter() - t0, 4)},
+    }
+
+
+def summary(result):
+    """거리 분포 요약 (격자점 비율)"""
+    d = result["dist"].ravel()
+    ok = d[~np.isnan(d)]
+    out = {"cells": int(d.size), "open_pharmacies": len(result["open"]), "pharmacies": result["pharmacies"],
+           "beyond_margin": int(d.size - ok.size)}
+    if ok.size:
+        out.update({"median_m": float(np.median(ok)), "p90_m": float(np.percentile(ok, 90)),
+                    "max_m": float(ok.max())})
+    for limit in (500, 1000, 2000):
+        out[f"within_{limit}m"] = round(float((ok <= limit).sum()) / max(d.size, 1), 4)
+    return out
+
+
+def to_frame(result):
+    """격자 표 (위도, 경도, 거리(m), 가장가까운약국) — 한 행이 격자점 하나"""
+    import pandas as pd
+    glon, glat = np.meshgrid(result["lons"], result["lats"])
+    names = np.array([p["name"] for p in result["open"]] + [""], dtype=object)
+    return pd.DataFrame({
+        "위도": glat.ravel(),
+        "경도": glon.ravel(),
+        "거리(m)": result["dist"].ravel(),
+        "가장가까운약국": names[result["nearest"].ravel()],
+    })
+
+
+def to_payload(result):
+    """analyze 결과 → JSON 으로 보낼 dict (배열은 list, NaN 은 None)"""
+    out = {k: v for k, v in result.items() if k not in ("lats", "lons", "dist", "nearest")}
+    out["bbox"], out["shape"] = list(result["bbox"]), list(result["shape"])
+    out["lats"], out["lons"] = result["lats"].tolist(), result["lons"].tolist()
+    d = result["dist"]
+    out["dist"] = np.where(np.isnan(d), -1, d).astype(np.int64).tolist()
+    out["nearest"] = result["nearest"].tolist()
+    out["summary"] = summary(result)
+    return out
+
+
+def from_payload(payload):
+    """to_payload 의 역변환 (to_frame / coverage_map 에 그대로 사용)"""
+    result = dict(payload)
+    result["bbox"], result["shape"] = tuple(payload["bbox"]), tuple(payload["shape"])
+    result["lats"] = np.asarray(payload["lats"], dtype=np.float64)
+    result["lons"] = np.asarray(payload["lons"], dtype=np.float64)
+    d = np.asarray(payload["dist"], dtype=np.float64).reshape(result["shape"])
+    result["dist"] = np.where(d < 0, np.nan, d)
+    result["nearest"] = np.asarray(payload["nearest"], dtype=np.int64).reshape(result["shape"])
+    return result
+
+
+def save_table(result, path):
+    """확장자로 형식 결정: .parquet (pyarrow 필요) / .csv"""
+    df = to_frame(result)
+    if path.endswith(".parquet"):
+        try:
+            df.to_parquet(path, index=False)
+        except ImportError:
+            raise RuntimeError("Parquet 로 저장하려면 pyarrow 가 필요합니다: pip install pyarrow")
+    else:
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+    return len(df)
+
+
+# ---------------- 히트맵 ----------------
+# 거리 구간 → 색 (가까움 초록 → 멂 빨강, margin 밖은 진한 보라)
+LEVELS = [(300, (26, 152, 80)), (600, (145, 207, 96)), (1000, (217, 239, 139)),
+          (1500, (254, 224, 139)), (2500, (252, 141, 89)), (np.inf, (215, 48, 39))]
+BEYOND = (84, 39, 143)
+
+
+def heat_rgba(dist, alpha=150):
+    """거리 격자 → RGBA 이미지 배열 (북쪽이 위)"""
+    h, w = dist.shape
+    img = np.zeros((h, w, 4), dtype=np.uint8)
+    lo = -np.inf
+    for hi, rgb in LEVELS:
+        m = (dist > lo) & (dist <= hi)
+        img[m, :3] = rgb
+        lo = hi
+    img[np.isnan(dist), :3] = BEYOND
+    img[..., 3] = alpha
+    return img[::-1]
+
+
+def coverage_map(result, mode="auto"):
+    """거리 히트맵(이미지 레이어) + 영업중 약국 지도"""
+    import folium
+    from map_render import COLORS, GeoJsonCluster, points_geojson, resolve_mode
+    s, w, n, e = result["bbox"]
+    fmap = folium.Map(location=((s + n) / 2, (w + e) / 2), zoom_start=12, control_scale=True)
+    folium.raster_layers.ImageOverlay(heat_rgba(result["dist"]), bounds=[[s, w], [n, e]],
+                                      name=f"영업중 약국까지 거리 ({result['when']})",
+                                      mercator_project=True).add_to(fmap)
+    folium.Rectangle([[s, w], [n, e]], color="#333333", weight=1, fill=False).add_to(fmap)
+    shops = result["open"]
+    if shops:
+        if resolve_mode(mode, len(shops)) == "geojson":
+            props = [{"tooltip": p["name"], "hours": p["hours"], "color": COLORS["green"]} for p in shops]
+            GeoJsonCluster(points_geojson([p["lat"] for p in shops], [p["lon"] for p in shops], props),
+                           popup='return esc(p.tooltip) + "<br/>" + esc(p.hours);').add_to(fmap)
+        else:
+            for p in shops:
+                folium.CircleMarker((p["lat"], p["lon"]), radius=4, color=COLORS["green"], fill=True,
+                                    tooltip=f"{p['name']} • {p['hours']}").add_to(fmap)
+    legend = "".join(
+        f'<span style="background:rgb{rgb};padding:0 8px;margin-right:4px"></span>'
+        f'{"≤" + str(int(hi)) + "m" if np.isfinite(hi) else "그 이상"}&nbsp; ' for hi, rgb in LEVELS)
+    legend += f'<span style="background:rgb{BEYOND};padding:0 8px;margin-right:4px"></span>{result["margin_m"]}m 밖'
+    fmap.get_root().html.add_child(folium.Element(
+        f'<div style="position:fixed;bottom:12px;left:12px;z-index:1000;background:white;padding:4px 8px;'
+        f'font-size:12px;border:1px solid #999">{result["when"]} 영업중 약국까지 거리: {legend}</div>'))
+    folium.LayerControl().add_to(fmap)
+    return fmap
+
+
+# ---------------- 약국 불러오기 ----------------
+def load_elements(bbox, backend="overpass", hedged=True, service=None):
+    """bbox 안 약국 요소 — 로컬 인덱스 또는 Overpass bbox 쿼리 1회 (검색 서비스 캐시/합치기 사용)"""
+    from overpass_query import build_bbox_query
+    from search_service import QUERY_TAGS, get_service
+    service = service or get_service()
+    s, w, n, e = bbox
+    if backend == "local":
+        lat, lon = (s + n) / 2, (w + e) / 2
+        diag = math.hypot((n - s) * M_PER_DEG, (e - w) * M_PER_DEG * math.cos(math.radians(lat))) / 2
+        out = []
+        for el in service.local_index().query(lat, lon, diag + 1)["elements"]:
+            p = element_point(el)
+            if p is not None and s <= p[0] <= n and w <= p[1] <= e:
+                out.append(el)
+        return out
+    bbox = tuple(round(v, 4) for v in bbox)
+    key = ("bbox",) + bbox + (tuple(sorted(QUERY_TAGS)),)
+    return service.cached_fetch(key, build_bbox_query(*bbox, compact=True), hedged)[0].get("elements", [])
+
+
+def run(bbox, sec, step_m=100, margin_m=DEFAULT_MARGIN, backend="overpass", include_unknown=False, service=None,
+        hedged=True):
+    bbox = check_bbox(bbox)
+    t0 = _time.perf_counter()
+    elements = load_elements(expand_bbox(bbox, margin_m), backend, hedged, service)
+    fetch_s = _time.perf_counter() - t0
+    result = analyze(elements, bbox, sec, step_m, margin_m, include_unknown)
+    result["timing"]["fetch_s"] = round(fetch_s, 4)
+    return result
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="약국 사각지대(커버리지) 분석")
+    where = ap.add_mutually_exclusive_group(required=True)
+    where.add_argument("--region", help="hospital_data.KOREA_LOCATIONS 지역명 (예: 안성시)")
+    where.add_argument("--bbox", help="south,west,north,east")
+    ap.add_argument("--half-km", type=float, default=5.0, help="--region 중심에서 사방으로 넓힐 거리 (km)")
+    ap.add_argument("--at", default="일 22:00", help="기준 요일/시각 (예: '토 22:00', '2026-10-18 22:00')")
+    ap.add_argument("--step", type=float, default=100, help="격자 간격 (m)")
+    ap.add_argument("--margin", type=float, default=DEFAULT_MARGIN, help="영역 밖 약국도 볼 거리 (m)")
+    ap.add_argument("--backend", choices=("overpass", "local"), default="overpass")
+    ap.add_argument("--index-dir", default=None, help="로컬 인덱스 경로 (기본: PHARMACY_INDEX_DIR)")
+    ap.add_argument("--include-unknown", action="store_true", help="영업시간 표기 없는 약국도 영업중으로 간주")
+    ap.add_argument("--out", help="격자 표 저장 경로 (.parquet / .csv)")
+    ap.add_argument("--map", help="히트맵 지도 HTML 저장 경로")
+    args = ap.parse_args(argv)
+
+    bbox = region_bbox(args.region, args.half_km) if args.region else [float(v) for v in args.bbox.split(",")]
+    from datetime import datetime
+    from search_service import SearchService, get_service
+    from tz_lookup import tz_at
+    service = SearchService(args.index_dir) if args.index_dir else get_service()
+    now = datetime.now(tz_at((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2))  # "22:00" → 영역 시간대의 오늘
+    result = run(bbox, parse_when(args.at, now), args.step, args.margin, args.backend, args.include_unknown, service)
+    print(f"[coverage] {result['when']} • 격자 {result['shape'][0]}x{result['shape'][1]} ({args.step:g}m) • "
+          f"약국 {result['pharmacies']}곳 중 영업중 {len(result['open'])}곳 • {result['timing']}")
+    for k, v in summary(result).items():
+        print(f"  {k}: {v}")
+    if args.out:
+        print(f"[coverage] {save_table(result, args.out)}행 → {args.out}")
+    if args.map:
+        coverage_map(result).save(args.map)
+        print(f"[coverage] 지도 → {args.map}")
+
+
+if __name__ == "__main__":
+    main()
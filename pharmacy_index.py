@@ -0,0 +1,451 @@
+# -*- coding: utf-8 -*-
+# 로컬 약국 인덱스 (Overpass 없이 반경 검색)
+# - OSM 추출본(.osm / .osm.gz / .osm.bz2, .osm.pbf 는 pyosmium 필요)에서
+#   build_overpass_query 와 같은 조건(amenity/healthcare=pharmacy, shop=chemist, name~약국|pharm)의 요소 추출
+# - 격자 셀 번호로 정렬한 열(column) 파일(.npy) → np.load(mmap_mode="r") 로 메모리 매핑
+# - query(): Overpass 응답과 같은 모양({"elements": [...]})으로 반환 → app.py 행 생성 코드 그대로 사용
+# - 변경분(delta.json: 추가/수정/삭제 + 적용한 replication sequence)은 조회 시 기본 열 위에 덮어씀
+#   (pharmacy_updates.py 가 작성, 일정 크기가 넘으면 기본 열로 합쳐 다시 씀)
+#
+# 사용법:
+#   python pharmacy_index.py build south-korea-latest.osm.pbf data/pharmacy_index
+#   python pharmacy_index.py query data/pharmacy_index 37.5663 126.9779 1200
+#   python pharmacy_updates.py data/pharmacy_index diffs/        (변경분 적용)
+
+import argparse
+import bz2
+import gzip
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import time as _time
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from overpass_query import ROW_TAGS
+
+NAME_RE = re.compile(r"(pharm|약국)", re.I)
+TYPES = ("node", "way", "relation")
+CELL_DEG = 0.01  # 격자 셀 크기 (위도 0.01° ≈ 1.1km)
+INDEX_VERSION = 1
+
+
+def is_pharmacy(tags):
+    """build_overpass_query 의 태그 조건과 동일"""
+    return (tags.get("amenity") == "pharmacy"
+            or tags.get("healthcare") == "pharmacy"
+            or tags.get("shop") == "chemist"
+            or bool(NAME_RE.search(tags.get("name", ""))))
+
+
+def row_tags(tags):
+    return {k: tags[k] for k in ROW_TAGS if k in tags}
+
+
+# ---------------- OSM readers ----------------
+# 모든 reader 는 파일 순서대로 다음 튜플을 낸다
+#   ("node", id, lat, lon, tags) / ("way", id, [node refs], tags) / ("relation", id, [(type, ref)], tags)
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+
+def read_osm_xml(path):
+    with _open(path) as f:
+        for _, el in ET.iterparse(f, events=("end",)):
+            kind = el.tag
+            if kind not in TYPES:
+                continue
+            tags = {t.get("k"): t.get("v") for t in el.findall("tag")}
+            oid = int(el.get("id"))
+            if kind == "node":
+                if el.get("lat") is not None:
+                    yield "node", oid, float(el.get("lat")), float(el.get("lon")), tags
+            elif kind == "way":
+                yield "way", oid, [int(nd.get("ref")) for nd in el.findall("nd")], tags
+            else:
+                yield "relation", oid, [(m.get("type"), int(m.get("ref"))) for m in el.findall("member")], tags
+            el.clear()
+
+
+def read_osm_pbf(path):
+    try:
+        import osmium
+    except ImportError:
+        raise RuntimeError("PBF 파일을 읽으려면 pyosmium 이 필요합니다: pip install osmium")
+    member_type = {"n": "node", "w": "way", "r": "relation"}
+    for obj in osmium.FileProcessor(path):
+        tags = {t.k: t.v for t in obj.tags}
+        if obj.is_node():
+            if obj.location.valid():
+                yield "node", obj.id, obj.location.lat, obj.location.lon, tags
+        elif obj.is_way():
+            yield "way", obj.id, [n.ref for n in obj.nodes], tags
+        elif obj.is_relation():
+            yield "relation", obj.id, [(member_type.get(m.type, m.type), m.ref) for m in obj.members], tags
+
+
+def reader_for(path):
+    return read_osm_pbf if path.endswith(".pbf") else read_osm_xml
+
+
+def bbox_center(points):
+    # Overpass "out center" 와 같이 외접 사각형의 중심
+    lats = [p[0] for p in points]
+    lons = [p[1] for p in points]
+    return (min(lats) + max(lats)) / 2, (min(lons) + max(lons)) / 2
+
+
+def extract_pharmacies(path, log=print):
+    """OSM 추출본 → ([(type, id, lat, lon, tags), ...], geom)
+
+    geom = {"ways": {id: refs}, "relations": {id: members}, "coords": {node id: (lat, lon)}}
+    — way/relation 중심 재계산용 (변경분 적용 시 사용)
+
+    1차: 조건에 맞는 node/way/relation 수집
+    2차: relation 구성원 way 의 node 목록 (relation 이 있을 때만)
+    3차: 필요한 node 좌표 (way/relation 이 있을 때만)
+    """
+    read = reader_for(path)
+    out, ways, rels = [], {}, {}
+    for item in read(path):
+        kind, oid, tags = item[0], item[1], item[-1]
+        if not tags or not is_pharmacy(tags):
+            continue
+        if kind == "node":
+            out.append(("node", oid, item[2], item[3], row_tags(tags)))
+        elif kind == "way":
+            ways[oid] = (item[2], tags)
+        else:
+            rels[oid] = (item[2], tags)
+    log(f"[index] 1차: node {len(out)}, way {len(ways)}, relation {len(rels)}")
+
+    member_ways = {ref for members, _ in rels.values() for t, ref in members if t == "way"}
+    way_refs = {}
+    if member_ways:
+        for item in read(path):
+            if item[0] == "way" and item[1] in member_ways:
+                way_refs[item[1]] = item[2]
+    for oid, (refs, _) in ways.items():
+        way_refs[oid] = refs
+
+    needed = {r for refs in way_refs.values() for r in refs}
+    needed |= {ref for members, _ in rels.values() for t, ref in members if t == "node"}
+    coords = {}
+    if needed:
+        for item in read(path):
+            if item[0] == "node" and item[1] in needed:
+                coords[item[1]] = (item[2], item[3])
+    log(f"[index] node 좌표 {len(coords)}/{len(needed)}")
+
+    for oid, (refs, tags) in ways.items():
+        pts = [coords[r] for r in refs if r in coords]
+        if pts:
+            out.append(("way", oid, *bbox_center(pts), row_tags(tags)))
+    for oid, (members, tags) in rels.items():
+        pts = []
+        for t, ref in members:
+            if t == "node" and ref in coords:
+                pts.append(coords[ref])
+            elif t == "way":
+                pts.extend(coords[r] for r in way_refs.get(ref, ()) if r in coords)
+        if pts:
+            out.append(("relation", oid, *bbox_center(pts), row_tags(tags)))
+    geom = {"ways": way_refs, "relations": {oid: members for oid, (members, _) in rels.items()}, "coords": coords}
+    return out, geom
+
+
+# ---------------- on-disk index ----------------
+def key_of(kind, oid):
+    return f"{kind}/{oid}"
+
+
+def save_json(path, obj):
+    # 임시 파일에 쓴 뒤 교체 → 중간에 죽어도 이전 내용 유지
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def load_geom(index_dir):
+    path = os.path.join(index_dir, "geom.json")
+    if not os.path.exists(path):
+        return {"ways": {}, "relations": {}, "coords": {}}
+    with open(path, encoding="utf-8") as f:
+        g = json.load(f)
+    return {"ways": {int(k): v for k, v in g["ways"].items()},
+            "relations": {int(k): [tuple(m) for m in v] for k, v in g["relations"].items()},
+            "coords": {int(k): tuple(v) for k, v in g["coords"].items()}}
+
+
+def cell_of(lat, lon, cell_deg=CELL_DEG):
+    ncols = int(round(360 / cell_deg))
+    row = np.floor((np.asarray(lat, dtype=np.float64) + 90.0) / cell_deg).astype(np.int64)
+    col = np.floor((np.asarray(lon, dtype=np.float64) + 180.0) / cell_deg).astype(np.int64) % ncols
+    return row * ncols + col
+
+
+def write_index(records, out_dir, source="", sequence=None, cell_deg=CELL_DEG, geom=None):
+    """records → out_dir (임시 디렉터리에 쓴 뒤 교체, delta.json 은 비워짐)"""
+    n = len(records)
+    lat = np.fromiter((r[2] for r in records), dtype=np.float64, count=n)
+    lon = np.fromiter((r[3] for r in records), dtype=np.float64, count=n)
+    cells = cell_of(lat, lon, cell_deg)
+    order = np.argsort(cells, kind="stable")
+
+    blobs = [json.dumps(records[i][4], ensure_ascii=False, separators=(",", ":")).encode("utf-8") for i in order]
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    if n:
+        offsets[1:] = np.cumsum([len(b) for b in blobs])
+
+    tmp = out_dir.rstrip("/") + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "lat.npy"), lat[order])
+    np.save(os.path.join(tmp, "lon.npy"), lon[order])
+    np.save(os.path.join(tmp, "cell.npy"), cells[order])
+    np.save(os.path.join(tmp, "osm_type.npy"), np.array([TYPES.index(records[i][0]) for i in order], dtype=np.int8))
+    np.save(os.path.join(tmp, "osm_id.npy"), np.array([records[i][1] for i in order], dtype=np.int64))
+    np.save(os.path.join(tmp, "tag_off.npy"), offsets)
+    with open(os.path.join(tmp, "tags.bin"), "wb") as f:
+        for b in blobs:
+            f.write(b)
+    meta = {"version": INDEX_VERSION, "count": n, "cell_deg": cell_deg, "source": source,
+            "created": _time.strftime("%Y-%m-%dT%H:%M:%S"), "sequence": sequence}
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    if geom is not None:
+        save_json(os.path.join(tmp, "geom.json"), geom)
+
+    old = out_dir.rstrip("/") + ".old"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(out_dir):
+        os.rename(out_dir, old)
+    os.rename(tmp, out_dir)
+    shutil.rmtree(old, ignore_errors=True)
+    return meta
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """벡터 haversine (m). 인자는 스칼라 또는 numpy 배열"""
+    p1, p2 = np.radians(lat1), np.radians(lat2)
+    dphi = p2 - p1
+    dlmb = np.radians(np.asarray(lon2) - lon1)
+    a = np.sin(dphi / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dlmb / 2) ** 2
+    return 2 * 6371008.8 * np.arcsin(np.sqrt(a))
+
+
+def _stat(path):
+    try:
+        s = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return s.st_mtime_ns, s.st_size
+
+
+class IndexSnapshot:
+    """기본 열(메모리 매핑) + delta.json 변경분 한 벌. 만든 뒤에는 바꾸지 않음
+
+    변경분이 바뀌면 with_delta() 로 기본 열을 같이 쓰는 새 스냅샷을 만든다
+    """
+
+    def __init__(self, index_dir, base=None):
+        self.index_dir = index_dir
+        if base is None:
+            self._load_columns()
+        else:
+            self.__dict__.update({k: v for k, v in base.__dict__.items() if k in _COLUMN_FIELDS})
+        self._load_delta()
+
+    def _load_columns(self):
+        index_dir = self.index_dir
+        self.meta_stat = _stat(os.path.join(index_dir, "meta.json"))
+        with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        load = lambda name: np.load(os.path.join(index_dir, name), mmap_mode="r")
+        self.lat = load("lat.npy")
+        self.lon = load("lon.npy")
+        self.cell = load("cell.npy")
+        self.osm_type = load("osm_type.npy")
+        self.osm_id = load("osm_id.npy")
+        self.tag_off = load("tag_off.npy")
+        self._tags = np.memmap(os.path.join(index_dir, "tags.bin"), dtype=np.uint8, mode="r") \
+            if self.meta["count"] and os.path.getsize(os.path.join(index_dir, "tags.bin")) else None
+        self.cell_deg = self.meta["cell_deg"]
+        self._ncols = int(round(360 / self.cell_deg))
+
+    def _load_delta(self):
+        path = os.path.join(self.index_dir, "delta.json")
+        self.delta_stat = _stat(path)  # delta.json 이 없으면 None
+        delta = {"upserts": {}, "deleted": [], "sequence": self.meta.get("sequence")}
+        if self.delta_stat is not None:
+            with open(path, encoding="utf-8") as f:
+                delta = json.load(f)
+        self.sequence = delta.get("sequence")
+        self.upserts = delta["upserts"]            # key → [type, id, lat, lon, tags] (추가/수정된 현재 값)
+        self.deleted = frozenset(delta["deleted"])  # 기본 열에서 가릴 key (삭제 + 수정)
+        recs = list(self.upserts.values())
+        self._up_recs = recs
+        self._up_lat = np.array([r[2] for r in recs], dtype=np.float64)
+        self._up_lon = np.array([r[3] for r in recs], dtype=np.float64)
+
+    def with_delta(self):
+        """기본 열은 그대로, delta.json 만 다시 읽은 새 스냅샷"""
+        return IndexSnapshot(self.index_dir, base=self)
+
+    def __len__(self):
+        return int(self.meta["count"]) - len(self.deleted) + len(self.upserts)
+
+    def tags(self, i):
+        a, b = int(self.tag_off[i]), int(self.tag_off[i + 1])
+        return json.loads(bytes(self._tags[a:b]).decode("utf-8")) if b > a else {}
+
+    def candidates(self, lat, lon, radius):
+        """반경을 덮는 셀들의 레코드 위치 (정렬된 cell 배열에서 행 단위 이분 탐색)"""
+        dlat = radius / 111320.0
+        dlon = radius / (111320.0 * max(0.01, math.cos(math.radians(lat))))
+        r0, r1 = cell_of([lat - dlat, lat + dlat], [lon, lon], self.cell_deg) // self._ncols
+        c0 = int(np.floor((lon - dlon + 180.0) / self.cell_deg))
+        c1 = int(np.floor((lon + dlon + 180.0) / self.cell_deg))
+        parts = []
+        for row in range(int(r0), int(r1) + 1):
+            lo = np.searchsorted(self.cell, row * self._ncols + c0, side="left")
+            hi = np.searchsorted(self.cell, row * self._ncols + c1, side="right")
+            if hi > lo:
+                parts.append(np.arange(lo, hi))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def query_ids(self, lat, lon, radius, min_radius=0):
+        """min_radius < 거리 <= radius 인 레코드 위치와 거리(m)"""
+        idx = self.candidates(lat, lon, radius)
+        if not len(idx):
+            return idx, np.zeros(0)
+        d = haversine_m(lat, lon, self.lat[idx], self.lon[idx])
+        keep = (d <= radius) & (d > min_radius) if min_radius > 0 else (d <= radius)
+        return idx[keep], d[keep]
+
+    def record(self, i):
+        return (TYPES[int(self.osm_type[i])], int(self.osm_id[i]), float(self.lat[i]), float(self.lon[i]), self.tags(i))
+
+    def element(self, i):
+        return record_element(self.record(i))
+
+    def base_keys(self):
+        return [key_of(TYPES[int(t)], int(i)) for t, i in zip(self.osm_type, self.osm_id)]
+
+    def query(self, lat, lon, radius, min_radius=0):
+        """Overpass 응답과 같은 모양의 dict (변경분 반영)"""
+        idx, _ = self.query_ids(lat, lon, radius, min_radius)
+        elements = [self.element(int(i)) for i in idx]
+        if self.deleted:
+            elements = [el for el in elements if key_of(el["type"], el["id"]) not in self.deleted]
+        if self._up_recs:
+            d = haversine_m(lat, lon, self._up_lat, self._up_lon)
+            for j in np.nonzero((d <= radius) & (d > min_radius) if min_radius > 0 else (d <= radius))[0]:
+                elements.append(record_element(self._up_recs[int(j)]))
+        return {"elements": elements}
+
+
+# with_delta() 가 새 스냅샷으로 넘기는 기본 열 (mmap 은 복사하지 않고 같이 씀)
+_COLUMN_FIELDS = ("meta_stat", "meta", "lat", "lon", "cell", "osm_type", "osm_id", "tag_off", "_tags",
+                  "cell_deg", "_ncols")
+
+
+class PharmacyIndex:
+    """메모리 매핑된 약국 인덱스 (읽기 전용) + delta.json 변경분
+
+    - 현재 상태는 IndexSnapshot 하나(self._snap). 다른 프로세스가 변경분을 적용하면
+      새 스냅샷을 만들어 락 안에서 통째로 바꿔 끼움 → 조회 중인 스레드는 시작할 때 잡은 스냅샷을 끝까지 사용
+    """
+
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        self._lock = threading.Lock()
+        self._snap = IndexSnapshot(index_dir)
+
+    def refresh(self):
+        """다른 프로세스가 변경분을 적용했으면 다시 읽음 (기본 열을 다시 썼으면 전부, 아니면 delta.json 만)
+
+        현재 스냅샷 반환
+        """
+        snap = self._snap
+        meta = _stat(os.path.join(self.index_dir, "meta.json"))
+        if meta is None:
+            return snap  # 다시 쓰는 중 (디렉터리 교체 순간) → 기존 매핑 그대로 사용
+        delta = _stat(os.path.join(self.index_dir, "delta.json"))
+        if meta == snap.meta_stat and delta == snap.delta_stat:
+            return snap
+        with self._lock:
+            snap = self._snap  # 기다리는 동안 다른 스레드가 이미 바꿨을 수 있음
+            if meta != snap.meta_stat:
+                snap = IndexSnapshot(self.index_dir)
+            elif delta != snap.delta_stat:
+                snap = snap.with_delta()
+            self._snap = snap
+        return snap
+
+    def snapshot(self):
+        """변경분까지 반영한 현재 스냅샷 (여러 번 조회해도 같은 상태를 보려면 이것을 잡아 둘 것)"""
+        return self.refresh()
+
+    def __len__(self):
+        return len(self._snap)
+
+    def query(self, lat, lon, radius, min_radius=0):
+        """Overpass 응답과 같은 모양의 dict (변경분 반영)"""
+        return self.refresh().query(lat, lon, radius, min_radius)
+
+
+def record_element(rec):
+    kind, oid, lat, lon, tags = rec
+    el = {"type": kind, "id": int(oid), "tags": tags}
+    if kind == "node":
+        el["lat"], el["lon"] = lat, lon
+    else:
+        el["center"] = {"lat": lat, "lon": lon}
+    return el
+
+
+def build(src, out_dir, sequence=None, log=print):
+    t0 = _time.perf_counter()
+    records, geom = extract_pharmacies(src, log=log)
+    meta = write_index(records, out_dir, source=os.path.basename(src), sequence=sequence, geom=geom)
+    log(f"[index] {meta['count']}개 → {out_dir} ({_time.perf_counter() - t0:.1f}s)")
+    return meta
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="로컬 약국 인덱스")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="OSM 추출본에서 인덱스 생성")
+    b.add_argument("src")
+    b.add_argument("out_dir")
+    b.add_argument("--sequence", type=int, default=None, help="추출본의 replication sequence (변경분 적용 시작점)")
+    q = sub.add_parser("query", help="반경 검색")
+    q.add_argument("index_dir")
+    q.add_argument("lat", type=float)
+    q.add_argument("lon", type=float)
+    q.add_argument("radius", type=float)
+    args = ap.parse_args(argv)
+    if args.cmd == "build":
+        build(args.src, args.out_dir, sequence=args.sequence)
+    else:
+        idx = PharmacyIndex(args.index_dir)
+        t0 = _time.perf_counter()
+        data = idx.query(args.lat, args.lon, args.radius)
+        ms = (_time.perf_counter() - t0) * 1000
+        for el in data["elements"]:
+            print(el["type"], el["id"], el["tags"].get("name", ""))
+        print(f"{len(data['elements'])}개 / {ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+# 로컬 약국 인덱스에 OSM 변경분(.osc / .osc.gz) 적용
+# - 로컬 디렉터리에서 replication 구조(000/123/456.osc.gz) 또는 평면 구조(456.osc.gz)의 파일을 sequence 순서로 읽음
+# - 약국 node/way/relation 중 영향을 받은 것만 추가/수정/삭제 → delta.json (기본 열은 그대로)
+# - 적용한 sequence 를 delta.json 에 함께 저장 → 재시작하면 다음 sequence 부터 이어서 적용
+# - 변경분이 compact_threshold 를 넘으면 기본 열로 합쳐 다시 씀
+# - way/relation 중심은 geom.json(구성 node 목록/좌표)으로 다시 계산. 구성 node 가 이동해도 반영
+#
+# 사용법:
+#   python pharmacy_updates.py data/pharmacy_index diffs/ [--start-sequence N] [--max-files 100]
+
+import argparse
+import gzip
+import os
+import xml.etree.ElementTree as ET
+
+from pharmacy_index import (IndexSnapshot, bbox_center, is_pharmacy, key_of, load_geom,
+                            row_tags, save_json, write_index)
+
+COMPACT_THRESHOLD = 5000
+
+
+def read_osc(path):
+    """osmChange → (action, kind, id, payload, tags) 목록 (파일 순서)
+
+    payload: node → (lat, lon) | way → [refs] | relation → [(type, ref)] | delete → None
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    out = []
+    with opener(path, "rb") as f:
+        action = None
+        for event, el in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                if el.tag in ("create", "modify", "delete"):
+                    action = el.tag
+                continue
+            if el.tag not in ("node", "way", "relation"):
+                continue
+            oid = int(el.get("id"))
+            tags = {t.get("k"): t.get("v") for t in el.findall("tag")}
+            if action == "delete":
+                payload = None
+            elif el.tag == "node":
+                payload = (float(el.get("lat")), float(el.get("lon"))) if el.get("lat") is not None else None
+            elif el.tag == "way":
+                payload = [int(nd.get("ref")) for nd in el.findall("nd")]
+            else:
+                payload = [(m.get("type"), int(m.get("ref"))) for m in el.findall("member")]
+            out.append((action, el.tag, oid, payload, tags))
+            el.clear()
+    return out
+
+
+def diff_path(diff_dir, seq):
+    """sequence → 파일 경로 (replication 구조 우선, 없으면 평면 구조). 없으면 None"""
+    s = f"{seq:09d}"
+    for rel in (os.path.join(s[:3], s[3:6], s[6:]), str(seq), s):
+        for ext in (".osc.gz", ".osc"):
+            p = os.path.join(diff_dir, rel + ext)
+            if os.path.exists(p):
+                return p
+    return None
+
+
+class PharmacyStore:
+    """인덱스 디렉터리의 기본 열 + delta.json + geom.json 을 고치는 쪽"""
+
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        self.index = IndexSnapshot(index_dir)
+        self.base = {k: i for i, k in enumerate(self.index.base_keys())}  # key → 기본 열 위치
+        self.upserts = dict(self.index.upserts)
+        self.deleted = set(self.index.deleted)
+        self.sequence = self.index.sequence
+        self.geom = load_geom(index_dir)
+        self._node_ways = None
+
+    # ---- 현재 상태 조회 ----
+    def exists(self, key):
+        return key in self.upserts or (key in self.base and key not in self.deleted)
+
+    def current(self, key):
+        if key in self.upserts:
+            return self.upserts[key]
+        if key in self.base and key not in self.deleted:
+            return list(self.index.record(self.base[key]))
+        return None
+
+    # ---- 수정 ----
+    def upsert(self, rec):
+        key = key_of(rec[0], rec[1])
+        if key in self.base:
+            self.deleted.add(key)
+        self.upserts[key] = list(rec)
+
+    def delete(self, key):
+        self.upserts.pop(key, None)
+        if key in self.base:
+            self.deleted.add(key)
+
+    def _node_to_ways(self):
+        if self._node_ways is None:
+            self._node_ways = {}
+            for wid, refs in self.geom["ways"].items():
+                for r in refs:
+                    self._node_ways.setdefault(r, set()).add(wid)
+        return self._node_ways
+
+    def _way_center(self, refs):
+        pts = [self.geom["coords"][r] for r in refs if r in self.geom["coords"]]
+        return bbox_center(pts) if pts else None
+
+    def _relation_center(self, members):
+        pts = []
+        for t, ref in members:
+            if t == "node" and ref in self.geom["coords"]:
+                pts.append(self.geom["coords"][ref])
+            elif t == "way":
+                pts.extend(self.geom["coords"][r] for r in self.geom["ways"].get(ref, ()) if r in self.geom["coords"])
+        return bbox_center(pts) if pts else None
+
+    def _recenter(self, kind, oid):
+        key = key_of(kind, oid)
+        rec = self.current(key)
+        if rec is None:
+            return False
+        c = (self._way_center(self.geom["ways"].get(oid, ())) if kind == "way"
+             else self._relation_center(self.geom["relations"].get(oid, ())))
+        if c is None or (rec[2], rec[3]) == c:
+            return False
+        self.upsert((kind, oid, c[0], c[1], rec[4]))
+        return True
+
+    def apply_osc(self, path):
+        """변경 파일 하나 적용 → 종류별 처리 건수"""
+        changes = read_osc(path)
+        counts = {"added": 0, "modified": 0, "deleted": 0, "moved": 0, "unresolved": 0}
+        # node 좌표를 먼저 반영해야 같은 파일 안의 way/relation 중심을 계산할 수 있음
+        diff_coords = {oid: p for action, kind, oid, p, _ in changes if kind == "node" and p is not None}
+        moved_ways = set()
+        for action, kind, oid, payload, tags in changes:
+            if kind != "node":
+                continue
+            key = key_of("node", oid)
+            if oid in self.geom["coords"]:
+                if action == "delete":
+                    del self.geom["coords"][oid]
+                elif payload is not None and payload != self.geom["coords"][oid]:
+                    self.geom["coords"][oid] = payload
+                    moved_ways |= self._node_to_ways().get(oid, set())
+            if action != "delete" and payload is not None and tags and is_pharmacy(tags):
+                counts["modified" if self.exists(key) else "added"] += 1
+                self.upsert(("node", oid, payload[0], payload[1], row_tags(tags)))
+            elif self.exists(key):
+                counts["deleted"] += 1
+                self.delete(key)
+
+        for action, kind, oid, payload, tags in changes:
+            if kind == "node":
+                continue
+            key = key_of(kind, oid)
+            if action == "delete" or not tags or not is_pharmacy(tags):
+                if kind == "way" and action == "delete":
+                    moved_ways.discard(oid)
+                if self.exists(key):
+                    counts["deleted"] += 1
+                    self.delete(key)
+                    self.geom["ways" if kind == "way" else "relations"].pop(oid, None)
+                elif kind == "way" and payload is not None and oid in self.geom["ways"]:
+                    # 약국 relation 의 구성 way → node 목록만 갱신
+                    self.geom["ways"][oid] = payload
+                continue
+            if kind == "way":
+                self.geom["ways"][oid] = payload
+                for r in payload:
+                    if r in diff_coords:
+                        self.geom["coords"][r] = diff_coords[r]
+                self._node_ways = None
+                c = self._way_center(payload)
+            else:
+                self.geom["relations"][oid] = payload
+                for t, ref in payload:
+                    if t == "node" and ref in diff_coords:
+                        self.geom["coords"][ref] = diff_coords[ref]
+                c = self._relation_center(payload)
+            old = self.current(key)
+            if c is None:
+                if old is None:
+                    # 구성 node 좌표를 모름 → 다음 전체 import 까지 보류
+                    counts["unresolved"] += 1
+                    continue
+                c = (old[2], old[3])
+            counts["modified" if old is not None else "added"] += 1
+            self.upsert((kind, oid, c[0], c[1], row_tags(tags)))
+            moved_ways.discard(oid)
+
+        # 태그는 그대로지만 구성 node 가 움직인 way (와 그 way 를 쓰는 relation)
+        for wid in moved_ways:
+            counts["moved"] += self._recenter("way", wid)
+        if moved_ways:
+            for rid, members in self.geom["relations"].items():
+                if any(t == "way" and ref in moved_ways for t, ref in members):
+                    counts["moved"] += self._recenter("relation", rid)
+        return counts
+
+    def delta_size(self):
+        return len(self.upserts) + len(self.deleted)
+
+    def save(self):
+        save_json(os.path.join(self.index_dir, "geom.json"), self.geom)
+        save_json(os.path.join(self.index_dir, "delta.json"),
+                  {"upserts": self.upserts, "deleted": sorted(self.deleted), "sequence": self.sequence})
+
+    def compact(self):
+        """기본 열 + 변경분을 합쳐 인덱스를 다시 씀"""
+        records = [self.index.record(i) for k, i in self.base.items() if k not in self.deleted]
+        records += [tuple(r) for r in self.upserts.values()]
+        write_index(records, self.index_dir, source=self.index.meta.get("source", ""),
+                    sequence=self.sequence, cell_deg=self.index.cell_deg, geom=self.geom)
+        self.__init__(self.index_dir)
+
+
+def apply_updates(index_dir, diff_dir, start_sequence=None, max_files=None,
+                  compact_threshold=COMPACT_THRESHOLD, log=print):
+    """마지막 적용 sequence 다음 파일부터 없을 때까지 적용. 적용한 파일 수 반환"""
+    store = PharmacyStore(index_dir)
+    if store.sequence is None:
+        if start_sequence is None:
+            raise RuntimeError("인덱스에 sequence 가 없습니다. --start-sequence 로 시작점을 지정하세요.")
+        store.sequence = start_sequence - 1
+    applied = 0
+    while max_files is None or applied < max_files:
+        seq = store.sequence + 1
+        path = diff_path(diff_dir, seq)
+        if path is None:
+            break
+        counts = store.apply_osc(path)
+        store.sequence = seq
+        store.save()  # 파일 하나마다 저장 → 중간에 멈춰도 다음 sequence 부터 재개
+        applied += 1
+        log(f"[update] seq {seq}: {counts}")
+    if store.delta_size() >= compact_threshold:
+        log(f"[update] 변경분 {store.delta_size()}건 → 기본 열로 합침")
+        store.compact()
+    return applied
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="로컬 약국 인덱스에 OSM 변경분 적용")
+    ap.add_argument("index_dir")
+    ap.add_argument("diff_dir")
+    ap.add_argument("--start-sequence", type=int, default=None)
+    ap.add_argument("--max-files", type=int, default=None)
+    ap.add_argument("--compact-threshold", type=int, default=COMPACT_THRESHOLD)
+    args = ap.parse_args(argv)
+    n = apply_updates(args.index_dir, args.diff_dir, args.start_sequence, args.max_files, args.compact_threshold)
+    print(f"{n}개 파일 적용")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# 검색 중심 후보가 생기면 미리 Overpass 결과를 받아 두기 (백그라운드)
+# - 후보(지도 클릭/주소)가 생기면 delay 초 뒤에 시작 → 그 사이 같은 세션의 새 후보가 오면 이전 것은 취소
+# - 세션(owner)마다 동시에 하나만 실행. 실행 중에 들어온 후보는 끝난 뒤 가장 최신 것만 실행
+# - 프로세스 전체 동시 실행 수 상한(max_inflight) — 넘으면 건너뜀
+# - 같은 key 가 이미 실행 중이면(다른 세션 포함) 건너뜀
+# - 결과는 호출자가 넘긴 fn 이 캐시에 넣는다 (여기서는 실행/취소만 담당)
+
+import threading
+
+
+class Prefetcher:
+    def __init__(self, delay=0.5, max_inflight=4, timer=threading.Timer):
+        self.delay = delay
+        self.max_inflight = max_inflight
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._owners = {}      # owner -> {"seq", "key", "fn", "running", "deferred"}
+        self._running = set()  # 실행 중인 key
+        self._seq = 0          # 예약 번호 (owner 가 정리된 뒤에도 겹치지 않도록 전역)
+        self.counts = {"requested": 0, "superseded": 0, "throttled": 0, "duplicate": 0,
+                       "started": 0, "completed": 0, "failed": 0}
+
+    def request(self, owner, key, fn):
+        """owner 의 최신 후보를 key/fn 으로 교체하고 delay 뒤 실행 예약"""
+        with self._lock:
+            st = self._owners.setdefault(owner, {"seq": 0, "running": False, "deferred": False})
+            self._seq += 1
+            st["seq"] = seq = self._seq
+            st["key"], st["fn"] = key, fn
+            self.counts["requested"] += 1
+        t = self._timer(self.delay, self._start, (owner, seq))
+        t.daemon = True
+        t.start()
+
+    def cancel(self, owner):
+        """owner 의 예약된 후보를 취소 (실행 중인 것은 끝까지 실행)"""
+        with self._lock:
+            st = self._owners.get(owner)
+            if st is not None:
+                self._seq += 1
+                st["seq"] = self._seq
+                st["key"] = st["fn"] = None
+                if not st["running"]:
+                    del self._owners[owner]
+
+    def _start(self, owner, seq):
+        with self._lock:
+            st = self._owners.get(owner)
+            if st is None or st["seq"] != seq or st["fn"] is None:
+                self.counts["superseded"] += 1
+                return
+            if st["running"]:
+                st["deferred"] = True
+                return
+        self._run(owner)
+
+    def _run(self, owner):
+        while True:
+            with self._lock:
+                st = self._owners[owner]
+                key, fn, seq = st["key"], st["fn"], st["seq"]
+                st["deferred"] = False
+                st["fn"] = None  # 실행하든 건너뛰든 같은 후보는 한 번만
+                if key in self._running:
+                    self.counts["duplicate"] += 1
+                    fn = None
+                elif len(self._running) >= self.max_inflight:
+                    self.counts["throttled"] += 1
+                    fn = None
+                else:
+                    self._running.add(key)
+                    st["running"] = True
+                    self.counts["started"] += 1
+            if fn is None:
+                self._finish(owner)
+                return
+            try:
+                fn()
+                ok = True
+            except Exception:
+                ok = False
+            with self._lock:
+                self._running.discard(key)
+                st["running"] = False
+                self.counts["completed" if ok else "failed"] += 1
+                again = st["deferred"] and st["seq"] != seq and st["fn"] is not None
+            if not again:
+                self._finish(owner)
+                return
+
+    def _finish(self, owner):
+        # 예약도 실행도 없는 owner 는 정리
+        with self._lock:
+            st = self._owners.get(owner)
+            if st is not None and not st["running"] and st["fn"] is None:
+                del self._owners[owner]
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts, inflight=len(self._running), owners=len(self._owners),
+                        delay=self.delay, max_inflight=self.max_inflight)
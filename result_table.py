@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# 검색 결과 표 (열 단위 생성)
+# - Overpass/로컬 인덱스 요소를 한 번 훑어 좌표·태그를 열(list → numpy)로 모은 뒤 거리는 벡터 haversine
+# - 영업여부는 순서 있는 범주형(영업중 < 확인필요 < 영업종료) → 정렬에 임시 열이 필요 없음
+# - opening_hours 는 고유 문자열별로 한 번만 평가한 뒤 코드로 펼침
+# - 지도 링크는 화면에 보여줄 행에만 붙임 (with_links)
+# - 행마다 주간 15분 슬롯 비트열(주간) → "일 21:00 영업", "오늘 밤 중 영업" 필터는 다시 검색/파싱 없이 비트 검사
+
+import base64
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from opening_hours import (SLOT, WEEK, WEEK_BYTES, compile_hours, next_change_many, open_status_many, range_bits,
+                           week_bits)
+from pharmacy_index import haversine_m
+
+STATUS_LABEL = {True: "영업중", False: "영업종료", None: "확인필요"}
+STATUS_DTYPE = pd.CategoricalDtype(["영업중", "확인필요", "영업종료"], ordered=True)
+WEEKDAY_KO = "월화수목금토일"
+
+COLUMNS = ["이름", "거리(m)", "영업여부", "다음변경", "영업시간", "전화", "위도", "경도", "주간"]
+
+
+def build_table(elements, lat, lon):
+    """요소 목록 → 결과 DataFrame (영업여부는 '확인필요', 다음변경은 빈 값으로 채움)"""
+    names, phones, hours, lats, lons = [], [], [], [], []
+    for el in elements:
+        if el.get("type") == "node":
+            plat, plon = el.get("lat"), el.get("lon")
+        else:
+            c = el.get("center")
+            if not c:
+                continue
+            plat, plon = c.get("lat"), c.get("lon")
+        if plat is None or plon is None:
+            continue
+        tags = el.get("tags") or {}
+        names.append(tags.get("name") or tags.get("alt_name") or "(이름 없음)")
+        phones.append(tags.get("phone") or tags.get("contact:phone") or "")
+        hours.append(tags.get("opening_hours", ""))
+        lats.append(plat)
+        lons.append(plon)
+
+    lat_arr = np.asarray(lats, dtype=np.float64)
+    lon_arr = np.asarray(lons, dtype=np.float64)
+    dist = np.rint(haversine_m(lat, lon, lat_arr, lon_arr)).astype(np.int64)
+    # 같은 opening_hours 문자열은 표시값도 같으므로 고유값만 compile_hours
+    codes, uniques = pd.factorize(pd.Series(hours, dtype=object))
+    display = np.array([compile_hours(h).display for h in uniques], dtype=object)
+    bits = np.array([week_bits(h) for h in uniques] + [bytes(WEEK_BYTES)], dtype=object)
+    n = len(names)
+    return pd.DataFrame({
+        "이름": names,
+        "거리(m)": dist,
+        "영업여부": pd.Categorical.from_codes(np.full(n, 1, dtype=np.int8), dtype=STATUS_DTYPE),
+        "다음변경": np.full(n, "", dtype=object),
+        "영업시간": display[codes] if n else np.array([], dtype=object),
+        "전화": phones,
+        "위도": lat_arr,
+        "경도": lon_arr,
+        "주간": bits[codes] if n else np.array([], dtype=object),
+    }, columns=COLUMNS)
+
+
+def evaluate_hours(df, now_local):
+    """영업여부/다음변경 컬럼을 now_local 기준으로 채우고, 가장 이른 전환 시각(없으면 None)을 반환"""
+    codes, uniques = pd.factorize(df["영업시간"])
+    hours = list(uniques)
+    status = [STATUS_DTYPE.categories.get_loc(STATUS_LABEL[opened])
+              for opened, _ in open_status_many(hours, now_local)]
+    nexts = [None if d is None else now_local + timedelta(seconds=d)
+             for d in next_change_many(hours, now_local)]
+    labels = np.array([f"{WEEKDAY_KO[t.weekday()]} {t:%H:%M}" if t else "" for t in nexts] + [""], dtype=object)
+    status_codes = np.array(status + [STATUS_DTYPE.categories.get_loc("확인필요")], dtype=np.int8)
+    # factorize 는 결측값을 -1 로 돌려주므로 마지막 칸(확인필요/빈 문자열)을 가리킴
+    df["영업여부"] = pd.Categorical.from_codes(status_codes[codes], dtype=STATUS_DTYPE)
+    df["다음변경"] = labels[codes]
+    known = [t for t in nexts if t is not None]
+    return min(known) if known else None
+
+
+def result_view(df, open_only):
+    if df.empty:
+        return df.reset_index(drop=True)
+    if open_only:
+        df = df[df["영업여부"] == "영업중"]
+    return df.sort_values(["영업여부", "거리(m)"], kind="stable").reset_index(drop=True)
+
+
+# ---------------- 주간 슬롯 필터 ----------------
+def schedule_matrix(df):
+    """주간 열 → (행 수, WEEK_BYTES) uint8 행렬"""
+    return np.frombuffer(b"".join(df["주간"]), dtype=np.uint8).reshape(len(df), WEEK_BYTES)
+
+
+def open_at(df, sec, matrix=None):
+    """주간 초 sec 가 속한 15분 슬롯에 영업중인 행 (bool 배열). matrix 는 미리 만든 schedule_matrix(df)"""
+    m = schedule_matrix(df) if matrix is None else matrix
+    i = (sec % WEEK) // SLOT
+    return (m[:, i >> 3] >> (i & 7)) & 1 == 1
+
+
+def open_during(df, start, end, how="any", matrix=None):
+    """[start, end) 와 겹치는 슬롯 중 하나라도(any) / 모두(all) 영업하는 행 (end <= start 면 다음 날까지)"""
+    q = np.frombuffer(range_bits(start, end), dtype=np.uint8)
+    hit = (schedule_matrix(df) if matrix is None else matrix) & q
+    return (hit == q).all(axis=1) if how == "all" else hit.any(axis=1)
+
+
+def schedule_view(df, at=None, during=None, how="any", matrix=None):
+    """at(주간 초) 또는 during((start, end)) 에 영업하는 행만 거리순으로"""
+    if df.empty:
+        return df.reset_index(drop=True)
+    if at is not None:
+        df = df[open_at(df, at, matrix)]
+    elif during is not None:
+        df = df[open_during(df, during[0], during[1], how, matrix)]
+    return df.sort_values("거리(m)", kind="stable").reset_index(drop=True)
+
+
+def with_links(df):
+    """보여줄 행에만 네이버지도/카카오맵 링크 열 추가"""
+    names = df["이름"].astype(str)
+    return df.assign(네이버지도="https://map.naver.com/v5/search/" + names + "/place",
+                     카카오맵="https://map.kakao.com/?q=" + names)
+
+
+# ---------------- API 레코드 (search_service / search_http) ----------------
+RECORD_KEYS = {"이름": "name", "거리(m)": "distance_m", "영업여부": "status", "다음변경": "next_change",
+               "영업시간": "hours", "전화": "phone", "위도": "lat", "경도": "lon", "주간": "week"}
+STATUS_CODE = {"영업중": "open", "영업종료": "closed", "확인필요": "unknown"}
+
+
+def to_records(df):
+    """결과 DataFrame → JSON 으로 보낼 dict 목록 (영문 키, status 는 open/closed/unknown, week 는 base64)"""
+    out = df[COLUMNS].rename(columns=RECORD_KEYS)
+    out["status"] = out["status"].astype(str).map(STATUS_CODE)
+    out["week"] = [base64.b64encode(b).decode("ascii") for b in out["week"]]
+    out["distance_m"] = out["distance_m"].astype(int)
+    return out.to_dict("records")
+
+
+def from_records(rows):
+    """to_records 의 역변환 → 결과 DataFrame (영업여부는 범주형으로 복원)"""
+    labels = {v: k for k, v in STATUS_CODE.items()}
+    df = pd.DataFrame(rows, columns=list(RECORD_KEYS.values())).rename(columns={v: k for k, v in RECORD_KEYS.items()})
+    df["영업여부"] = pd.Categorical(df["영업여부"].map(labels), dtype=STATUS_DTYPE)
+    df["거리(m)"] = df["거리(m)"].astype(np.int64)
+    df["위도"] = df["위도"].astype(np.float64)
+    df["경도"] = df["경도"].astype(np.float64)
+    df["주간"] = [base64.b64decode(b) if b else bytes(WEEK_BYTES) for b in df["주간"]]
+    return df
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# 검색 서비스 클라이언트 (app.py / hospital_finder.py 가 사용)
+# - SEARCH_SERVICE_URL 이 있으면 HTTP 서버(search_http.py)로, 없으면 같은 프로세스의 SearchService 를 직접 호출
+# - 두 클라이언트 모두 같은 메서드/같은 dict 를 돌려줌 → 화면 코드는 어느 쪽인지 모름
+# - 잘못된 인자는 ValueError, 그 밖의 서비스 오류는 RuntimeError
+
+import os
+
+import http_pool
+
+SERVICE_URL = os.environ.get("SEARCH_SERVICE_URL", "").rstrip("/")
+
+
+class LocalClient:
+    """같은 프로세스의 SearchService 호출 (Streamlit 단독 실행)"""
+
+    def __init__(self, service=None):
+        if service is None:
+            from search_service import get_service
+            service = get_service()
+        self.service = service
+
+    def info(self):
+        return self.service.info()
+
+    def geocode(self, q):
+        return self.service.geocode(q)
+
+    def pharmacies(self, **params):
+        return self.service.pharmacies(**params)
+
+    def prefetch(self, owner, lat, lon, radius, hedged=True, compact=False):
+        return self.service.prefetch(owner, lat, lon, radius, hedged, compact)
+
+    def cancel_prefetch(self, owner):
+        self.service.cancel_prefetch(owner)
+
+    def coverage(self, **params):
+        return self.service.coverage(**params)
+
+    def locate(self, q):
+        return self.service.locate(q)
+
+    def hospitals(self, **params):
+        return self.service.hospitals(**params)
+
+    def stats(self):
+        return self.service.stats()
+
+    def metrics(self):
+        from stage_metrics import STAGES
+        return STAGES.prometheus()
+
+
+class HttpClient:
+    """search_http.py 서버 호출. 공용 연결 풀(http_pool)의 keep-alive 연결을 재사용"""
+
+    def __init__(self, base_url, timeout=90):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _call(self, method, path, body=None):
+        r = http_pool.request(method, self.base_url + path, json=body, timeout=self.timeout)
+        try:
+            data = r.json()
+        except ValueError:
+            data = {"error": r.text[:300]}
+        if r.status_code == 400:
+            raise ValueError(data.get("error"))
+        if r.status_code != 200:
+            raise RuntimeError(f"검색 서비스 HTTP {r.status_code}: {data.get('error')}")
+        return data
+
+    def info(self):
+        return self._call("GET", "/v1/info")
+
+    def geocode(self, q):
+        return self._call("POST", "/v1/geocode", {"q": q})
+
+    def pharmacies(self, **params):
+        return self._call("POST", "/v1/pharmacies", params)
+
+    def prefetch(self, owner, lat, lon, radius, hedged=True, compact=False):
+        body = {"owner": owner, "lat": lat, "lon": lon, "radius": radius, "hedged": hedged, "compact": compact}
+        return self._call("POST", "/v1/pharmacies/prefetch", body).get("key")
+
+    def cancel_prefetch(self, owner):
+        self._call("POST", "/v1/pharmacies/prefetch", {"owner": owner, "cancel": True})
+
+    def coverage(self, **params):
+        return self._call("POST", "/v1/coverage", params)
+
+    def locate(self, q):
+        return self._call("POST", "/v1/hospitals/locate", {"q": q})
+
+    def hospitals(self, **params):
+        return self._call("POST", "/v1/hospitals", params)
+
+    def stats(self):
+        return self._call("GET", "/v1/stats")
+
+    def metrics(self):
+        r = http_pool.get(self.base_url + "/metrics", timeout=self.timeout)
+        if r.status_code != 200:
+            raise RuntimeError(f"검색 서비스 HTTP {r.status_code}")
+        return r.text
+
+
+def get_client():
+    return HttpClient(SERVICE_URL) if SERVICE_URL else LocalClient()
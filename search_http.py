@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+# 검색 서비스 HTTP 서버 (표준 라이브러리 asyncio, JSON 응답)
+#   python search_http.py --port 8600 --workers 4
+# - 워커는 상태 없는 프로세스(SO_REUSEPORT 로 같은 포트 공유) → 로드밸런서 뒤에 여러 대 두어도 됨
+#   (Overpass/주소 캐시는 워커별 메모리, 주소 캐시는 sqlite 파일이라 같은 호스트 워커끼리 공유)
+# - HTTP/1.1 keep-alive. GET 은 쿼리 문자열, POST 는 JSON 본문을 인자로 사용
+# - 400: 잘못된 인자(ValueError), 404: 없는 경로, 502: 상위 서비스(Overpass/Nominatim) 실패
+# - /v1/stats 에 엔드포인트별 요청 수/오류/평균·최대 지연/초당 처리량 (워커 단위)
+# - GET /metrics: 파이프라인 단계별 + 엔드포인트별 지연 히스토그램 (Prometheus text, stage_metrics — 워커 단위)
+#
+# 엔드포인트
+#   GET  /health
+#   GET  /v1/info
+#   GET|POST /v1/geocode              q
+#   GET|POST /v1/pharmacies           lat, lon, radius, mode(radius|nearest), k, open_only, backend, hedged, compact, include_all,
+#                                     open_at("일 21:00") | open_during("일 18:00-06:00"), during(any|all)
+#   POST /v1/pharmacies/prefetch      owner, lat, lon, radius, hedged, compact | owner, cancel=true
+#   GET|POST /v1/coverage             region | bbox(s,w,n,e), half_km, at("일 22:00"), step_m, margin_m, backend, include_unknown
+#   GET|POST /v1/hospitals            lat, lon, general, emergency, max_km
+#   GET|POST /v1/hospitals/locate     q
+#   GET  /v1/stats
+#   GET  /metrics
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import threading
+import time as _time
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+import search_service as svc
+from stage_metrics import STAGES
+
+MAX_BODY = 64 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 502: "Bad Gateway"}
+
+
+def _flag(v):
+    if isinstance(v, bool):
+        return v
+    return str(v).lower() in ("1", "true", "yes", "on")
+
+
+def _params(params, **types):
+    """문자열(쿼리 문자열)/JSON 값 → 타입 변환. 알 수 없는 키는 ValueError"""
+    unknown = set(params) - set(types)
+    if unknown:
+        raise ValueError(f"알 수 없는 인자: {', '.join(sorted(unknown))}")
+    out = {}
+    for k, v in params.items():
+        try:
+            out[k] = types[k](v)
+        except (TypeError, ValueError):
+            raise ValueError(f"{k} 값이 잘못되었습니다: {v!r}")
+    return out
+
+
+PHARMACY_PARAMS = dict(lat=float, lon=float, radius=int, mode=str, k=int, open_only=_flag, backend=str,
+                       hedged=_flag, compact=_flag, include_all=_flag, open_at=str, open_during=str, during=str)
+PREFETCH_PARAMS = dict(owner=str, lat=float, lon=float, radius=int, hedged=_flag, compact=_flag, cancel=_flag)
+COVERAGE_PARAMS = dict(region=str, bbox=lambda v: [float(x) for x in (v.split(",") if isinstance(v, str) else v)],
+                       half_km=float, at=str, step_m=float, margin_m=float, backend=str, include_unknown=_flag,
+                       hedged=_flag)
+HOSPITAL_PARAMS = dict(lat=float, lon=float, general=_flag, emergency=_flag, max_km=float)
+
+
+async def _prefetch(p):
+    p = _params(p, **PREFETCH_PARAMS)
+    if "owner" not in p:
+        raise ValueError("owner 가 필요합니다")
+    if p.pop("cancel", False):
+        await svc.cancel_prefetch(p["owner"])
+        return {"cancelled": True}
+    return {"key": await svc.prefetch(**p)}
+
+
+async def _health(p):
+    return {"ok": True}
+
+
+async def _stats(p):
+    return dict(await svc.stats(), endpoints=METRICS.snapshot())
+
+
+async def _metrics(p):
+    return STAGES.prometheus()  # 문자열 → text/plain 응답
+
+
+ROUTES = {
+    "/health": _health,
+    "/v1/info": lambda p: svc.info(),
+    "/v1/geocode": lambda p: svc.geocode(**_params(p, q=str)),
+    "/v1/pharmacies": lambda p: svc.pharmacies(**_params(p, **PHARMACY_PARAMS)),
+    "/v1/pharmacies/prefetch": _prefetch,
+    "/v1/coverage": lambda p: svc.coverage(**_params(p, **COVERAGE_PARAMS)),
+    "/v1/hospitals": lambda p: svc.hospitals(**_params(p, **HOSPITAL_PARAMS)),
+    "/v1/hospitals/locate": lambda p: svc.locate(**_params(p, q=str)),
+    "/v1/stats": _stats,
+    "/metrics": _metrics,
+}
+
+
+class Metrics:
+    """엔드포인트별 요청 수/오류 수/처리 시간 (워커 단위)"""
+
+    def __init__(self, clock=_time.monotonic):
+        self.clock = clock
+        self.started = clock()
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def record(self, path, seconds, ok):
+        with self._lock:
+            m = self._data.setdefault(path, {"requests": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0})
+            m["requests"] += 1
+            m["errors"] += 0 if ok else 1
+            m["total_s"] += seconds
+            m["max_s"] = max(m["max_s"], seconds)
+
+    def snapshot(self):
+        with self._lock:
+            uptime = max(self.clock() - self.started, 1e-9)
+            return {
+                path: {"requests": m["requests"], "errors": m["errors"],
+                       "mean_ms": round(m["total_s"] / m["requests"] * 1000, 2),
+                       "max_ms": round(m["max_s"] * 1000, 2),
+                       "rps": round(m["requests"] / uptime, 3)}
+                for path, m in self._data.items()
+            }
+
+
+METRICS = Metrics()
+
+
+async def dispatch(method, target, body):
+    """(status, payload) — 라우팅 + 인자 파싱 + 오류 → 상태 코드"""
+    url = urlsplit(target)
+    route = ROUTES.get(url.path)
+    if route is None:
+        return 404, {"error": f"없는 경로: {url.path}"}
+    if method == "GET":
+        params = dict(parse_qsl(url.query))
+    elif method == "POST":
+        try:
+            params = json.loads(body) if body else {}
+        except ValueError as e:
+            return 400, {"error": f"JSON 본문 오류: {e}"}
+        if not isinstance(params, dict):
+            return 400, {"error": "JSON 본문은 객체여야 합니다"}
+    else:
+        return 405, {"error": f"지원하지 않는 메서드: {method}"}
+
+    t0 = _time.perf_counter()
+    try:
+        status, payload = 200, await route(params)
+    except requests.RequestException as e:  # JSON 디코딩 오류(ValueError 하위)도 상위 서비스 실패로
+        status, payload = 502, {"error": f"{type(e).__name__}: {e}"}
+    except ValueError as e:
+        status, payload = 400, {"error": str(e)}
+    except Exception as e:
+        status, payload = 502, {"error": f"{type(e).__name__}: {e}"}
+    elapsed = _time.perf_counter() - t0
+    METRICS.record(url.path, elapsed, status == 200)
+    STAGES.observe("http", url.path, elapsed)
+    return status, payload
+
+
+def _response(status, payload, keep_alive):
+    if isinstance(payload, str):
+        body, ctype = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body, ctype = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8"), "application/json; charset=utf-8"
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {ctype}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("ascii") + body
+
+
+async def handle(reader, writer):
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                method, target, version = line.decode("utf-8", "replace").split()
+            except ValueError:
+                break
+            headers = {}
+            while True:
+                h = await reader.readline()
+                if h in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = h.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length") or 0)
+            conn = headers.get("connection", "").lower()
+            keep_alive = conn != "close" if version == "HTTP/1.1" else conn == "keep-alive"
+            if length > MAX_BODY:
+                writer.write(_response(413, {"error": "본문이 너무 큽니다"}, False))
+                await writer.drain()
+                break
+            body = await reader.readexactly(length) if length else b""
+            status, payload = await dispatch(method.upper(), target, body)
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+def _listen(host, port, reuse_port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+
+async def serve(host="127.0.0.1", port=8600, reuse_port=False):
+    server = await asyncio.start_server(handle, sock=_listen(host, port, reuse_port), backlog=512)
+    async with server:
+        await server.serve_forever()
+
+
+def run_worker(host, port, reuse_port):
+    try:
+        asyncio.run(serve(host, port, reuse_port))
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    ap = argparse.ArgumentParser(description="약국/소아과 검색 서비스 HTTP 서버")
+    ap.add_argument("--host", default=os.environ.get("SEARCH_HOST", "127.0.0.1"))
+    ap.add_argument("--port", type=int, default=int(os.environ.get("SEARCH_PORT", "8600")))
+    ap.add_argument("--workers", type=int, default=1, help="워커 프로세스 수 (SO_REUSEPORT 로 포트 공유)")
+    args = ap.parse_args()
+
+    print(f"search service on http://{args.host}:{args.port} • workers {args.workers}", flush=True)
+    if args.workers <= 1:
+        run_worker(args.host, args.port, False)
+        return
+    import multiprocessing as mp
+    procs = [mp.Process(target=run_worker, args=(args.host, args.port, True), daemon=True)
+             for _ in range(args.workers)]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,506 @@
+# -*- coding: utf-8 -*-
+# 약국 / 소아과 병원 검색 서비스 (Streamlit 없이 import 해서 쓰는 검색 파이프라인)
+# - 약국: 주소 검색 → Overpass 조회(미러 상태/hedged, 결과 캐시, 동시 검색 합치기, 미리 조회)
+#         또는 로컬 인덱스 → 영업여부/다음변경 평가 → 정렬   (app.py 에 있던 것을 그대로 옮김)
+#   반경 검색은 기본적으로 타일 저장소(overpass_tiles.py)에서 모아 자름 → 없는 타일만 Overpass 에 요청
+#   이때 캐시 역할은 타일 저장소 (hit/stale/miss 는 stats()["tiles"]). 결과 캐시(OverpassCache)와
+#   bbox 묶음은 가까운 곳 찾기 고리, 사각지대 bbox, 타일이 너무 많은 반경, PHARMACY_TILES=0 일 때만
+# - 사각지대 분석: 격자점별 지정 시각에 영업중인 가장 가까운 약국까지 거리 (pharmacy_coverage.py)
+# - 병원: 지역 DB / Nominatim 으로 위치 → 유형/거리 필터 → 거리순   (hospital_finder.py 에서 옮김)
+# - SearchService(동기) + asyncio 래퍼(pharmacies, hospitals, geocode, locate …)
+#   HTTP 서버는 search_http.py, Streamlit 화면은 search_client.py 로 이 API 를 부르는 얇은 클라이언트
+# - Overpass/Nominatim 요청은 공용 연결 풀(http_pool: keep-alive, gzip, 연결/읽기 타임아웃). 상태는 stats()["http"]
+# - 반환값은 그대로 JSON 으로 보낼 수 있는 dict. 미러 오류 같은 경고는 "warnings" 목록으로 돌려줌
+# - 잘못된 인자는 ValueError (HTTP 400)
+# - 단계별 소요 시간(주소 검색, tz_at, 미러 요청 시도별, 디코딩, 표 생성, 정렬 …)은 stage_metrics 로 기록
+#   → 응답의 "timings", stats()["stages"] 의 p50/p95/p99, search_http.py GET /metrics, STAGE_LOG JSON 로그
+
+import asyncio
+import os
+import threading
+import time as _time
+from datetime import datetime
+
+import requests
+
+import http_pool
+from geocoding import get_cache as get_geocode_cache, get_geocoder
+from nearest_search import nearest_open
+from overpass_cache import OverpassCache, cache_key
+from overpass_coalesce import Coalescer
+from overpass_decode import decode_overpass
+from overpass_mirrors import HEALTH, _valid_payload, fetch_hedged, parse_retry_after
+from overpass_query import normalize_elements
+from overpass_tiles import TileFetcher, get_store as get_tile_store
+from prefetch import Prefetcher
+from stage_metrics import STAGES, observe, stage, traced
+from tz_lookup import tz_at
+
+# ---------------- Overpass (diagnostic + retry) ----------------
+# OVERPASS_URLS(쉼표 구분)로 미러 목록 교체 — 예: 대역 서버(upstream_stub.py)로 오프라인 측정
+OVERPASS = [u.strip() for u in os.environ.get("OVERPASS_URLS", "").split(",") if u.strip()] or [
+    "https://overpass-api.de/api/interpreter",
+    "https://overpass.kumi.systems/api/interpreter",
+    "https://overpass.openstreetmap.ru/api/interpreter",
+]
+UA = {"User-Agent": "pharmacy-open-now/1.0 (contact: you@example.com)"}  # ← 이메일 바꾸면 좋아요
+NOMINATIM_UA = UA["User-Agent"]
+HOSPITAL_UA = "PediatricHospitalFinder/1.0"
+
+
+def _warn(warn, msg):
+    if warn is not None:
+        warn(msg)
+
+
+def _attempt_done(endpoint, seconds, outcome):
+    # 미러 요청 시도 하나. 성공/실패는 히스토그램을 나누고, hedge 에서 진(취소된) 요청은 추적에만
+    observe("overpass_attempt" if outcome == "ok" else "overpass_attempt_error", seconds,
+            histogram=outcome != "cancelled", endpoint=endpoint, outcome=outcome)
+
+
+def fetch_overpass(query, tries=6, backoff=1.6, warn=None):
+    # 미러 순서는 상태표(HEALTH) 기준: 쿨다운/서킷 open 미러는 건너뛰고 빠른 미러 먼저
+    last = None
+    order = HEALTH.ranked(OVERPASS)
+    for i in range(tries):
+        url = order[i % len(order)]
+        HEALTH.begin(url)
+        t0 = _time.monotonic()
+        try:
+            r = http_pool.post(url, data={"data": query}, headers=UA, timeout=60)
+            code = r.status_code
+            if code != 200:
+                snippet = (r.text or "")[:300].replace("\n", " ")[:300]
+                _warn(warn, f"[Overpass] {url} → HTTP {code} • {r.reason} • body: {snippet}")
+                _attempt_done(url, _time.monotonic() - t0, f"HTTP {code}")
+                if code in (429, 500, 502, 503, 504):
+                    HEALTH.record_failure(url, code, parse_retry_after(r.headers.get("Retry-After")))
+                    last = (code, r.reason, url)
+                    _time.sleep(backoff ** i)
+                    continue
+                raise requests.exceptions.HTTPError(f"HTTP {code} {r.reason} @ {url}")
+            try:
+                with stage("overpass_decode"):
+                    data = decode_overpass(r.content)
+            except Exception as je:
+                _attempt_done(url, _time.monotonic() - t0, "JSON parse fail")
+                _warn(warn, f"[Overpass] {url} → 200 but JSON parse fail: {je}")
+                HEALTH.record_failure(url)
+                last = (200, "JSON parse fail", url)
+                _time.sleep(backoff ** i)
+                continue
+            if not _valid_payload(data):
+                # 200 + remark "runtime error"(타임아웃/메모리 초과) + 빈 elements → 성공으로 받으면
+                # 타일 저장소/결과 캐시에 "약국 없음"으로 남음
+                remark = str(data.get("remark", ""))[:200] if isinstance(data, dict) else ""
+                _attempt_done(url, _time.monotonic() - t0, "invalid payload")
+                _warn(warn, f"[Overpass] {url} → 200 but invalid payload: {remark}")
+                HEALTH.record_failure(url)
+                last = (200, "invalid payload", remark, url)
+                _time.sleep(backoff ** i)
+                continue
+            HEALTH.record_success(url, _time.monotonic() - t0)
+            _attempt_done(url, _time.monotonic() - t0, "ok")
+            return data, url
+        except requests.exceptions.RequestException as e:
+            _attempt_done(url, _time.monotonic() - t0, "RequestException")
+            HEALTH.record_failure(url)
+            last = (None, "RequestException", str(e), url)
+            _warn(warn, f"[Overpass] {url} → RequestException: {e}")
+            _time.sleep(backoff ** i)
+            continue
+    raise RuntimeError(f"Overpass 요청 실패 (last={last})")
+
+
+def fetch_overpass_hedged(query, deadline=45.0, warn=None):
+    data, url, report = fetch_hedged(query, OVERPASS, headers=UA, deadline=deadline)
+    for a in report["attempts"]:
+        _attempt_done(a["endpoint"], a["elapsed"] or 0.0, a["outcome"])
+        if a["outcome"] not in ("ok", "cancelled"):
+            _warn(warn, f"[Overpass] {a['endpoint']} → {a['outcome']} {a['detail'][:300]}")
+    return data, url, report
+
+
+def fetch_any(query, hedged=True, warn=None):
+    # (data, endpoint, report) — 순차 모드는 report 없음. compact 응답은 여기서 기존 모양으로 정규화
+    if hedged:
+        data, url, report = fetch_overpass_hedged(query, warn=warn)
+    else:
+        (data, url), report = fetch_overpass(query, warn=warn), None
+    return normalize_elements(data), url, report
+
+
+# ---------------- Settings ----------------
+QUERY_TAGS = ("amenity=pharmacy", "healthcare=pharmacy", "shop=chemist", "name~(pharm|약국),i")
+CACHE_TTL = 300        # 초. 지나면 stale 응답 + 백그라운드 갱신
+CACHE_MAX_ENTRIES = 512
+KNN_MAX_RADIUS = 20000  # k곳 모드 최대 반경 (m)
+KNN_MAX_CALLS = 5       # k곳 모드 최대 Overpass 호출 수
+KNN_DEADLINE = 60.0     # k곳 모드 전체 시간 상한 (초)
+MAX_RADIUS = 3000       # 반경 검색 상한 (m). 결과 0개면 이 값까지 자동 확대
+
+COALESCE_WINDOW = 0.15   # 초. 이 안에 들어온 가까운 반경 검색은 bbox 쿼리 하나로 묶음 (0 이면 끔)
+COALESCE_MAX_SPAN = 8000 # m. 묶음 영역 가로/세로 상한
+
+TILES = os.environ.get("PHARMACY_TILES", "1") != "0"
+
+PREFETCH = os.environ.get("PHARMACY_PREFETCH", "1") != "0"
+PREFETCH_DELAY = 0.6     # 초. 이 시간 안에 다른 곳을 다시 고르면 이전 후보는 받지 않음
+
+# PHARMACY_BACKEND=local 이면 기본 데이터 소스를 로컬 인덱스로
+INDEX_DIR = os.environ.get("PHARMACY_INDEX_DIR", "data/pharmacy_index")
+DEFAULT_BACKEND = os.environ.get("PHARMACY_BACKEND", "overpass")
+BACKENDS = {"overpass": "Overpass", "local": "로컬 인덱스"}
+MODES = ("radius", "nearest")
+
+
+def _check(cond, msg):
+    if not cond:
+        raise ValueError(msg)
+
+
+def _coords(lat, lon):
+    _check(lat is not None and lon is not None, "lat/lon 이 필요합니다")
+    lat, lon = float(lat), float(lon)
+    _check(-90 <= lat <= 90 and -180 <= lon <= 180, "lat/lon 범위를 벗어났습니다")
+    return lat, lon
+
+
+class SearchService:
+    """프로세스당 하나. 캐시/합치기/미리 조회/로컬 인덱스를 들고 있는 검색 파이프라인"""
+
+    def __init__(self, index_dir=INDEX_DIR):
+        self.index_dir = index_dir
+        self.cache = OverpassCache(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES)
+        # 같은 쿼리는 한 번만 요청(single-flight), 가까운 동시 검색은 bbox 로 묶음
+        self.coalescer = Coalescer(window=COALESCE_WINDOW, max_span_m=COALESCE_MAX_SPAN)
+        self.prefetcher = Prefetcher(delay=PREFETCH_DELAY, max_inflight=4)
+        self.tiles = TileFetcher(get_tile_store()) if TILES else None
+        self._index = None
+        self._index_lock = threading.Lock()
+        self._hospitals = None
+
+    # ---- Overpass 결과 캐시 ----
+    def cached_overpass(self, lat, lon, radius, hedged=True, compact=False, warn=None):
+        # 캐시 키와 같은 정밀도로 쿼리를 만들어야 캐시 결과와 실제 쿼리가 일치
+        key = cache_key(lat, lon, radius, QUERY_TAGS)
+        search = lambda w: self.coalescer.search(
+            key[0], key[1], key[2], lambda q: fetch_any(q, hedged=hedged, warn=w), compact=compact)
+        return self._cached(key, search, warn)
+
+    def cached_fetch(self, key, query, hedged=True, warn=None):
+        fetch = lambda w: self.coalescer.fetch_once(query, lambda q: fetch_any(q, hedged=hedged, warn=w))
+        return self._cached(key, fetch, warn)
+
+    def tiled_overpass(self, lat, lon, radius, hedged=True, compact=False, warn=None):
+        # 없는 타일만 쿼리 한 번. 같은 쿼리가 요청 중이면 같이 받음 (single-flight)
+        fetch = lambda q, w: self.coalescer.fetch_once(q, lambda qq: fetch_any(qq, hedged=hedged, warn=w))
+        return self.tiles.search(lat, lon, radius, fetch, compact, warn)
+
+    def _cached(self, key, fetch, warn=None):
+        (data, endpoint, report), status = self.cache.get(
+            key,
+            fetch=lambda: fetch(warn),
+            refresh=lambda: fetch(None),  # 백그라운드 갱신의 경고는 버림
+        )
+        return data, endpoint, status, report
+
+    # ---- 로컬 인덱스 ----
+    def local_index_available(self):
+        return os.path.exists(os.path.join(self.index_dir, "meta.json"))
+
+    def local_index(self):
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    from pharmacy_index import PharmacyIndex
+                    self._index = PharmacyIndex(self.index_dir)
+        return self._index
+
+    def search_radius(self, lat, lon, radius, backend="overpass", hedged=True, compact=False, warn=None):
+        # (data, endpoint, status, report) — 로컬 인덱스도 같은 모양으로 반환
+        if backend == "local":
+            t0 = _time.perf_counter()
+            data = self.local_index().query(lat, lon, radius)
+            return data, f"local:{self.index_dir}", f"local {(_time.perf_counter() - t0) * 1000:.1f}ms", None
+        if self.tiles is not None and self.tiles.covers(lat, lon, radius):
+            return self.tiled_overpass(lat, lon, radius, hedged, compact, warn)
+        return self.cached_overpass(lat, lon, radius, hedged, compact, warn)
+
+    # ---- 공개 API: 약국 ----
+    def info(self):
+        backends = [b for b in BACKENDS if b != "local" or self.local_index_available()]
+        return {"backends": backends,
+                "default_backend": DEFAULT_BACKEND if DEFAULT_BACKEND in backends else backends[0],
+                "max_radius": MAX_RADIUS, "knn_max_radius": KNN_MAX_RADIUS, "prefetch": PREFETCH}
+
+    @traced("geocode")
+    def geocode(self, q):
+        """주소/장소명 → {"found", "lat", "lon", "label"} (약국 앱용, 한국어 결과)"""
+        _check(q and q.strip(), "q 가 비어 있습니다")
+        loc = get_geocoder(NOMINATIM_UA).geocode(q, **{"accept-language": "ko"})
+        if not loc:
+            return {"found": False, "query": q}
+        return {"found": True, "query": q, "lat": loc[0], "lon": loc[1], "label": loc[2]}
+
+    @traced("pharmacies")
+    def pharmacies(self, lat, lon, radius=1200, mode="radius", k=5, open_only=True, backend="overpass",
+                   hedged=True, compact=False, include_all=False, now=None, open_at=None, open_during=None,
+                   during="any"):
+        """반경 검색(mode="radius") 또는 가까운 영업중 k곳(mode="nearest")
+
+        open_at("일 21:00") / open_during("일 18:00-06:00", during="any"|"all") 을 주면 open_only 대신
+        주간 슬롯 비트열로 그 시각(시간대)에 영업하는 약국만 거리순으로 (반경 검색만)
+        반환: {"center", "radius", "mode", "tz", "now", "valid_until", "open_only", "schedule", "count", "rows",
+               "all_rows"(include_all), "fetches", "nearest"(nearest), "retried_radius", "warnings", "elapsed",
+               "timings"(단계별 ms, stage_metrics)}
+        rows 는 result_table.to_records 형식 (영업여부 → 거리 순)
+        """
+        from opening_hours import format_when, parse_range, parse_when
+        from result_table import build_table, evaluate_hours, result_view, schedule_view, to_records
+        t0 = _time.perf_counter()
+        lat, lon = _coords(lat, lon)
+        radius, k = int(radius), int(k)
+        _check(mode in MODES, f"mode 는 {MODES} 중 하나")
+        _check(backend in BACKENDS, f"backend 는 {tuple(BACKENDS)} 중 하나")
+        _check(backend != "local" or self.local_index_available(), "로컬 인덱스가 없습니다")
+        _check(0 < radius <= (KNN_MAX_RADIUS if mode == "nearest" else MAX_RADIUS), "radius 범위를 벗어났습니다")
+        _check(1 <= k <= 100, "k 는 1~100")
+        _check(not (open_at and open_during), "open_at 과 open_during 중 하나만 지정하세요")
+        _check(mode == "radius" or not (open_at or open_during), "시각 필터는 반경 검색에서만 지원합니다")
+        _check(during in ("any", "all"), "during 은 any / all")
+
+        with stage("tz_at"):
+            tz = tz_at(lat, lon)
+        now_local = now.astimezone(tz) if now is not None else datetime.now(tz)
+        # 요일 없는 "22:00" 은 검색 위치 시간대의 오늘
+        at = parse_when(open_at, now_local) if open_at else None
+        span = parse_range(open_during, now_local) if open_during else None
+        warnings = []
+        fetches = []
+        out = {"retried_radius": None}
+
+        if mode == "nearest":
+            # 반경에서 시작해 고리 단위로 확장 (호출 수/시간 상한)
+            clat, clon, _, _ = cache_key(lat, lon, radius, QUERY_TAGS)
+
+            def fetch_ring(query, r_inner, r_outer):
+                if backend == "local":
+                    return self.local_index().query(clat, clon, r_outer, min_radius=r_inner)
+                if r_inner <= 0:
+                    # 첫 고리(안쪽 반경 0)는 반경 검색 그대로 → 타일 저장소/결과 캐시를 같이 씀 (미리 받아 둔 결과 사용)
+                    return self.search_radius(clat, clon, r_outer, backend, hedged, compact, warnings.append)[0]
+                tags = QUERY_TAGS + (f"ring>{r_inner}",)
+                return self.cached_fetch(cache_key(clat, clon, r_outer, tags), query, hedged, warnings.append)[0]
+
+            with stage("nearest", backend=backend) as d:
+                elements, info = nearest_open(clat, clon, k, now_local, fetch_ring,
+                                              start_radius=radius, max_radius=KNN_MAX_RADIUS,
+                                              max_calls=KNN_MAX_CALLS, deadline=KNN_DEADLINE, compact=compact)
+                d["calls"] = info["calls"]
+            out["nearest"] = info
+            radius = info["radius"]
+            open_only = True
+        else:
+            with stage("fetch", backend=backend) as d:
+                data, endpoint, status, report = self.search_radius(lat, lon, radius, backend, hedged, compact,
+                                                                    warnings.append)
+                d["cache"] = status
+            elements = data.get("elements", [])
+            fetches.append({"endpoint": endpoint, "cache": status, "report": report, "retry": False,
+                            "tiles": data.get("tiles")})
+
+            if not elements and radius < MAX_RADIUS:
+                alt_radius = min(MAX_RADIUS, max(radius + 800, int(radius * 1.6)))
+                with stage("fetch", backend=backend, retry=True) as d:
+                    data, endpoint, status, report = self.search_radius(lat, lon, alt_radius, backend, hedged,
+                                                                        compact, warnings.append)
+                    d["cache"] = status
+                elements = data.get("elements", [])
+                fetches.append({"endpoint": endpoint, "cache": status, "report": report, "retry": True,
+                                "tiles": data.get("tiles")})
+                out["retried_radius"] = radius = alt_radius
+
+        with stage("build_table", elements=len(elements)):
+            df_all = build_table(elements, lat, lon)
+        # opening_hours 는 문자열별로 한 번만 컴파일·평가
+        with stage("evaluate_hours"):
+            valid_until = evaluate_hours(df_all, now_local)
+        with stage("sort"):
+            if at is not None or span is not None:
+                # 주간 슬롯 비트 검사 (다시 파싱하지 않음)
+                df = schedule_view(df_all, at, span, during)
+                out["schedule"] = {"at": format_when(at) if at is not None else None,
+                                   "during": [format_when(v) for v in span] if span else None, "how": during}
+            else:
+                df = result_view(df_all, open_only)
+                out["schedule"] = None
+        t_rec = _time.perf_counter()
+        out.update({
+            "center": [lat, lon],
+            "radius": radius,
+            "mode": mode,
+            "tz": tz.zone,
+            "now": now_local.isoformat(),
+            "valid_until": valid_until.isoformat() if valid_until else None,
+            "open_only": bool(open_only),
+            "count": len(df),
+            "rows": to_records(df),
+            "fetches": fetches,
+            "warnings": warnings,
+        })
+        if include_all:
+            out["all_rows"] = to_records(result_view(df_all, False))
+        observe("to_records", _time.perf_counter() - t_rec)
+        out["elapsed"] = round(_time.perf_counter() - t0, 4)
+        return out
+
+    def prefetch(self, owner, lat, lon, radius, hedged=True, compact=False):
+        """검색 중심 후보를 미리 조회 (백그라운드). 예약한 캐시 키 문자열 반환, 꺼져 있으면 None"""
+        lat, lon = _coords(lat, lon)
+        radius = int(radius)
+        _check(0 < radius <= MAX_RADIUS, "radius 범위를 벗어났습니다")
+        if not PREFETCH:
+            return None
+        key = cache_key(lat, lon, radius, QUERY_TAGS)
+        self.prefetcher.request(str(owner), key,
+                                lambda: self.search_radius(lat, lon, radius, "overpass", hedged, compact))
+        return repr(key)
+
+    def cancel_prefetch(self, owner):
+        self.prefetcher.cancel(str(owner))
+
+    @traced("coverage")
+    def coverage(self, region=None, bbox=None, half_km=5.0, at=None, step_m=100, margin_m=5000,
+                 backend="overpass", include_unknown=False, hedged=True):
+        """사각지대 분석: 격자점별 at(예: "일 22:00") 에 영업중인 가장 가까운 약국까지 거리 (pharmacy_coverage.py)
+
+        region(KOREA_LOCATIONS 지역명) ± half_km 또는 bbox=(south, west, north, east). 반환은 pharmacy_coverage.to_payload
+        """
+        import pharmacy_coverage as cov
+        _check((region is None) != (bbox is None), "region 과 bbox 중 하나만 지정하세요")
+        _check(backend in BACKENDS, f"backend 는 {tuple(BACKENDS)} 중 하나")
+        _check(backend != "local" or self.local_index_available(), "로컬 인덱스가 없습니다")
+        _check(20 <= float(step_m) <= 5000, "step_m 은 20~5000")
+        _check(0 < float(margin_m) <= KNN_MAX_RADIUS, "margin_m 범위를 벗어났습니다")
+        _check(0 < float(half_km) <= 50, "half_km 는 0~50")
+        box = cov.region_bbox(region, float(half_km)) if region is not None else cov.check_bbox(bbox)
+        now = datetime.now(tz_at((box[0] + box[2]) / 2, (box[1] + box[3]) / 2))
+        sec = cov.parse_when(at, now) if at else cov.week_second(now)
+        result = cov.run(box, sec, float(step_m), float(margin_m), backend, bool(include_unknown), self, bool(hedged))
+        return cov.to_payload(result)
+
+    # ---- 공개 API: 소아과 병원 ----
+    def hospital_frame(self):
+        if self._hospitals is None:
+            from hospital_data import load_hospital_data
+            self._hospitals = load_hospital_data()
+        return self._hospitals
+
+    @traced("locate")
+    def locate(self, q):
+        """지역 DB → Nominatim 순서로 위치 검색 → {"found", "lat", "lon", "label", "error"?}"""
+        from hospital_data import search_location_by_region
+        _check(q and q.strip(), "q 가 비어 있습니다")
+        with stage("region_lookup"):
+            lat, lon, region = search_location_by_region(q)
+        if lat and lon:
+            return {"found": True, "query": q, "lat": lat, "lon": lon, "label": f"지역 검색: {region}"}
+        try:
+            loc = get_geocoder(HOSPITAL_UA, timeout=10).geocode(f"{q}, South Korea", addressdetails=1)
+        except Exception as e:
+            return {"found": False, "query": q, "error": f"온라인 검색 오류: {e}"}
+        if loc:
+            return {"found": True, "query": q, "lat": loc[0], "lon": loc[1], "label": f"주소 검색: {loc[2]}"}
+        return {"found": False, "query": q}
+
+    @traced("hospitals")
+    def hospitals(self, lat=None, lon=None, general=True, emergency=True, max_km=30):
+        """유형 필터 + (위치가 있으면) max_km 안의 병원을 거리순으로 → {"location", "count", "hospitals", "timings"}"""
+        from geopy.distance import geodesic
+        _check(general or emergency, "적어도 하나의 병원 유형을 선택해야 합니다")
+        with stage("hospital_filter"):
+            df = self.hospital_frame()
+            if not general:
+                df = df[df['pediatric_emergency'] == True]
+            elif not emergency:
+                df = df[df['pediatric_emergency'] == False]
+        location = None
+        if lat is not None and lon is not None:
+            lat, lon = _coords(lat, lon)
+            location = [lat, lon]
+            with stage("hospital_distance", rows=len(df)):
+                df = df.assign(distance=[geodesic((lat, lon), (a, b)).kilometers
+                                         for a, b in zip(df['lat'], df['lon'])])
+            with stage("hospital_sort"):
+                df = df[df['distance'] <= float(max_km)].sort_values('distance')
+        with stage("hospital_records"):
+            rows = df.to_dict("records")
+        return {"location": location, "count": len(df), "hospitals": rows}
+
+    # ---- 진단 ----
+    def stats(self):
+        return {
+            "mirrors": HEALTH.snapshot(OVERPASS),
+            "overpass_cache": self.cache.stats(),
+            "tiles": self.tiles.stats() if self.tiles is not None else None,
+            "coalescing": self.coalescer.stats(),
+            "prefetch": self.prefetcher.stats(),
+            "geocode_cache": get_geocode_cache().stats(),
+            "http": http_pool.stats(),
+            "stages": STAGES.snapshot("service"),
+        }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    """프로세스 전역 SearchService"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = SearchService()
+    return _service
+
+
+# ---------------- async API ----------------
+# 파이프라인은 블로킹 I/O(http_pool)라 스레드에서 실행 → 이벤트 루프는 다른 요청을 계속 받음
+
+async def pharmacies(**kwargs):
+    return await asyncio.to_thread(get_service().pharmacies, **kwargs)
+
+
+async def geocode(q):
+    return await asyncio.to_thread(get_service().geocode, q)
+
+
+async def prefetch(owner, lat, lon, radius, hedged=True, compact=False):
+    return await asyncio.to_thread(get_service().prefetch, owner, lat, lon, radius, hedged, compact)
+
+
+async def cancel_prefetch(owner):
+    return get_service().cancel_prefetch(owner)
+
+
+async def coverage(**kwargs):
+    return await asyncio.to_thread(get_service().coverage, **kwargs)
+
+
+async def hospitals(**kwargs):
+    return await asyncio.to_thread(get_service().hospitals, **kwargs)
+
+
+async def locate(q):
+    return await asyncio.to_thread(get_service().locate, q)
+
+
+async def info():
+    return await asyncio.to_thread(get_service().info)
+
+
+async def stats():
+    return get_service().stats()
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+# 검색 파이프라인 단계별 소요 시간 (약국 앱 / 병원 앱 / 검색 서비스 공용)
+# - 단계(stage)마다 프로세스 전역 히스토그램(STAGES)에 기록. 키는 (component, stage)
+#   component: "service"(search_service), "pharmacy_app"(app.py), "hospital_app"(hospital_finder.py)
+# - 히스토그램은 Prometheus 식 누적 버킷(le) + 합계/개수. p50/p95/p99 는 단계별 최근 샘플(WINDOW 개)에서
+# - 요청 하나의 단계 목록은 Trace. traced() 로 감싼 서비스 메서드는 스레드 로컬 현재 추적에 쌓고,
+#   끝나면 결과 dict 에 "timings" 를 붙이고 구조화 JSON 한 줄을 logging("pharmacy.timing") 으로 남김
+#   → 깊은 곳(미러 요청, Nominatim)은 인자 전달 없이 observe()/stage() 만 부르면 됨
+# - 다른 스레드(hedged 미러 요청, 백그라운드 갱신/미리 조회)에서 잰 단계는 히스토그램에만 들어감
+# - STAGE_LOG=- 이면 stderr, 파일 경로면 그 파일에 JSON Lines. 비우면 로거 설정에 맡김(기본 출력 없음)
+# - 집계는 프로세스(워커)별. search_http.py --workers N 이면 /metrics 도 응답한 워커의 값
+
+import json
+import logging
+import os
+import threading
+import time as _time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+
+# 초 단위 버킷 상한 (캐시 hit ~ms, 미러 요청 ~수십 초까지)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+WINDOW = 1024        # 백분위 계산용 최근 샘플 수 (단계별)
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_NAME = "search_stage_seconds"
+
+LOG = logging.getLogger("pharmacy.timing")
+
+
+class Histogram:
+    """누적 버킷 + 합계/개수/최대 + 최근 샘플 (락은 StageMetrics 가 잡음)"""
+
+    def __init__(self, buckets=BUCKETS, window=WINDOW):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def quantile(self, q):
+        """최근 샘플의 q 분위수 (nearest-rank). 샘플이 없으면 None"""
+        if not self.recent:
+            return None
+        s = sorted(self.recent)
+        return s[min(len(s) - 1, max(0, int(q * len(s) + 0.5) - 1))]
+
+    def cumulative(self):
+        out, acc = [], 0
+        for c in self.counts:
+            acc += c
+            out.append(acc)
+        return out
+
+
+class StageMetrics:
+    """(component, stage) → Histogram"""
+
+    def __init__(self, buckets=BUCKETS, window=WINDOW):
+        self.buckets = buckets
+        self.window = window
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def observe(self, component, stage, seconds):
+        with self._lock:
+            h = self._data.get((component, stage))
+            if h is None:
+                h = self._data[(component, stage)] = Histogram(self.buckets, self.window)
+            h.observe(seconds)
+
+    def snapshot(self, component=None):
+        """단계별 요약 목록: component, stage, count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms"""
+        with self._lock:
+            items = sorted((k, h) for k, h in self._data.items() if component is None or k[0] == component)
+            out = []
+            for (comp, stage), h in items:
+                row = {"component": comp, "stage": stage, "count": h.count,
+                       "mean_ms": round(h.sum / h.count * 1000, 2) if h.count else None}
+                for q in QUANTILES:
+                    v = h.quantile(q)
+                    row[f"p{int(q * 100)}_ms"] = round(v * 1000, 2) if v is not None else None
+                row["max_ms"] = round(h.max * 1000, 2)
+                out.append(row)
+            return out
+
+    def prometheus(self, name=METRIC_NAME):
+        """Prometheus text exposition (히스토그램 하나, 라벨 component/stage)"""
+        lines = [f"# HELP {name} Search pipeline stage latency in seconds.", f"# TYPE {name} histogram"]
+        with self._lock:
+            for (comp, stage), h in sorted(self._data.items()):
+                labels = f'component="{_label(comp)}",stage="{_label(stage)}"'
+                for le, c in zip(list(self.buckets) + ["+Inf"], h.cumulative()):
+                    le = le if isinstance(le, str) else repr(float(le))
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {c}')
+                lines.append(f"{name}_sum{{{labels}}} {h.sum:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._data.clear()
+
+
+def _label(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+STAGES = StageMetrics()
+
+
+# ---------------- 요청별 추적 ----------------
+class Trace:
+    """요청 하나의 단계 목록. stage() 로 잰 값은 STAGES 에도 기록"""
+
+    def __init__(self, component, op, metrics=STAGES, **fields):
+        self.component = component
+        self.op = op
+        self.metrics = metrics
+        self.fields = fields
+        self.stages = []
+        self.started = _time.perf_counter()
+        self.total = None
+
+    def add(self, stage, seconds, histogram=True, **detail):
+        self.stages.append(dict(stage=stage, ms=round(seconds * 1000, 2), **detail))
+        if histogram:
+            self.metrics.observe(self.component, stage, seconds)
+
+    @contextmanager
+    def stage(self, name, **detail):
+        """with tr.stage("search") as d: ... (d 에 넣은 값은 단계 기록에 함께 남음)"""
+        t0 = _time.perf_counter()
+        try:
+            yield detail
+        finally:
+            self.add(name, _time.perf_counter() - t0, **detail)
+
+    def finish(self, log=True, **fields):
+        """전체 시간을 op 이름으로 기록 + JSON 로그. as_dict() 반환"""
+        self.total = _time.perf_counter() - self.started
+        self.fields.update(fields)
+        self.metrics.observe(self.component, self.op, self.total)
+        if log:
+            emit(self)
+        return self.as_dict()
+
+    def as_dict(self):
+        total = self.total if self.total is not None else _time.perf_counter() - self.started
+        return {"component": self.component, "op": self.op, "total_ms": round(total * 1000, 2),
+                "stages": list(self.stages)}
+
+
+_local = threading.local()
+
+
+def current():
+    """이 스레드에서 진행 중인 Trace (없으면 None)"""
+    return getattr(_local, "trace", None)
+
+
+def observe(stage, seconds, component=None, histogram=True, **detail):
+    """현재 추적(있으면)과 STAGES 에 기록. 추적 밖에서는 component 기본값 "service" """
+    tr = current()
+    if tr is not None and (component is None or component == tr.component):
+        tr.add(stage, seconds, histogram, **detail)
+    elif histogram:
+        STAGES.observe(component or "service", stage, seconds)
+
+
+@contextmanager
+def stage(name, component=None, **detail):
+    t0 = _time.perf_counter()
+    try:
+        yield detail
+    finally:
+        observe(name, _time.perf_counter() - t0, component, **detail)
+
+
+def traced(op, component="service"):
+    """메서드 전체를 추적. 결과가 dict 면 "timings" 에 단계 목록을 붙임. 예외면 error 필드로 로그"""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            prev = current()
+            tr = _local.trace = Trace(component, op)
+            try:
+                out = fn(*args, **kwargs)
+            except Exception as e:
+                tr.finish(error=type(e).__name__)
+                raise
+            finally:
+                _local.trace = prev
+            timings = tr.finish()
+            if isinstance(out, dict):
+                out["timings"] = timings
+            return out
+        return wrapper
+    return deco
+
+
+def annotate(**fields):
+    """현재 추적의 JSON 로그에 필드 추가 (예: cache="hit")"""
+    tr = current()
+    if tr is not None:
+        tr.fields.update(fields)
+
+
+# ---------------- 구조화 로그 ----------------
+def emit(trace):
+    if not LOG.isEnabledFor(logging.INFO):
+        return
+    rec = {"ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"), **trace.as_dict(), **trace.fields}
+    LOG.info(json.dumps(rec, ensure_ascii=False, default=str))
+
+
+def configure_log(target=None):
+    """STAGE_LOG 설정: "-" → stderr, 경로 → 파일 (JSON Lines). 이미 설정했으면 그대로"""
+    target = os.environ.get("STAGE_LOG", "") if target is None else target
+    if not target or LOG.handlers:
+        return
+    handler = logging.StreamHandler() if target == "-" else logging.FileHandler(target, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    LOG.addHandler(handler)
+    LOG.setLevel(logging.INFO)
+    LOG.propagate = False
+
+
+configure_log()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# 좌표 → 시간대 (프로세스당 TimezoneFinder 하나, 반올림 좌표별 메모이즈)
+# - 한국 영역은 TimezoneFinder 없이 바로 Asia/Seoul
+#   이 사각형은 한국만이 아님: 북한 일부, 쓰시마 전체, 규슈 북부, 혼슈 서부(야마구치·시마네·돗토리 등)까지 들어감
+#   그래도 답이 맞는 건 그 지역이 모두 UTC+9 에 서머타임이 없어서 (Asia/Pyongyang, Asia/Tokyo → 현지 시각 동일)
+# - timezonefinder / pytz 는 처음 필요할 때 import
+
+import threading
+from functools import lru_cache
+
+DEFAULT_TZ = "Asia/Seoul"
+KOREA_BBOX = (33.0, 38.7, 124.5, 131.9)  # (lat_min, lat_max, lon_min, lon_max) — 일본 서부 포함, 시간대 전용
+
+_finder = None
+_finder_lock = threading.Lock()
+
+
+def get_finder():
+    """TimezoneFinder 는 생성 시 폴리곤 데이터를 읽으므로 프로세스당 한 번만 만든다"""
+    global _finder
+    if _finder is None:
+        with _finder_lock:
+            if _finder is None:
+                from timezonefinder import TimezoneFinder
+                _finder = TimezoneFinder()
+    return _finder
+
+
+def in_korea(lat, lon):
+    """시간대 지름길 전용 (UTC+9 영역인지). 일본 서부도 True → "한국 안인지" 판단에는 쓰지 말 것"""
+    lat_min, lat_max, lon_min, lon_max = KOREA_BBOX
+    return lat_min <= lat <= lat_max and lon_min <= lon <= lon_max
+
+
+@lru_cache(maxsize=4096)
+def _lookup(lat_r, lon_r):
+    try:
+        return get_finder().timezone_at(lat=lat_r, lng=lon_r) or DEFAULT_TZ
+    except Exception:
+        return DEFAULT_TZ
+
+
+def tz_name_at(lat, lon, precision=2):
+    """시간대 이름. precision=2 → 약 1km 격자로 메모이즈"""
+    if in_korea(lat, lon):
+        return DEFAULT_TZ
+    return _lookup(round(float(lat), precision), round(float(lon), precision))
+
+
+@lru_cache(maxsize=64)
+def get_tz(name):
+    import pytz
+    try:
+        return pytz.timezone(name)
+    except Exception:
+        return pytz.timezone(DEFAULT_TZ)
+
+
+def tz_at(lat, lon):
+    return get_tz(tz_name_at(lat, lon))
@@ -0,0 +1,505 @@
+# -*- coding: utf-8 -*-
+# Overpass / Nominatim 대역 서버 (오프라인 부하 시험·벤치마크용, 표준 라이브러리 asyncio)
+#   python upstream_stub.py --port 8700 --fixtures fixtures/upstream
+# - POST|GET /api/interpreter (data=쿼리), GET /search (q=…, format=json) — 실제 서버와 같은 모양으로 응답
+# - replay(기본): 쿼리(공백 정규화)/검색 인자로 만든 키로 저장된 응답(fixture)을 돌려줌
+#   없으면 합성 응답: 결정적인 가상 약국 분포(셀별 시드)에서 around/고리/bbox, full/compact(convert) 쿼리를 그대로 계산
+#   → 겹치는 반경/고리/bbox 쿼리끼리 결과가 일관됨 (캐시·합치기·k곳 검색 검증 가능). --strict 면 404
+#   주소 검색 합성 응답은 hospital_data.KOREA_LOCATIONS 에서 가장 긴 지역명 일치
+# - record: 실제 서버(--overpass-upstream / --nominatim-upstream)로 전달하고 응답을 fixture 로 저장
+# - 장애 주입(프로필): latency(초) + jitter, error_rate 확률로 errors 중 하나
+#   "429"(Retry-After) "500" "502" "503" "504" "malformed"(잘린 JSON) "remark"(200 + runtime error) "reset"(연결 끊기)
+#   경로 첫 부분이 프로필 이름: /slow/api/interpreter → "slow" 프로필 (미러 여러 개를 한 서버로 흉내)
+#   --config faults.json = {"default": {...}, "profiles": {"slow": {"latency": 2}, "flaky": {"error_rate": 0.5}}}
+# - 요청에 Accept-Encoding: gzip 이 있으면 GZIP_MIN 바이트 이상 응답은 gzip 으로 (실제 서버처럼)
+# - --tls-cert/--tls-key 를 주면 https (연결 재사용 측정용, 자체 서명 인증서)
+# - 실행 중 제어: GET /_stub/stats, GET|POST /_stub/faults (JSON 으로 default/profiles 교체), POST /_stub/reset
+#
+# 앱/서비스를 대역 서버로 돌리기
+#   OVERPASS_URLS=http://127.0.0.1:8700/api/interpreter,http://127.0.0.1:8700/slow/api/interpreter \
+#   NOMINATIM_URL=http://127.0.0.1:8700/search NOMINATIM_RATE=0 streamlit run app.py
+#   (NOMINATIM_RATE=0 은 1 req/s 토큰 버킷을 끔 — 대역 서버에만 사용)
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import ssl
+import time as _time
+import zlib
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlsplit
+
+OVERPASS_UPSTREAM = "https://overpass-api.de/api/interpreter"
+NOMINATIM_UPSTREAM = "https://nominatim.openstreetmap.org/search"
+FIXTURE_DIR = os.path.join("fixtures", "upstream")
+MAX_BODY = 1024 * 1024
+GZIP_MIN = 1024
+ERROR_KINDS = ("429", "500", "502", "503", "504", "malformed", "remark", "reset")
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 429: "Too Many Requests",
+           500: "Internal Server Error", 502: "Bad Gateway", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+# ---------------- 장애 주입 ----------------
+class FaultProfile:
+    """latency/jitter(초), error_rate(0~1) 확률로 errors 중 하나, 429 의 Retry-After(초)"""
+
+    FIELDS = ("latency", "jitter", "error_rate", "errors", "retry_after")
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, errors=("429", "504"), retry_after=1):
+        errors = [str(e) for e in (errors.split(",") if isinstance(errors, str) else errors)]
+        unknown = set(errors) - set(ERROR_KINDS)
+        if unknown:
+            raise ValueError(f"알 수 없는 오류 종류: {sorted(unknown)} (가능: {ERROR_KINDS})")
+        if not 0 <= float(error_rate) <= 1:
+            raise ValueError("error_rate 는 0~1")
+        self.latency = float(latency)
+        self.jitter = float(jitter)
+        self.error_rate = float(error_rate)
+        self.errors = tuple(errors)
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_dict(cls, d):
+        unknown = set(d) - set(cls.FIELDS)
+        if unknown:
+            raise ValueError(f"알 수 없는 프로필 항목: {sorted(unknown)}")
+        return cls(**d)
+
+    def to_dict(self):
+        return {k: list(v) if isinstance(v, tuple) else v for k, v in ((k, getattr(self, k)) for k in self.FIELDS)}
+
+    def pick(self, rnd):
+        """(지연 초, 오류 종류 | None)"""
+        delay = self.latency + (rnd.uniform(0, self.jitter) if self.jitter else 0.0)
+        error = rnd.choice(self.errors) if self.errors and rnd.random() < self.error_rate else None
+        return delay, error
+
+
+# ---------------- 합성 데이터 ----------------
+HOURS = ("Mo-Fr 09:00-19:00; Sa 09:00-13:00", "Mo-Su 09:00-22:00", "24/7", "Mo-Fr 09:00-18:30",
+         "Mo-Sa 08:30-21:00; Su 10:00-18:00", "Mo-Fr 09:00-12:30,13:30-18:00", "")
+
+
+def _dist_m(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * 6371008.8 * math.asin(math.sqrt(a))
+
+
+class SyntheticWorld:
+    """셀(cell_deg 격자)마다 시드를 고정한 가상 약국 분포. 같은 셀은 언제나 같은 약국"""
+
+    def __init__(self, density=6.0, seed=0, cell_deg=0.01):
+        self.density = density   # km² 당 평균 약국 수
+        self.seed = seed
+        self.cell_deg = cell_deg
+        self._cells = {}
+
+    def _cell(self, ci, cj):
+        key = (ci, cj)
+        if key not in self._cells:
+            rnd = random.Random(hash((self.seed, ci, cj)) & 0xFFFFFFFF)
+            lat0, lon0 = ci * self.cell_deg, cj * self.cell_deg
+            km2 = (self.cell_deg * 111.32) ** 2 * math.cos(math.radians(lat0))
+            n = int(km2 * self.density + rnd.random())
+            els = []
+            for j in range(n):
+                tags = {"amenity": "pharmacy", "name": f"약국 {ci}-{cj}-{j}", "healthcare": "pharmacy"}
+                h = rnd.choice(HOURS)
+                if h:
+                    tags["opening_hours"] = h
+                if rnd.random() < 0.6:
+                    tags["phone"] = f"02-{rnd.randint(100, 999)}-{rnd.randint(1000, 9999)}"
+                lat, lon = lat0 + rnd.random() * self.cell_deg, lon0 + rnd.random() * self.cell_deg
+                osm_type = "node" if rnd.random() < 0.8 else "way"
+                els.append({"type": osm_type, "id": (abs(hash((ci, cj))) % 10**9) * 100 + j,
+                            "lat": round(lat, 7), "lon": round(lon, 7), "tags": tags})
+            if len(self._cells) > 200_000:
+                self._cells.clear()
+            self._cells[key] = els
+        return self._cells[key]
+
+    def in_bbox(self, s, w, n, e):
+        d = self.cell_deg
+        for ci in range(math.floor(s / d), math.floor(n / d) + 1):
+            for cj in range(math.floor(w / d), math.floor(e / d) + 1):
+                for el in self._cell(ci, cj):
+                    if s <= el["lat"] <= n and w <= el["lon"] <= e:
+                        yield el
+
+    def around(self, lat, lon, r_outer, r_inner=0.0):
+        dlat = r_outer / 111_320
+        dlon = r_outer / (111_320 * max(0.01, math.cos(math.radians(lat))))
+        for el in self.in_bbox(lat - dlat, lon - dlon, lat + dlat, lon + dlon):
+            d = _dist_m(lat, lon, el["lat"], el["lon"])
+            if r_inner < d <= r_outer:
+                yield el
+
+
+_NUM = r"(-?\d+(?:\.\d+)?)"
+AROUND_RE = re.compile(rf"\(around:{_NUM},{_NUM},{_NUM}\)")
+BBOX_RE = re.compile(rf"\({_NUM},{_NUM},{_NUM},{_NUM}\)")
+
+
+def synthetic_overpass(world, query):
+    """overpass_query.py 가 만드는 쿼리 모양(around/고리/bbox 합집합, full/compact)을 읽어 합성 응답 dict. 모르는 모양은 None"""
+    arounds = {(float(r), float(a), float(b)) for r, a, b in AROUND_RE.findall(query)}
+    if arounds:
+        radii = sorted(r for r, _, _ in arounds)
+        _, lat, lon = next(iter(arounds))
+        ring = "->.ring" in query and len(radii) > 1
+        elements = world.around(lat, lon, radii[-1], radii[0] if ring else 0.0)
+    else:
+        boxes = {tuple(map(float, m)) for m in BBOX_RE.findall(query)}
+        if not boxes:
+            return None
+        seen, elements = set(), []
+        for bb in sorted(boxes):  # 타일 쿼리: 사각형 여러 개의 합집합 (경계의 요소는 한 번만)
+            for el in world.in_bbox(*bb):
+                if (el["type"], el["id"]) not in seen:
+                    seen.add((el["type"], el["id"]))
+                    elements.append(el)
+    if "convert pharmacy" in query:
+        # convert 결과: 원래 타입은 osm_type 태그, 없는 태그는 빈 문자열, 좌표는 Point geometry
+        keys = ("name", "alt_name", "phone", "contact:phone", "opening_hours")
+        out = [{"type": "pharmacy", "id": el["id"],
+                "geometry": {"type": "Point", "coordinates": [el["lon"], el["lat"]]},
+                "tags": dict({k: el["tags"].get(k, "") for k in keys}, osm_type=el["type"])} for el in elements]
+    else:
+        out = [el if el["type"] == "node" else
+               {"type": el["type"], "id": el["id"], "center": {"lat": el["lat"], "lon": el["lon"]}, "tags": el["tags"]}
+               for el in elements]
+    return {"version": 0.6, "generator": "upstream_stub (synthetic)",
+            "osm3s": {"timestamp_osm_base": "2024-01-01T00:00:00Z"}, "elements": out}
+
+
+def synthetic_nominatim(q):
+    from geocoding import normalize_query
+    from hospital_data import KOREA_LOCATIONS
+    nq = normalize_query(q).replace(" ", "")
+    hits = [k for k in KOREA_LOCATIONS if normalize_query(k).replace(" ", "") in nq]
+    if not hits:
+        return []
+    name = max(hits, key=len)
+    lat, lon = KOREA_LOCATIONS[name]
+    return [{"place_id": zlib.crc32(name.encode("utf-8")), "lat": str(lat), "lon": str(lon),
+             "display_name": f"{name}, 대한민국", "class": "place", "type": "city", "importance": 0.5}]
+
+
+# ---------------- fixture ----------------
+def fixture_key(kind, request):
+    """overpass: 공백을 정규화한 쿼리, nominatim: 정렬한 검색 인자 → 파일 이름용 해시"""
+    if kind == "overpass":
+        raw = " ".join(request["data"].split())
+    else:
+        raw = json.dumps(sorted(request.items()), ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+class FixtureStore:
+    """<dir>/<kind>/<key>.json = {"kind", "request", "status", "content_type", "body", "recorded"}"""
+
+    def __init__(self, root=FIXTURE_DIR):
+        self.root = root
+
+    def path(self, kind, key):
+        return os.path.join(self.root, kind, f"{key}.json")
+
+    def get(self, kind, request):
+        try:
+            with open(self.path(kind, fixture_key(kind, request)), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, kind, request, status, content_type, body):
+        key = fixture_key(kind, request)
+        path = self.path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        rec = {"kind": kind, "request": request, "status": status, "content_type": content_type,
+               "body": body, "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(rec, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        return key
+
+    def count(self):
+        out = {}
+        for kind in ("overpass", "nominatim"):
+            d = os.path.join(self.root, kind)
+            out[kind] = len([f for f in os.listdir(d) if f.endswith(".json")]) if os.path.isdir(d) else 0
+        return out
+
+
+# ---------------- 서버 ----------------
+class Stub:
+    """요청 → (status, headers, body bytes) | None(연결 끊기)"""
+
+    def __init__(self, store, mode="replay", strict=False, world=None, default=None, profiles=None,
+                 overpass_upstream=OVERPASS_UPSTREAM, nominatim_upstream=NOMINATIM_UPSTREAM, seed=None):
+        self.store = store
+        self.mode = mode
+        self.strict = strict
+        self.world = world or SyntheticWorld()
+        self.default = default or FaultProfile()
+        self.profiles = profiles or {}
+        self.overpass_upstream = overpass_upstream
+        self.nominatim_upstream = nominatim_upstream
+        self.rnd = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        self.started = _time.monotonic()
+        self.stats = {}
+
+    def _count(self, kind, what):
+        s = self.stats.setdefault(kind, {"requests": 0})
+        s[what] = s.get(what, 0) + 1
+
+    def set_faults(self, cfg):
+        default = FaultProfile.from_dict(cfg["default"]) if "default" in cfg else self.default
+        profiles = ({k: FaultProfile.from_dict(v) for k, v in cfg["profiles"].items()}
+                    if "profiles" in cfg else self.profiles)
+        self.default, self.profiles = default, profiles
+
+    def faults(self):
+        return {"default": self.default.to_dict(), "profiles": {k: p.to_dict() for k, p in self.profiles.items()}}
+
+    async def handle(self, method, target, body):
+        url = urlsplit(target)
+        parts = [p for p in url.path.split("/") if p]
+        if parts[:1] == ["_stub"]:
+            return self._control(method, parts[1:], body)
+        profile_name = None
+        if parts and parts[0] not in ("api", "search"):
+            profile_name, parts = parts[0], parts[1:]
+        path = "/" + "/".join(parts)
+        if profile_name is not None and profile_name not in self.profiles:
+            return _json(404, {"error": f"없는 프로필: {profile_name}"})
+        profile = self.profiles.get(profile_name, self.default)
+
+        if path == "/api/interpreter":
+            kind = "overpass"
+            params = dict(parse_qsl(url.query))
+            if method == "POST":
+                params.update(parse_qsl(body.decode("utf-8", "replace")))
+            if "data" not in params:
+                return _text(400, "Error: no query (data=) given")
+            request = {"data": params["data"]}
+        elif path == "/search" and method == "GET":
+            kind = "nominatim"
+            request = dict(parse_qsl(url.query))
+        else:
+            return _json(404, {"error": f"없는 경로: {url.path}"})
+
+        self._count(kind, "requests")
+        delay, error = profile.pick(self.rnd)
+        if delay:
+            await asyncio.sleep(delay)
+        if error:
+            self._count(kind, f"injected_{error}")
+            injected = _injected(error, profile)
+            if injected is not False:
+                return injected
+
+        status, ctype, text = await self._respond(kind, request)
+        if error == "malformed" and status == 200:
+            text = text[: max(1, len(text) // 2)]  # JSON 중간에서 잘림
+        return status, {"Content-Type": ctype}, text.encode("utf-8")
+
+    async def _respond(self, kind, request):
+        if self.mode == "record":
+            status, ctype, text = await self._forward(kind, request)
+            if status == 200:
+                self.store.put(kind, request, status, ctype, text)
+                self._count(kind, "recorded")
+            else:
+                self._count(kind, f"upstream_{status}")
+            return status, ctype, text
+        rec = self.store.get(kind, request)
+        if rec is not None:
+            self._count(kind, "replayed")
+            return rec["status"], rec["content_type"], rec["body"]
+        if not self.strict:
+            data = synthetic_overpass(self.world, request["data"]) if kind == "overpass" \
+                else synthetic_nominatim(request.get("q", ""))
+            if data is not None:
+                self._count(kind, "synthetic")
+                return 200, "application/json", json.dumps(data, ensure_ascii=False)
+        self._count(kind, "missing")
+        return 404, "text/plain; charset=utf-8", f"no fixture for {kind} request {fixture_key(kind, request)}"
+
+    async def _forward(self, kind, request):
+        import http_pool
+        import requests
+        ua = {"User-Agent": "pharmacy-open-now-recorder/1.0"}
+        try:
+            if kind == "overpass":
+                r = await http_pool.apost(self.overpass_upstream, data=request, headers=ua, timeout=90)
+            else:
+                r = await http_pool.aget(self.nominatim_upstream, params=request, headers=ua, timeout=30)
+        except requests.RequestException as e:
+            return 502, "text/plain; charset=utf-8", f"upstream error: {e}"
+        return r.status_code, r.headers.get("Content-Type", "application/json"), r.text
+
+    def _control(self, method, parts, body):
+        what = parts[0] if parts else ""
+        if what == "stats" and method == "GET":
+            return _json(200, {"mode": self.mode, "uptime_s": round(_time.monotonic() - self.started, 1),
+                               "fixtures": self.store.count(), "endpoints": self.stats})
+        if what == "faults":
+            if method == "POST":
+                try:
+                    self.set_faults(json.loads(body or b"{}"))
+                except (ValueError, TypeError, AttributeError) as e:
+                    return _json(400, {"error": str(e)})
+            return _json(200, self.faults())
+        if what == "reset" and method == "POST":
+            self.reset()
+            return _json(200, {"reset": True})
+        return _json(404, {"error": "없는 제어 경로"})
+
+
+def _json(status, payload):
+    return status, {"Content-Type": "application/json; charset=utf-8"}, json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _text(status, text):
+    return status, {"Content-Type": "text/plain; charset=utf-8"}, text.encode("utf-8")
+
+
+def _injected(error, profile):
+    """주입할 응답. False 면 정상 응답을 만든 뒤 변형(malformed), None 이면 연결 끊기"""
+    if error == "reset":
+        return None
+    if error == "malformed":
+        return False
+    if error == "remark":
+        return _json(200, {"version": 0.6, "elements": [],
+                           "remark": 'runtime error: Query timed out in "query" at line 3 after 40 seconds.'})
+    status = int(error)
+    headers = {"Content-Type": "text/html; charset=utf-8"}
+    if status == 429:
+        headers["Retry-After"] = str(profile.retry_after)
+    return status, headers, f"<html><body><p>{status} {REASONS.get(status, '')} (injected)</p></body></html>".encode()
+
+
+def _response(status, headers, body, keep_alive, gzip_ok=False):
+    if gzip_ok and len(body) >= GZIP_MIN:
+        body = gzip.compress(body, compresslevel=5)
+        headers = dict(headers, **{"Content-Encoding": "gzip"})
+    head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    head += [f"{k}: {v}" for k, v in headers.items()]
+    head += [f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+def make_handler(stub):
+    async def handle(reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, target, version = line.decode("utf-8", "replace").split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = h.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                conn = headers.get("connection", "").lower()
+                keep_alive = conn != "close" if version == "HTTP/1.1" else conn == "keep-alive"
+                if length > MAX_BODY:
+                    writer.write(_response(*_text(400, "body too large"), False))
+                    await writer.drain()
+                    break
+                body = await reader.readexactly(length) if length else b""
+                out = await stub.handle(method.upper(), target, body)
+                if out is None:  # 장애 주입: 응답 없이 연결 끊기
+                    break
+                writer.write(_response(*out, keep_alive, "gzip" in headers.get("accept-encoding", "")))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    return handle
+
+
+def tls_context(cert, key):
+    ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    ctx.load_cert_chain(cert, key)
+    return ctx
+
+
+async def serve(stub, host="127.0.0.1", port=8700, ready=None, tls=None):
+    server = await asyncio.start_server(make_handler(stub), host, port, backlog=1024, ssl=tls)
+    if ready is not None:
+        ready(server)
+    async with server:
+        await server.serve_forever()
+
+
+def load_config(path):
+    with open(path, encoding="utf-8") as f:
+        cfg = json.load(f)
+    default = FaultProfile.from_dict(cfg.get("default", {}))
+    profiles = {k: FaultProfile.from_dict(v) for k, v in cfg.get("profiles", {}).items()}
+    return default, profiles
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Overpass/Nominatim 대역 서버 (replay/record + 장애 주입)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8700)
+    ap.add_argument("--fixtures", default=FIXTURE_DIR, help="fixture 폴더")
+    ap.add_argument("--mode", choices=("replay", "record"), default="replay")
+    ap.add_argument("--strict", action="store_true", help="fixture 가 없으면 합성 응답 대신 404")
+    ap.add_argument("--overpass-upstream", default=OVERPASS_UPSTREAM)
+    ap.add_argument("--nominatim-upstream", default=NOMINATIM_UPSTREAM)
+    ap.add_argument("--density", type=float, default=6.0, help="합성 약국 밀도 (km² 당)")
+    ap.add_argument("--config", help="장애 프로필 JSON ({'default': {...}, 'profiles': {...}})")
+    ap.add_argument("--latency", type=float, default=0.0, help="기본 프로필 지연(초)")
+    ap.add_argument("--jitter", type=float, default=0.0, help="기본 프로필 추가 지연 상한(초)")
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--errors", default="429,504", help=f"주입할 오류 종류 (쉼표): {','.join(ERROR_KINDS)}")
+    ap.add_argument("--retry-after", type=int, default=1)
+    ap.add_argument("--seed", type=int, help="장애 주입 난수 시드 (재현용)")
+    ap.add_argument("--tls-cert", help="https 로 띄울 인증서 (PEM)")
+    ap.add_argument("--tls-key", help="--tls-cert 의 개인 키 (PEM)")
+    args = ap.parse_args()
+
+    default = FaultProfile(args.latency, args.jitter, args.error_rate, args.errors, args.retry_after)
+    profiles = {}
+    if args.config:
+        cfg_default, profiles = load_config(args.config)
+        if not any((args.latency, args.jitter, args.error_rate)):
+            default = cfg_default
+    stub = Stub(FixtureStore(args.fixtures), args.mode, args.strict, SyntheticWorld(args.density), default, profiles,
+                args.overpass_upstream, args.nominatim_upstream, args.seed)
+    tls = tls_context(args.tls_cert, args.tls_key) if args.tls_cert else None
+    print(f"upstream stub on http{'s' if tls else ''}://{args.host}:{args.port} • mode {args.mode} • fixtures {args.fixtures} "
+          f"{stub.store.count()} • profiles {['default'] + sorted(profiles)}", flush=True)
+    try:
+        asyncio.run(serve(stub, args.host, args.port, tls=tls))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()